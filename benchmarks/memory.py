@@ -0,0 +1,115 @@
+"""
+Compare the memory used by the slotted parsed records against the equivalent plain dict model
+
+Usage:
+    python benchmarks/memory.py [path ...]
+
+If no paths are given a synthetic module with many functions and parameters is used instead. The
+synthetic module has almost no text, so it shows the most the records can save. For real packages
+the docstrings and source code shown make up most of the memory and the saving is much smaller
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from typing import Any, Callable, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from markdown_refdocs.main import parse_module_file  # noqa: E402
+from markdown_refdocs.types import (  # noqa: E402
+    ParsedFunction,
+    ParsedModule,
+    ParsedParameter,
+    ParsedRecord,
+    ParsedReturn,
+)
+
+
+def to_dict_model(value: Any) -> Any:
+    """
+    Deep copy a parsed record into the plain-dict representation
+    """
+    if isinstance(value, ParsedRecord):
+        return {k: to_dict_model(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [to_dict_model(v) for v in value]
+    return value
+
+
+def synthetic_modules(functions: int = 20000, parameters: int = 5) -> List[ParsedModule]:
+    result = []
+    for index in range(functions):
+        result.append(
+            ParsedFunction(
+                {
+                    'name': f'function_{index}',
+                    'hidden': False,
+                    'is_class_method': False,
+                    'is_static': False,
+                    'is_getter': False,
+                    'is_method': False,
+                    'returns': ParsedReturn({'type': 'str'}),
+                    'parameters': [
+                        ParsedParameter(
+                            {'name': f'arg{p}', 'type': 'str', 'description': '', 'hidden': False}
+                        )
+                        for p in range(parameters)
+                    ],
+                    'raises': [],
+                    'examples': [],
+                    'description': '',
+                    'source_definition': '',
+                    'source_code': '',
+                }
+            )
+        )
+    return [
+        ParsedModule({'name': 'synthetic', 'functions': result, 'classes': [], 'variables': []})
+    ]
+
+
+def parsed_modules(paths: List[str]) -> List[ParsedModule]:
+    modules = []
+    for path in paths:
+        for root, dirs, files in os.walk(path):
+            for filename in sorted(files):
+                if filename.endswith('.py'):
+                    modules.append(parse_module_file(os.path.join(root, filename), path))
+    return modules
+
+
+def measure(build: Callable[[], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()  # the syntax trees parsed (with parent links) are only freed by the collector
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('paths', nargs='*', help='python packages to parse for the comparison')
+    args = parser.parse_args()
+
+    def build_records() -> List[ParsedModule]:
+        if args.paths:
+            return parsed_modules(args.paths)
+        return synthetic_modules()
+
+    build_records()  # warm up module level caches (ex. compiled regular expressions)
+    records_size = measure(build_records)
+    dicts_size = measure(lambda: to_dict_model(build_records()))
+
+    print(f'records: {records_size / 1024 / 1024:.2f} MiB')
+    print(f'dicts:   {dicts_size / 1024 / 1024:.2f} MiB')
+    print(f'ratio:   {records_size / dicts_size:.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+import io
+import os
+import posixpath
+import re
+import tarfile
+import tokenize
+import zipfile
+from typing import Dict, Iterator, List, Tuple
+
+SOURCE_ARCHIVE_EXTENSIONS = ['.whl', '.zip', '.tar.gz', '.tgz']
+
+# installed from a wheel as if they were at the top level (ex. package-1.0.data/purelib/package/)
+WHEEL_DATA_PATTERN = re.compile(r'^[^/]+\.data/(?:purelib|platlib)/')
+
+
+def is_source_archive(path: str) -> bool:
+    """
+    Check if an input is a wheel, sdist or zip of python sources (rather than a directory or module)
+    """
+    return any(path.lower().endswith(ext) for ext in SOURCE_ARCHIVE_EXTENSIONS)
+
+
+def iter_archive_sources(path: str) -> Iterator[Tuple[str, bytes]]:
+    """
+    Read the python files of an archive one member at a time, without extracting it
+
+    Returns:
+        pairs of the member name and its content
+    """
+    if path.lower().endswith(('.whl', '.zip')):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.endswith('.py'):
+                    with archive.open(info) as fh:
+                        yield info.filename, fh.read()
+    else:
+        # stream the members in order rather than reading the index of the whole archive first
+        with tarfile.open(path, 'r|*') as archive:
+            for member in archive:
+                if member.isfile() and member.name.endswith('.py'):
+                    fh = archive.extractfile(member)
+                    if fh is not None:
+                        yield member.name, fh.read()
+
+
+def decode_source(content: bytes) -> str:
+    """
+    Decode python source using its encoding declaration (utf-8 by default)
+    """
+    encoding, _ = tokenize.detect_encoding(io.BytesIO(content).readline)
+    return content.decode(encoding)
+
+
+def get_module_paths(members: List[str]) -> Dict[str, str]:
+    """
+    Work out the module path (ex. package/module.py) of the python files of an archive
+
+    A file inside a package (directories with an __init__.py) is relative to the directory the top
+    level package is in, wherever that is in the archive (ex. package-1.0/src/package/module.py).
+    Modules outside of a package are only included from the root of the distribution: the archive
+    root, its single top level directory (as in an sdist) or the src directory under it
+
+    Args:
+        members: the names of the python files in the archive
+
+    Returns:
+        mapping of module path to member name for the members which are modules
+    """
+    members = [m for m in members if not m.split('/', 1)[0].endswith('.dist-info')]
+    paths = {WHEEL_DATA_PATTERN.sub('', m): m for m in members}
+    paths = {p: m for p, m in paths.items() if not p.split('/', 1)[0].endswith('.data')}
+    packages = {posixpath.dirname(p) for p in paths if posixpath.basename(p) == '__init__.py'}
+
+    top_level = {p.split('/', 1)[0] for p in paths}
+    roots = {''}
+    if len(top_level) == 1 and all('/' in p for p in paths):
+        root = top_level.pop()
+        roots = {root, f'{root}/src'}
+
+    modules: Dict[str, str] = {}
+    for path in sorted(paths, key=lambda p: (posixpath.dirname(p).split('/'), p)):
+        root = posixpath.dirname(path)
+        while root and root in packages:
+            root = posixpath.dirname(root)
+        in_package = root != posixpath.dirname(path)
+        if not in_package and (root not in roots or posixpath.basename(path) == 'setup.py'):
+            continue  # not in a package (ex. docs/conf.py or the setup.py of an sdist)
+        module_path = path[len(root) + 1 :] if root else path
+        modules.setdefault(module_path, paths[path])
+    return modules
+
+
+def read_archive_modules(path: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Read the python modules of a wheel, sdist or zip into memory
+
+    The archive is read once, one member at a time (see iter_archive_sources), but the sources of
+    all its python files are held in memory: which files are modules, and their names, depend on
+    the layout of the whole archive, and a compressed tarball can not be read again cheaply. Each
+    file is decoded as it is matched to its module, so the raw and decoded copies of the sources
+    are not all held at once
+
+    Files are named as if the archive were a directory containing the packages, so that the module
+    names are the same as for an extracted and installed copy (ex.
+    dist/package-1.0.tar.gz/package/module.py for package.module). The modules are given in the
+    same order as find_module_files
+
+    Args:
+        path: the archive
+
+    Returns:
+        the prefix (the portion of the filenames that is not part of the package) and sources
+    """
+    contents = {name: content for name, content in iter_archive_sources(path)}
+    prefix = path.rstrip('/') + os.sep
+    sources: Dict[str, str] = {}
+    for module_path, member in get_module_paths(list(contents)).items():
+        sources[f'{prefix}{module_path}'] = decode_source(contents.pop(member))
+    return prefix, sources
@@ -0,0 +1,166 @@
+from array import array
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from .imports import get_dotted_name
+from .links import create_relative_link
+from .markdown import TYPE_DELIMITERS
+from .types import Parsed, ParsedModule
+from .validation import iter_heading_anchors
+
+
+class ReferenceIndex:
+    """
+    Reverse index from each class to the functions, methods and attributes whose types reference it
+
+    Classes (by their link) and referencing symbols are numbered as they are added. The references
+    are kept as two arrays of ids until build() sorts them by class into compressed adjacency arrays
+    (the referencing symbol ids of class n are referrers[offsets[n]:offsets[n + 1]]), so the index
+    costs a few bytes per reference rather than a list per class
+
+    Only the symbols which are rendered (not hidden or inherited) are added, and a type name
+    references a class when it links to it (see create_types_mapping and ImportGraph)
+    """
+
+    def __init__(self) -> None:
+        # class link (ex. ./package/models.md/#class-config) => class id
+        self.classes: Dict[str, int] = {}
+        self.pages: List[str] = []
+        self._page_ids: Dict[str, int] = {}
+        # symbol id => page id, name (ex. package.api.Client.connect()) and anchor on its page
+        self.symbol_pages = array('I')
+        self.symbol_names: List[str] = []
+        self.symbol_anchors: List[str] = []
+        # the class and symbol ids of each reference, until build
+        self._references_to = array('I')
+        self._references_from = array('I')
+        self.offsets = array('I', [0])
+        self.referrers = array('I')
+
+    def _add_symbol(
+        self, page_id: int, name: str, anchor: str, types: Iterable[str], links: Mapping
+    ) -> None:
+        class_ids: Set[int] = set()
+        for type_name in types:
+            for token in TYPE_DELIMITERS.split(str(type_name)):
+                link = links.get(token) if token else None
+                if link is not None and '#class-' in link:
+                    class_ids.add(self.classes.setdefault(link, len(self.classes)))
+        if not class_ids:
+            return
+        symbol_id = len(self.symbol_names)
+        self.symbol_pages.append(page_id)
+        self.symbol_names.append(name)
+        self.symbol_anchors.append(anchor)
+        for class_id in sorted(class_ids):
+            self._references_to.append(class_id)
+            self._references_from.append(symbol_id)
+
+    def add_module(self, page: str, parsed: ParsedModule, links: Mapping) -> None:
+        """
+        Add the references of the functions, methods and attributes of a module
+
+        Args:
+            page: the output filename of the module (ex. package/module.md)
+            parsed: the parsed module
+            links: the mapping of type name to link used to render the module
+        """
+        if parsed.get('hidden', False):
+            return
+        page_id = self._page_ids.setdefault(page, len(self.pages))
+        if page_id == len(self.pages):
+            self.pages.append(page)
+        anchors: Dict[str, str] = {}
+        for heading, anchor in iter_heading_anchors(parsed):
+            anchors.setdefault(heading, anchor)
+        module_name = get_dotted_name(parsed['name'])
+
+        def qualify(name: str) -> str:
+            # names are already prefixed by the module with namespace headers
+            if name.startswith(f'{parsed["name"]}.'):
+                name = name[len(parsed['name']) + 1 :]
+            return f'{module_name}.{name}'
+
+        def add_function(func: Parsed) -> None:
+            if func.get('hidden', False) or func.get('inherited_from'):
+                return
+            types = [param.get('type') for param in func.get('parameters', [])]
+            if func.get('returns'):
+                types.append(func['returns'].get('type'))
+            name = f'{qualify(func["name"])}()'  # methods are named Class.method
+            self._add_symbol(
+                page_id, name, anchors.get(f'{func["name"]}()', ''), filter(None, types), links
+            )
+
+        def add_attributes(owner: Parsed, prefix: str, anchor: str) -> None:
+            for attr in owner.get('attributes', []):
+                if attr.get('hidden', False) or attr.get('inherited_from') or not attr.get('type'):
+                    continue
+                self._add_symbol(page_id, f'{prefix}{attr["name"]}', anchor, [attr['type']], links)
+
+        for var in parsed.get('variables', []):
+            add_attributes(var, f'{qualify(var["name"])}.', anchors.get(var['name'], ''))
+        for cls in parsed.get('classes', []):
+            if cls.get('hidden', False):
+                continue
+            add_attributes(cls, f'{qualify(cls["name"])}.', anchors.get(f'class {cls["name"]}', ''))
+            for func in cls.get('functions', []):
+                add_function(func)
+        for func in parsed.get('functions', []):
+            add_function(func)
+
+    def build(self) -> None:
+        """
+        Sort the references added by class (after all the modules have been added)
+        """
+        counts = array('I', [0]) * (len(self.classes) + 1)
+        for class_id in self._references_to:
+            counts[class_id + 1] += 1
+        for class_id in range(len(self.classes)):
+            counts[class_id + 1] += counts[class_id]
+        self.offsets = array('I', counts)
+
+        # place each reference after those of the same class added before it
+        self.referrers = array('I', [0]) * len(self._references_to)
+        for class_id, symbol_id in zip(self._references_to, self._references_from):
+            self.referrers[counts[class_id]] = symbol_id
+            counts[class_id] += 1
+        self._references_to = array('I')
+        self._references_from = array('I')
+
+    def referenced_by(self, link: str) -> List[int]:
+        """
+        Get the ids of the symbols which reference a class, in the order they were added
+        """
+        class_id = self.classes.get(link)
+        if class_id is None or class_id + 1 >= len(self.offsets):
+            return []
+        return list(self.referrers[self.offsets[class_id] : self.offsets[class_id + 1]])
+
+    def get_backlinks(
+        self, page: str, parsed: ParsedModule
+    ) -> Optional[Dict[str, List[Tuple[str, str]]]]:
+        """
+        Get the symbols referencing each class of a module, with links relative to its page
+
+        Each class is mapped to pairs of the name of the referencing symbol and the link to it
+
+        Returns:
+            the symbols by class name, or None when no class of the module is referenced
+        """
+        backlinks: Dict[str, List[Tuple[str, str]]] = {}
+        for cls in parsed.get('classes', []):
+            symbol_ids = self.referenced_by(f'./{page}/#class-{cls["name"].lower()}')
+            if not symbol_ids:
+                continue
+            backlinks[cls['name']] = [
+                (
+                    self.symbol_names[symbol_id],
+                    create_relative_link(
+                        page,
+                        f'./{self.pages[self.symbol_pages[symbol_id]]}/#'
+                        f'{self.symbol_anchors[symbol_id]}',
+                    ),
+                )
+                for symbol_id in symbol_ids
+            ]
+        return backlinks or None
@@ -0,0 +1,294 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple
+
+from .links import collect_type_references
+from .types import ParsedModule
+
+CACHE_VERSION = 2
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return repr(value)
+
+
+class ModuleCache:
+    """
+    Cache of parsed modules and their rendered pages, used between runs
+
+    Each page has a single cache entry so the cache does not grow as modules change. A module is
+    only parsed again when its source or the parse options change, and a page is only rendered
+    again when, in addition, one of the link targets for the types it references has changed
+
+    Args:
+        cache_dir: the directory to keep the cache entries in. If not given the entries are only
+            kept in memory, for long running processes which generate the pages repeatedly
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir
+        # pages whose rendered markdown was reused from the cache (since the last reset)
+        self.unchanged: Set[str] = set()
+        # page => the entry loaded (or created) for it
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def reset(self) -> None:
+        """
+        Start a new run, forgetting which pages were reused
+        """
+        self.unchanged = set()
+
+    def _entry_filename(self, page: str) -> str:
+        return os.path.join(
+            self.cache_dir, hashlib.sha1(page.encode('utf8')).hexdigest() + '.pickle'
+        )
+
+    def _load(self, page: str) -> Optional[Dict[str, Any]]:
+        if not self.cache_dir:
+            return self._entries.get(page)
+        try:
+            with open(self._entry_filename(page), 'rb') as fh:
+                entry = pickle.load(fh)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+        if not isinstance(entry, dict) or entry.get('version') != CACHE_VERSION:
+            return None
+        return entry
+
+    def _save(self, page: str, entry: Dict[str, Any]) -> None:
+        if not self.cache_dir:
+            return
+        filename = self._entry_filename(page)
+        handle, temp_filename = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as fh:
+                pickle.dump(entry, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_filename, filename)
+        except BaseException:
+            try:
+                os.remove(temp_filename)
+            except OSError:
+                pass
+            raise
+
+    def parse(
+        self,
+        page: str,
+        filename: str,
+        parse: Callable[[str], ParsedModule],
+        options: Optional[Dict[str, Any]] = None,
+        content: Optional[str] = None,
+    ) -> ParsedModule:
+        """
+        Get the parsed module for a page, only parsing it if its source or the options changed
+
+        Args:
+            page: the output filename of the module (ex. package/module.md)
+            filename: the path to the module source file
+            parse: called with the module source to parse it
+            options: the options the module is parsed with
+            content: the module source, read from filename when not given
+        """
+        if content is None:
+            with open(filename, 'r') as fh:
+                content = fh.read()
+        digest = hashlib.sha1()
+        for part in [
+            str(CACHE_VERSION),
+            page,
+            json.dumps(options or {}, sort_keys=True, default=_json_default),
+            content,
+        ]:
+            digest.update(part.encode('utf8'))
+            digest.update(b'\0')
+        module_hash = digest.hexdigest()
+
+        entry = self._load(page)
+        if entry is None or entry['module_hash'] != module_hash:
+            entry = {
+                'version': CACHE_VERSION,
+                'module_hash': module_hash,
+                'parsed': parse(content),
+                'links_hash': None,
+                'markdown': None,
+            }
+            self._save(page, entry)
+        self._entries[page] = entry
+        return entry['parsed']
+
+    def _links_hash(
+        self,
+        parsed: ParsedModule,
+        types_mapping: Mapping[str, str],
+        backlinks: Optional[Dict[str, List[Tuple[str, str]]]] = None,
+    ) -> str:
+        references: Any = sorted(
+            (name, types_mapping[name])
+            for name in collect_type_references(parsed)
+            if name in types_mapping
+        )
+        if backlinks:
+            references = [references, sorted(backlinks.items())]
+        return hashlib.sha1(json.dumps(references).encode('utf8')).hexdigest()
+
+    def get_markdown(
+        self,
+        page: str,
+        parsed: ParsedModule,
+        types_mapping: Mapping[str, str],
+        backlinks: Optional[Dict[str, List[Tuple[str, str]]]] = None,
+    ) -> Optional[str]:
+        """
+        Get the markdown rendered for a page by a previous run if its module and links are unchanged
+
+        Args:
+            page: the output filename of the module
+            parsed: the parsed module (from parse)
+            types_mapping: the (package level) mapping of type name to link used for the page
+            backlinks: the backlinks of the classes of the page (see ReferenceIndex.get_backlinks)
+        """
+        entry = self._entries.get(page)
+        if entry is None or entry['parsed'] is not parsed:
+            return None
+        if entry['links_hash'] != self._links_hash(parsed, types_mapping, backlinks):
+            return None
+        self.unchanged.add(page)
+        return entry['markdown']
+
+    def set_markdown(
+        self,
+        page: str,
+        parsed: ParsedModule,
+        types_mapping: Mapping[str, str],
+        markdown: str,
+        backlinks: Optional[Dict[str, List[Tuple[str, str]]]] = None,
+    ) -> None:
+        """
+        Keep the markdown rendered for a page (see get_markdown)
+        """
+        entry = self._entries.get(page)
+        if entry is not None and entry['parsed'] is parsed:
+            entry.update(
+                {
+                    'links_hash': self._links_hash(parsed, types_mapping, backlinks),
+                    'markdown': markdown,
+                }
+            )
+            self._save(page, entry)
+
+    def render(
+        self,
+        page: str,
+        parsed: ParsedModule,
+        types_mapping: Mapping[str, str],
+        render: Callable[[], str],
+        backlinks: Optional[Dict[str, List[Tuple[str, str]]]] = None,
+    ) -> str:
+        """
+        Get the markdown for a page, only rendering it if the module or the links it uses changed
+
+        Args:
+            page: the output filename of the module
+            parsed: the parsed module (from parse)
+            types_mapping: the (package level) mapping of type name to link used for the page
+            render: called to render the page
+            backlinks: the backlinks of the classes of the page (see ReferenceIndex.get_backlinks)
+        """
+        markdown = self.get_markdown(page, parsed, types_mapping, backlinks)
+        if markdown is None:
+            markdown = render()
+            self.set_markdown(page, parsed, types_mapping, markdown, backlinks)
+        return markdown
+
+
+class ContentCache(ModuleCache):
+    """
+    In-memory cache of parsed modules and rendered pages keyed by the content of the module
+
+    Unlike ModuleCache, a page can have any number of entries. This is for generating several
+    versions of a package at once, where most modules are identical between the versions and so
+    only have to be parsed and rendered once
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        # (page, content hash, options) => parsed module
+        self._parsed: Dict[Tuple[str, str, str], ParsedModule] = {}
+        # (id of the parsed module, links hash) => markdown
+        self._rendered: Dict[Tuple[int, str], str] = {}
+        self._parsed_ids: Set[int] = set()
+
+    def _parsed_key(
+        self, page: str, content_hash: str, options: Optional[Dict[str, Any]]
+    ) -> Tuple[str, str, str]:
+        return (
+            page,
+            content_hash,
+            json.dumps(options or {}, sort_keys=True, default=_json_default),
+        )
+
+    def has_parsed(
+        self, page: str, content_hash: str, options: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Check if a module has already been parsed (so its source does not need to be read)
+        """
+        return self._parsed_key(page, content_hash, options) in self._parsed
+
+    def parse_content(
+        self,
+        page: str,
+        content_hash: str,
+        parse: Callable[[], ParsedModule],
+        options: Optional[Dict[str, Any]] = None,
+    ) -> ParsedModule:
+        """
+        Get the parsed module for a page, only parsing it the first time its content is seen
+
+        Args:
+            page: the output filename of the module (ex. package/module.md)
+            content_hash: a hash of the module source (ex. the git blob hash)
+            parse: called to parse the module
+            options: the options the module is parsed with
+        """
+        key = self._parsed_key(page, content_hash, options)
+        if key not in self._parsed:
+            self._parsed[key] = parse()
+            self._parsed_ids.add(id(self._parsed[key]))
+        return self._parsed[key]
+
+    def get_markdown(
+        self,
+        page: str,
+        parsed: ParsedModule,
+        types_mapping: Mapping[str, str],
+        backlinks: Optional[Dict[str, List[Tuple[str, str]]]] = None,
+    ) -> Optional[str]:
+        if id(parsed) not in self._parsed_ids:
+            # not from the cache (ex. copied to add inherited members) so its id may be reused
+            return None
+        # the parsed modules are kept alive by the cache so their ids are not reused
+        key = (id(parsed), self._links_hash(parsed, types_mapping, backlinks))
+        markdown = self._rendered.get(key)
+        if markdown is not None:
+            self.unchanged.add(page)
+        return markdown
+
+    def set_markdown(
+        self,
+        page: str,
+        parsed: ParsedModule,
+        types_mapping: Mapping[str, str],
+        markdown: str,
+        backlinks: Optional[Dict[str, List[Tuple[str, str]]]] = None,
+    ) -> None:
+        if id(parsed) in self._parsed_ids:
+            key = (id(parsed), self._links_hash(parsed, types_mapping, backlinks))
+            self._rendered[key] = markdown
@@ -0,0 +1,163 @@
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from .types import ParsedClass, ParsedFunction, ParsedModule
+
+COVERAGE_REPORT_VERSION = 1
+SYMBOL_KINDS = ['module', 'class', 'function', 'method', 'parameter']
+
+
+def get_percent(documented: int, total: int) -> float:
+    return round(100 * documented / total, 2) if total else 100.0
+
+
+def summarize(counts: Dict[str, List[int]]) -> Dict[str, Any]:
+    """
+    Summarize documented and total counts by symbol kind
+    """
+    documented = sum(documented for documented, _ in counts.values())
+    total = sum(total for _, total in counts.values())
+    return {
+        'documented': documented,
+        'total': total,
+        'percent': get_percent(documented, total),
+        'kinds': {
+            kind: {
+                'documented': counts[kind][0],
+                'total': counts[kind][1],
+                'percent': get_percent(*counts[kind]),
+            }
+            for kind in SYMBOL_KINDS
+            if counts.get(kind, [0, 0])[1]
+        },
+    }
+
+
+class CoverageReport:
+    """
+    Counts the documented and undocumented symbols of the modules as they are parsed
+
+    Symbols are counted from the parsed modules, so this needs no parsing of its own. A symbol is
+    documented when it has a description (__init__ methods are also documented by the class
+    docstring, as when deciding if they are hidden) and a parameter when it has a description.
+    Private names are not counted when they are hidden
+
+    Args:
+        hide_private: do not count private functions and classes
+    """
+
+    def __init__(self, hide_private: bool = True):
+        self.hide_private = hide_private
+        # module name => symbol kind => [documented, total]
+        self.counts: Dict[str, Dict[str, List[int]]] = {}
+        # module name => names of the undocumented symbols
+        self.undocumented: Dict[str, List[str]] = {}
+
+    def _is_private(self, name: str) -> bool:
+        short_name = name.split('.')[-1]
+        return self.hide_private and short_name.startswith('_') and short_name != '__init__'
+
+    def add_module(self, parsed: ParsedModule) -> None:
+        """
+        Count the symbols of a parsed module
+        """
+        counts: Dict[str, List[int]] = {kind: [0, 0] for kind in SYMBOL_KINDS}
+        undocumented: List[str] = []
+
+        def count(kind: str, name: str, documented: bool) -> None:
+            counts[kind][1] += 1
+            if documented:
+                counts[kind][0] += 1
+            else:
+                undocumented.append(name)
+
+        def add_function(
+            func: ParsedFunction, kind: str, cls: Optional[ParsedClass] = None
+        ) -> None:
+            if self._is_private(func['name']):
+                return
+            documented = bool(func.get('description'))
+            if cls is not None and func['name'].split('.')[-1] == '__init__':
+                documented = documented or bool(cls.get('description'))
+            count(kind, func['name'], documented)
+            for param in func.get('parameters', []):
+                count(
+                    'parameter', f'{func["name"]}({param["name"]})', bool(param.get('description'))
+                )
+
+        count('module', parsed['name'], bool(parsed.get('description')))
+        for cls in parsed.get('classes', []):
+            if self._is_private(cls['name']):
+                continue
+            count('class', cls['name'], bool(cls.get('description')))
+            for func in cls.get('functions', []):
+                add_function(func, 'method', cls)
+        for func in parsed.get('functions', []):
+            add_function(func, 'function')
+
+        self.counts[parsed['name']] = counts
+        self.undocumented[parsed['name']] = undocumented
+
+    def get_packages(self) -> Dict[str, Dict[str, List[int]]]:
+        """
+        Add up the counts of the modules in each package (including its subpackages)
+        """
+        packages: Dict[str, Dict[str, List[int]]] = {}
+        for module_name, counts in self.counts.items():
+            parts = module_name.split('/')
+            for depth in range(1, len(parts)):
+                package = packages.setdefault(
+                    '/'.join(parts[:depth]), {kind: [0, 0] for kind in SYMBOL_KINDS}
+                )
+                for kind, (documented, total) in counts.items():
+                    package[kind][0] += documented
+                    package[kind][1] += total
+        return packages
+
+    def get_total(self) -> Dict[str, Any]:
+        """
+        Summarize the counts of all the modules
+        """
+        totals: Dict[str, List[int]] = {kind: [0, 0] for kind in SYMBOL_KINDS}
+        for counts in self.counts.values():
+            for kind, (documented, total) in counts.items():
+                totals[kind][0] += documented
+                totals[kind][1] += total
+        return summarize(totals)
+
+    def write(self, filename: str) -> None:
+        """
+        Write the coverage of the modules, packages and all the modules as JSON
+        """
+        modules = {}
+        for module_name in sorted(self.counts):
+            modules[module_name] = summarize(self.counts[module_name])
+            modules[module_name]['undocumented'] = self.undocumented[module_name]
+        packages = self.get_packages()
+
+        dirname = os.path.dirname(filename)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        with open(filename, 'w') as fh:
+            json.dump(
+                {
+                    'version': COVERAGE_REPORT_VERSION,
+                    'total': self.get_total(),
+                    'packages': {name: summarize(packages[name]) for name in sorted(packages)},
+                    'modules': modules,
+                },
+                fh,
+                indent=2,
+            )
+
+
+class CoverageError(Exception):
+    """
+    Raised after generating the pages when the documentation coverage is under the threshold
+    """
+
+    def __init__(self, percent: float, fail_under: float):
+        super().__init__(f'documentation coverage {percent}% is under {fail_under}%')
+        self.percent = percent
+        self.fail_under = fail_under
@@ -0,0 +1,395 @@
+import ast
+import re
+import sys
+from sys import intern
+from typing import Dict, List, Optional, Tuple
+
+BINARY_OPERATORS = {
+    ast.Add: '+',
+    ast.Sub: '-',
+    ast.Mult: '*',
+    ast.MatMult: '@',
+    ast.Div: '/',
+    ast.Mod: '%',
+    ast.Pow: '**',
+    ast.LShift: '<<',
+    ast.RShift: '>>',
+    ast.BitOr: '|',
+    ast.BitXor: '^',
+    ast.BitAnd: '&',
+    ast.FloorDiv: '//',
+}
+# how tightly the binary operators bind their operands (higher binds tighter)
+BINARY_PRECEDENCE = {
+    ast.BitOr: 1,
+    ast.BitXor: 2,
+    ast.BitAnd: 3,
+    ast.LShift: 4,
+    ast.RShift: 4,
+    ast.Add: 5,
+    ast.Sub: 5,
+    ast.Mult: 6,
+    ast.MatMult: 6,
+    ast.Div: 6,
+    ast.FloorDiv: 6,
+    ast.Mod: 6,
+    ast.Pow: 7,
+}
+UNARY_OPERATORS = {ast.Invert: '~', ast.Not: 'not ', ast.UAdd: '+', ast.USub: '-'}
+BOOLEAN_OPERATORS = {ast.And: ' and ', ast.Or: ' or '}
+COMPARISON_OPERATORS = {
+    ast.Eq: '==',
+    ast.NotEq: '!=',
+    ast.Lt: '<',
+    ast.LtE: '<=',
+    ast.Gt: '>',
+    ast.GtE: '>=',
+    ast.Is: 'is',
+    ast.IsNot: 'is not',
+    ast.In: 'in',
+    ast.NotIn: 'not in',
+}
+# expressions which never need parentheses around them when they are an operand
+ATOMIC_NODES: Tuple[type, ...] = (
+    ast.Name,
+    ast.Attribute,
+    ast.Subscript,
+    ast.Call,
+    ast.Constant,
+    ast.List,
+    ast.Tuple,
+    ast.Dict,
+    ast.Set,
+    ast.ListComp,
+    ast.SetComp,
+    ast.DictComp,
+    ast.GeneratorExp,
+    ast.JoinedStr,
+)
+# expressions nested deeper than this are shown as their source code rather than rendered, since
+# rendering (ast.unparse) recurses at least once per level and could exceed the recursion limit
+DEFAULT_MAX_EXPRESSION_DEPTH = 100
+# the nodes of python < 3.8 which were replaced by ast.Constant (deprecated aliases since)
+LEGACY_CONSTANT_NODES: Tuple[type, ...] = ()
+LEGACY_STRING_NODES: Tuple[type, ...] = ()
+if sys.version_info < (3, 8):
+    LEGACY_CONSTANT_NODES = (ast.Str, ast.Bytes, ast.Num, ast.NameConstant)
+    LEGACY_STRING_NODES = (ast.Str,)
+
+
+def _arguments(args: ast.arguments) -> str:
+    positional = list(getattr(args, 'posonlyargs', [])) + list(args.args)
+    defaults = [None] * (len(positional) - len(args.defaults)) + list(args.defaults)
+    parts = []
+    for index, (arg, default) in enumerate(zip(positional, defaults)):
+        parts.append(arg.arg if default is None else f'{arg.arg}={unparse_fallback(default)}')
+        if index == len(getattr(args, 'posonlyargs', [])) - 1:
+            parts.append('/')
+    if args.vararg:
+        parts.append(f'*{args.vararg.arg}')
+    elif args.kwonlyargs:
+        parts.append('*')
+    for arg, default in zip(args.kwonlyargs, args.kw_defaults):
+        parts.append(arg.arg if default is None else f'{arg.arg}={unparse_fallback(default)}')
+    if args.kwarg:
+        parts.append(f'**{args.kwarg.arg}')
+    return ', '.join(parts)
+
+
+def _operand(node: ast.AST) -> str:
+    content = unparse_fallback(node)
+    if isinstance(node, ATOMIC_NODES + LEGACY_CONSTANT_NODES):
+        return content
+    return f'({content})'
+
+
+def _binary_operand(node: ast.BinOp, operand: ast.AST, right: bool) -> str:
+    if isinstance(operand, ast.BinOp):
+        precedence = BINARY_PRECEDENCE[type(node.op)]
+        operand_precedence = BINARY_PRECEDENCE[type(operand.op)]
+        # operators group from the left (a - b - c), apart from ** which groups from the right
+        groups_right = isinstance(node.op, ast.Pow)
+        if operand_precedence > precedence or (
+            operand_precedence == precedence and right == groups_right
+        ):
+            return unparse_fallback(operand)
+    return _operand(operand)
+
+
+def _elements(nodes: List[ast.expr]) -> str:
+    return ', '.join(unparse_fallback(e) for e in nodes)
+
+
+def _comprehensions(generators: List[ast.comprehension]) -> str:
+    parts = []
+    for generator in generators:
+        prefix = ' async for ' if getattr(generator, 'is_async', False) else ' for '
+        parts.append(f'{prefix}{unparse_fallback(generator.target)} in {_operand(generator.iter)}')
+        parts.extend(f' if {_operand(condition)}' for condition in generator.ifs)
+    return ''.join(parts)
+
+
+def _slice(node: ast.AST) -> str:
+    if type(node).__name__ == 'Index':  # python < 3.9
+        node = node.value  # type: ignore
+    if isinstance(node, ast.Tuple):
+        return _elements(node.elts)
+    if type(node).__name__ == 'ExtSlice':  # python < 3.9
+        return ', '.join(_slice(d) for d in node.dims)  # type: ignore
+    return unparse_fallback(node)
+
+
+def unparse_fallback(node: ast.AST) -> str:
+    """
+    Convert an expression back to source code, for python versions without ast.unparse
+
+    Operands which are not atoms are put in parentheses unless they are binary operations which
+    bind tighter (or group the same way), so the result can have more parentheses than the original
+    source, but has the same meaning
+    """
+    if isinstance(node, ast.Constant):
+        return '...' if node.value is Ellipsis else repr(node.value)
+    if isinstance(node, LEGACY_CONSTANT_NODES):
+        return repr(getattr(node, 'value', getattr(node, 's', getattr(node, 'n', None))))
+    if type(node).__name__ == 'Ellipsis':  # python < 3.8
+        return '...'
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return f'{_operand(node.value)}.{node.attr}'
+    if isinstance(node, ast.Subscript):
+        return f'{_operand(node.value)}[{_slice(node.slice)}]'
+    if isinstance(node, ast.Slice):
+        lower = unparse_fallback(node.lower) if node.lower else ''
+        upper = unparse_fallback(node.upper) if node.upper else ''
+        step = f':{unparse_fallback(node.step)}' if node.step else ''
+        return f'{lower}:{upper}{step}'
+    if isinstance(node, ast.Starred):
+        return f'*{_operand(node.value)}'
+    if isinstance(node, ast.Tuple):
+        if len(node.elts) == 1:
+            return f'({unparse_fallback(node.elts[0])},)'
+        return f'({_elements(node.elts)})'
+    if isinstance(node, ast.List):
+        return f'[{_elements(node.elts)}]'
+    if isinstance(node, ast.Set):
+        return f'{{{_elements(node.elts)}}}'
+    if isinstance(node, ast.Dict):
+        items = [
+            f'**{_operand(v)}' if k is None else f'{unparse_fallback(k)}: {unparse_fallback(v)}'
+            for k, v in zip(node.keys, node.values)
+        ]
+        return f'{{{", ".join(items)}}}'
+    if isinstance(node, ast.Call):
+        arguments = [unparse_fallback(a) for a in node.args] + [
+            f'**{_operand(k.value)}' if k.arg is None else f'{k.arg}={unparse_fallback(k.value)}'
+            for k in node.keywords
+        ]
+        return f'{_operand(node.func)}({", ".join(arguments)})'
+    if isinstance(node, ast.BinOp):
+        operator = BINARY_OPERATORS[type(node.op)]
+        left = _binary_operand(node, node.left, right=False)
+        return f'{left} {operator} {_binary_operand(node, node.right, right=True)}'
+    if isinstance(node, ast.UnaryOp):
+        return f'{UNARY_OPERATORS[type(node.op)]}{_operand(node.operand)}'
+    if isinstance(node, ast.BoolOp):
+        return BOOLEAN_OPERATORS[type(node.op)].join(_operand(v) for v in node.values)
+    if isinstance(node, ast.Compare):
+        parts = [_operand(node.left)]
+        for operator, comparator in zip(node.ops, node.comparators):
+            parts.extend([COMPARISON_OPERATORS[type(operator)], _operand(comparator)])
+        return ' '.join(parts)
+    if isinstance(node, ast.IfExp):
+        return f'{_operand(node.body)} if {_operand(node.test)} else {_operand(node.orelse)}'
+    if isinstance(node, ast.Lambda):
+        arguments = _arguments(node.args)
+        return (
+            f'lambda {arguments}: {unparse_fallback(node.body)}'
+            if arguments
+            else f'lambda: {unparse_fallback(node.body)}'
+        )
+    if isinstance(node, ast.ListComp):
+        return f'[{unparse_fallback(node.elt)}{_comprehensions(node.generators)}]'
+    if isinstance(node, ast.SetComp):
+        return f'{{{unparse_fallback(node.elt)}{_comprehensions(node.generators)}}}'
+    if isinstance(node, ast.GeneratorExp):
+        return f'({unparse_fallback(node.elt)}{_comprehensions(node.generators)})'
+    if isinstance(node, ast.DictComp):
+        item = f'{unparse_fallback(node.key)}: {unparse_fallback(node.value)}'
+        return f'{{{item}{_comprehensions(node.generators)}}}'
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for value in node.values:
+            if isinstance(value, ast.FormattedValue):
+                conversion = f'!{chr(value.conversion)}' if value.conversion != -1 else ''
+                spec = f':{unparse_fallback(value.format_spec)[2:-1]}' if value.format_spec else ''
+                parts.append(f'{{{unparse_fallback(value.value)}{conversion}{spec}}}')
+            else:
+                text = getattr(value, 'value', getattr(value, 's', ''))
+                parts.append(text.replace('{', '{{').replace('}', '}}'))
+        return f'f{repr("".join(parts))}'
+    if isinstance(node, ast.Await):
+        return f'await {_operand(node.value)}'
+    if isinstance(node, (ast.Yield, ast.YieldFrom)):
+        keyword = 'yield from' if isinstance(node, ast.YieldFrom) else 'yield'
+        return f'({keyword} {unparse_fallback(node.value)})' if node.value else f'({keyword})'
+    if type(node).__name__ == 'NamedExpr':
+        return f'({unparse_fallback(node.target)} := {unparse_fallback(node.value)})'  # type: ignore
+    raise ValueError(f'unsupported expression: {type(node).__name__}')
+
+
+unparse = getattr(ast, 'unparse', unparse_fallback)
+
+
+def is_literal(node: ast.AST) -> bool:
+    """
+    Check if a subscript is a Literal type (ex. Literal['a'] or typing.Literal['a'])
+    """
+    value = getattr(node, 'value', None)
+    return (isinstance(value, ast.Name) and value.id == 'Literal') or (
+        isinstance(value, ast.Attribute) and value.attr == 'Literal'
+    )
+
+
+def get_expression_depth(node: ast.AST, limit: Optional[int] = None) -> int:
+    """
+    Get the number of levels of nesting of an expression (1 for a name or constant)
+
+    Args:
+        node: the expression
+        limit: stop counting once the depth is over this (the depth returned is then limit + 1)
+    """
+    depth = 0
+    stack = [(node, 1)]
+    while stack:
+        current, level = stack.pop()
+        if level > depth:
+            depth = level
+            if limit is not None and depth > limit:
+                break
+        for child in ast.iter_child_nodes(current):
+            if type(child).__name__ == 'Index':  # python < 3.9 wraps subscripts in a level
+                child = child.value  # type: ignore
+            if not isinstance(child, ast.expr_context):
+                stack.append((child, level + 1))
+    return depth
+
+
+def copy_expression(node: ast.AST, forward_references: bool = False) -> ast.AST:
+    """
+    Copy an expression (copy.deepcopy would also copy the rest of the module through the parent
+    attributes added by the analyzer)
+
+    The nodes are listed from an explicit stack and copied children first, so the depth of the
+    expression is not limited by the recursion limit
+
+    Args:
+        node: the expression
+        forward_references: replace the strings of an annotation (forward references) with the
+            names they contain. The strings of Literal types are values rather than references, so
+            they are left as they are
+    """
+    order: List[Tuple[ast.AST, bool]] = []
+    stack = [(node, forward_references)]
+    while stack:
+        current, replace = stack.pop()
+        order.append((current, replace))
+        replace = replace and not (isinstance(current, ast.Subscript) and is_literal(current))
+        stack.extend((child, replace) for child in ast.iter_child_nodes(current))
+
+    copies: Dict[int, ast.AST] = {}
+    for current, replace in reversed(order):
+        if replace and isinstance(current, LEGACY_STRING_NODES):
+            copy: ast.AST = ast.Name(id=current.s, ctx=ast.Load())  # type: ignore
+        elif replace and isinstance(current, ast.Constant) and isinstance(current.value, str):
+            copy = ast.Name(id=current.value, ctx=ast.Load())
+        else:
+            fields = {}
+            for name, value in ast.iter_fields(current):
+                if isinstance(value, ast.AST):
+                    value = copies[id(value)]
+                elif isinstance(value, list):
+                    value = [copies[id(v)] if isinstance(v, ast.AST) else v for v in value]
+                fields[name] = value
+            copy = type(current)(**fields)
+        copies[id(current)] = ast.copy_location(copy, current)
+    return copies[id(node)]
+
+
+def has_strings(node: ast.AST) -> bool:
+    return any(
+        isinstance(n, LEGACY_STRING_NODES)
+        or (isinstance(n, ast.Constant) and isinstance(n.value, str))
+        for n in ast.walk(node)
+    )
+
+
+class ExpressionRenderer:
+    """
+    Renders the annotations, default values and other expressions of a module as source code
+
+    Uses ast.unparse where available (python 3.9+). An expression is only rendered the first time
+    its source is seen in the module, later occurrences (ex. the same parameter type on many
+    functions) reuse the result
+
+    Expressions nested deeper than max_depth (ex. in generated code) are shown as their source code
+    with the lines joined instead, or as ... when their position in the source is not known
+    (python < 3.8)
+
+    Args:
+        lines: the source code lines of the module, used to find repeated expressions
+        max_depth: the deepest nesting of an expression which is rendered
+    """
+
+    def __init__(self, lines: List[str], max_depth: int = DEFAULT_MAX_EXPRESSION_DEPTH):
+        self.lines = lines
+        self.max_depth = max_depth
+        self._rendered: Dict[Tuple[bool, str], str] = {}
+
+    def get_source(self, node: ast.AST) -> Optional[str]:
+        """
+        Get the source code of an expression, or None if its end is not known (python < 3.8)
+        """
+        end_lineno = getattr(node, 'end_lineno', None)
+        end_col_offset = getattr(node, 'end_col_offset', None)
+        if end_lineno is None or end_col_offset is None:
+            return None
+        # offsets are in utf-8 bytes
+        start: int = node.lineno  # type: ignore
+        lines = [line.encode('utf8') for line in self.lines[start - 1 : end_lineno]]
+        lines[-1] = lines[-1][:end_col_offset]
+        lines[0] = lines[0][node.col_offset :]  # type: ignore
+        return b'\n'.join(lines).decode('utf8')
+
+    def is_too_deep(self, node: ast.AST) -> bool:
+        return get_expression_depth(node, self.max_depth) > self.max_depth
+
+    def render(self, node: Optional[ast.AST], annotation: bool = False) -> Optional[str]:
+        """
+        Render an expression as source code
+
+        Tuples (ex. of assignment targets) are rendered without the parentheses around them
+
+        Args:
+            node: the expression
+            annotation: render the strings (forward references) in the expression as the names
+                they contain, as the types of parameters, returns and attributes are shown
+        """
+        if node is None:
+            return None
+        source = self.get_source(node)
+        if source is None and self.is_too_deep(node):
+            return '...'
+        key = (annotation, ast.dump(node) if source is None else source)
+        if key not in self._rendered:
+            if source is not None and self.is_too_deep(node):
+                content = re.sub(r'\s*\n\s*', ' ', source)
+            else:
+                if annotation and has_strings(node):
+                    node = copy_expression(node, forward_references=True)
+                if isinstance(node, ast.Tuple):
+                    content = ', '.join(unparse(e) for e in node.elts)
+                else:
+                    content = unparse(node)
+            self._rendered[key] = intern(content)
+        return self._rendered[key]
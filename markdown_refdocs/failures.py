@@ -0,0 +1,55 @@
+import json
+import os
+import traceback
+from typing import Any, Dict, List
+
+FAILURE_REPORT_VERSION = 1
+
+
+def describe_failure(page: str, filename: str, stage: str, err: BaseException) -> Dict[str, Any]:
+    """
+    Describe the error raised processing a module for the failure report
+
+    Args:
+        page: the output filename of the module (ex. package/module.md)
+        filename: the path to the module source file
+        stage: what was being done when the error was raised (parse or render)
+        err: the error
+    """
+    failure: Dict[str, Any] = {
+        'page': page,
+        'filename': filename,
+        'stage': stage,
+        'error': type(err).__name__,
+        'message': str(err),
+    }
+    if isinstance(err, SyntaxError) and err.lineno:
+        failure['line'] = err.lineno
+    failure['traceback'] = ''.join(
+        traceback.format_exception(type(err), err, err.__traceback__)
+    ).rstrip()
+    return failure
+
+
+def write_failure_report(filename: str, failures: List[Dict[str, Any]]) -> None:
+    """
+    Write the modules which failed as JSON (an empty report is written when nothing failed)
+    """
+    dirname = os.path.dirname(filename)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    with open(filename, 'w') as fh:
+        json.dump({'version': FAILURE_REPORT_VERSION, 'failures': failures}, fh, indent=2)
+
+
+def load_failure_report(filename: str) -> List[Dict[str, Any]]:
+    """
+    Read the modules which failed from a report written by write_failure_report
+    """
+    with open(filename, 'r') as fh:
+        content = json.load(fh)
+    if content.get('version') != FAILURE_REPORT_VERSION:
+        raise ValueError(
+            f'unsupported failure report version ({content.get("version")}) in {filename}'
+        )
+    return content['failures']
@@ -0,0 +1,151 @@
+import os
+import subprocess
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+def run_git(args: List[str], cwd: str) -> str:
+    """
+    Run a git command and return its output
+
+    Raises:
+        subprocess.CalledProcessError: the git command failed (ex. unknown ref or not a repository)
+    """
+    return subprocess.run(
+        ['git'] + args,
+        cwd=cwd,
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    ).stdout
+
+
+def get_repository_root(path: str) -> str:
+    """
+    Get the top level directory of the git repository containing a path
+    """
+    cwd = path if os.path.isdir(path) else os.path.dirname(os.path.abspath(path))
+    return os.path.realpath(run_git(['rev-parse', '--show-toplevel'], cwd).strip())
+
+
+def find_changed_files(since: str, path: str) -> Tuple[Set[str], Set[str]]:
+    """
+    Find the files which changed in the working tree of a git repository since a given ref
+
+    Files which were modified, added (including untracked files) or renamed to are changed, and
+    files which were deleted or renamed from are deleted
+
+    Args:
+        since: the git ref (ex. commit, branch or tag) to compare against
+        path: any path in the repository
+
+    Returns:
+        the absolute paths of the changed files and of the deleted files
+    """
+    root = get_repository_root(path)
+    changed: Set[str] = set()
+    deleted: Set[str] = set()
+
+    tokens = run_git(['diff', '--name-status', '-M', '-z', since, '--'], root).split('\0')
+    index = 0
+    while index < len(tokens) and tokens[index]:
+        status = tokens[index]
+        if status[0] in 'RC':
+            old_path, new_path = tokens[index + 1], tokens[index + 2]
+            if status[0] == 'R':
+                deleted.add(os.path.join(root, old_path))
+            changed.add(os.path.join(root, new_path))
+            index += 3
+        else:
+            if status[0] == 'D':
+                deleted.add(os.path.join(root, tokens[index + 1]))
+            else:
+                changed.add(os.path.join(root, tokens[index + 1]))
+            index += 2
+
+    for untracked in run_git(['ls-files', '--others', '--exclude-standard', '-z'], root).split(
+        '\0'
+    ):
+        if untracked:
+            changed.add(os.path.join(root, untracked))
+    return changed, deleted
+
+
+def read_file_at(ref: str, filename: str, root: str) -> Optional[str]:
+    """
+    Read the content of a file as it was at a given ref
+
+    Args:
+        ref: the git ref to read the file from
+        filename: absolute path to the file
+        root: the top level directory of the repository
+
+    Returns:
+        the file content or None if the file did not exist at that ref
+    """
+    relative_path = os.path.relpath(filename, root).replace(os.sep, '/')
+    try:
+        return run_git(['show', f'{ref}:{relative_path}'], root)
+    except subprocess.CalledProcessError:
+        return None
+
+
+def list_files_at(ref: str, path: str, root: str) -> List[Tuple[str, str]]:
+    """
+    List the files under a path as they were at a given ref, without checking it out
+
+    Args:
+        ref: the git ref to list the files of
+        path: absolute path to the directory (or file) to list
+        root: the top level directory of the repository
+
+    Returns:
+        pairs of the blob hash and absolute path of each file, sorted by path
+    """
+    relative_path = os.path.relpath(path, root).replace(os.sep, '/')
+    output = run_git(['ls-tree', '-r', '-z', ref, '--', relative_path], root)
+    files = []
+    for line in output.split('\0'):
+        if not line:
+            continue
+        details, filename = line.split('\t', 1)
+        _, object_type, blob = details.split()
+        if object_type == 'blob':
+            files.append((blob, os.path.join(root, filename)))
+    return sorted(files, key=lambda f: f[1])
+
+
+def read_blobs(blobs: Iterable[str], root: str) -> Dict[str, str]:
+    """
+    Read the content of several blobs from the repository with a single git process
+
+    Args:
+        blobs: the blob hashes
+        root: the top level directory of the repository
+
+    Returns:
+        mapping of blob hash to content
+    """
+    blobs = list(dict.fromkeys(blobs))
+    if not blobs:
+        return {}
+    result = subprocess.run(
+        ['git', 'cat-file', '--batch'],
+        cwd=root,
+        check=True,
+        input=''.join(f'{blob}\n' for blob in blobs).encode('utf8'),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    ).stdout
+
+    contents = {}
+    position = 0
+    for blob in blobs:
+        header_end = result.index(b'\n', position)
+        header = result[position:header_end].decode('utf8').split()
+        if header[-1] == 'missing':
+            raise ValueError(f'missing git object ({blob})')
+        size = int(header[2])
+        contents[blob] = result[header_end + 1 : header_end + 1 + size].decode('utf8')
+        position = header_end + 1 + size + 1  # content is followed by a newline
+    return contents
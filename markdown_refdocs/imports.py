@@ -0,0 +1,305 @@
+import ast
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from .links import collect_type_references, iter_linkable_symbols
+from .types import ParsedModule
+
+
+def get_dotted_name(module_name: str) -> str:
+    """
+    Get the dotted name of a module from the name used for its page
+
+    Examples:
+        >>> get_dotted_name('package/sub/__init__')
+        'package.sub'
+    """
+    if module_name == '__init__' or module_name.endswith('/__init__'):
+        module_name = module_name[: -len('__init__')].rstrip('/')
+    return module_name.replace('/', '.')
+
+
+def get_package_name(module_name: str) -> str:
+    """
+    Get the dotted name of the package relative imports in a module are resolved against
+    """
+    dotted = get_dotted_name(module_name)
+    if module_name == '__init__' or module_name.endswith('/__init__'):
+        return dotted
+    return dotted.rpartition('.')[0]
+
+
+def get_import_base(node: ast.ImportFrom, package: str) -> str:
+    """
+    Get the dotted name of the module a from import imports from, resolving relative imports
+
+    Args:
+        node: the import statement
+        package: the dotted name of the package the module importing is in
+    """
+    if not node.level:
+        return node.module or ''
+    parts = package.split('.') if package else []
+    if node.level > 1:
+        parts = parts[: -(node.level - 1)]
+    return '.'.join(parts + ([node.module] if node.module else []))
+
+
+def _iter_import_statements(body: Iterable[ast.stmt]) -> Iterator[ast.stmt]:
+    # imports run when the module is imported, including conditional ones (ex. TYPE_CHECKING)
+    for node in body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            yield node
+        elif not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            for field in ['body', 'orelse', 'finalbody']:
+                yield from _iter_import_statements(getattr(node, field, []))
+            for handler in getattr(node, 'handlers', []):
+                yield from _iter_import_statements(handler.body)
+
+
+def get_imports(tree: ast.Module, package: str) -> Dict[str, str]:
+    """
+    Get the names the import statements of a module bind and what they refer to
+
+    Star imports are not included since the names they bind can not be known from the module alone.
+    Each name is mapped to the dotted name it refers to (ex. Config to package.models.Config for
+    from .models import Config)
+
+    Args:
+        tree: the parsed module
+        package: the dotted name of the package the module is in (see get_package_name)
+
+    Returns:
+        mapping of the name bound in the module to the dotted name it refers to
+    """
+    imports: Dict[str, str] = {}
+    for node in _iter_import_statements(tree.body):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    imports[alias.asname] = alias.name
+                else:
+                    # import a.b binds a
+                    top_level = alias.name.split('.')[0]
+                    imports[top_level] = top_level
+        else:
+            base = get_import_base(node, package)
+            for alias in node.names:
+                if alias.name != '*':
+                    imports[alias.asname or alias.name] = (
+                        f'{base}.{alias.name}' if base else alias.name
+                    )
+    return imports
+
+
+class ImportGraph:
+    """
+    Resolves the type names used by a module through its own definitions and imports
+
+    A name a module defines or imports refers to that definition, even when other modules of the
+    package define the same name (which create_types_mapping drops as a clash). Imports are
+    followed through other modules of the package (ex. a class re-exported by a package __init__)
+    and resolved names are memoized so each is only followed once per run
+
+    Args:
+        modules: mapping of the output filename (ex. package/module.md) to the parsed module
+    """
+
+    def __init__(self, modules: Dict[str, ParsedModule]):
+        # dotted module name => name => link, for the names the module defines
+        self.definitions: Dict[str, Dict[str, str]] = {}
+        # dotted module name => name => dotted name it refers to, for the names the module imports
+        self.imports: Dict[str, Dict[str, str]] = {}
+        self._resolved: Dict[Tuple[str, str], Optional[str]] = {}
+
+        for path, module in modules.items():
+            dotted = get_dotted_name(module['name'])
+            definitions = self.definitions.setdefault(dotted, {})
+            for short_name, url in iter_linkable_symbols(path, module):
+                definitions.setdefault(short_name, url)
+            self.imports.setdefault(dotted, {}).update(module.get('imports') or {})
+        # the top level packages of the modules (imports from anything else are external)
+        self.roots = {dotted.split('.')[0] for dotted in self.definitions}
+
+    def binds(self, module: str, name: str) -> bool:
+        """
+        Check if a module defines or imports a name (or the first part of a dotted name)
+        """
+        head = name.split('.')[0]
+        return name in self.definitions.get(module, {}) or head in self.imports.get(module, {})
+
+    def is_external(self, module: str, name: str) -> bool:
+        """
+        Check if a name used in a module is imported from outside of the modules
+        """
+        target = self.imports.get(module, {}).get(name.split('.')[0])
+        return target is not None and target.split('.')[0] not in self.roots
+
+    def resolve(self, module: str, name: str) -> Optional[str]:
+        """
+        Get the link for a name as it is used in a module
+
+        Returns:
+            the link or None if the name does not refer to a definition within the modules
+        """
+        key = (module, name)
+        if key in self._resolved:
+            return self._resolved[key]
+        self._resolved[key] = None  # also stops import cycles
+
+        link = None
+        head, _, rest = name.partition('.')
+        imports = self.imports.get(module, {})
+        if name in self.definitions.get(module, {}):
+            link = self.definitions[module][name]
+        elif head in imports:
+            target = imports[head] + (f'.{rest}' if rest else '')
+            link = self._resolve_qualified(target)
+        self._resolved[key] = link
+        return link
+
+    def _resolve_qualified(self, target: str) -> Optional[str]:
+        # split the target at the longest module name (ex. package.models and Config.Options)
+        parts = target.split('.')
+        for end in range(len(parts) - 1, 0, -1):
+            module = '.'.join(parts[:end])
+            if module in self.definitions:
+                return self.resolve(module, '.'.join(parts[end:]))
+        return None
+
+    def get_qualified_links(self) -> Dict[str, str]:
+        """
+        Get the links of the names defined or re-exported by the modules by their qualified name
+
+        Returns:
+            mapping of the dotted name (ex. package.models.Config) to its link
+        """
+        links: Dict[str, str] = {}
+        for module, definitions in self.definitions.items():
+            for name, link in definitions.items():
+                links[f'{module}.{name}'] = link
+        for module, imports in self.imports.items():
+            for name in imports:
+                qualified = f'{module}.{name}'
+                if name.startswith('_') or qualified in links:
+                    continue
+                link = self.resolve(module, name)
+                if link is not None:
+                    links[qualified] = link
+        return links
+
+    def get_overrides(
+        self,
+        parsed: ParsedModule,
+        types_mapping: Mapping,
+        references: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Optional[str]]:
+        """
+        Get the links of a module which differ from the package level mapping
+
+        Names the module imports from outside of the modules (ex. from another project) are mapped
+        to None
+
+        Args:
+            parsed: the parsed module
+            types_mapping: the mapping of type name to link created by create_types_mapping
+            references: the type names the module references, when already collected (see
+                collect_type_references)
+
+        Returns:
+            mapping of the type names the module references to their link
+        """
+        module = get_dotted_name(parsed['name'])
+        overrides: Dict[str, Optional[str]] = {}
+        if references is None:
+            references = collect_type_references(parsed)
+        for name in references:
+            if not name or not self.binds(module, name):
+                continue
+            link = self.resolve(module, name)
+            if link is None and not self.is_external(module, name):
+                continue  # not something which can be linked to (ex. a function)
+            if link != types_mapping.get(name):
+                overrides[name] = link
+        return overrides
+
+
+class ModuleLinks(Mapping):
+    """
+    The package level mapping of type name to link with the links of one module replaced
+
+    Args:
+        types_mapping: the mapping of type name to link created by create_types_mapping
+        overrides: the links of the module which differ (see ImportGraph.get_overrides). Names
+            whose link is None are removed
+    """
+
+    def __init__(self, types_mapping: Mapping, overrides: Dict[str, Optional[str]]):
+        self.types_mapping = types_mapping
+        self.overrides = overrides
+
+    def __getitem__(self, name: str) -> str:
+        if name in self.overrides:
+            link = self.overrides[name]
+            if link is None:
+                raise KeyError(name)
+            return link
+        return self.types_mapping[name]
+
+    def __contains__(self, name: object) -> bool:
+        if name in self.overrides:
+            return self.overrides[name] is not None  # type: ignore
+        return name in self.types_mapping
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self.types_mapping:
+            if name not in self.overrides:
+                yield name
+        for name, link in self.overrides.items():
+            if link is not None:
+                yield name
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class ImportedLinks(Mapping):
+    """
+    The links to other projects for the type names as they are used in one module
+
+    Inventories list qualified names (ex. library.models.Config). The names a module uses are
+    qualified through its imports (ex. Config after from library.models import Config, or
+    models.Config after from library import models) and names the module does not import are only
+    linked when they are already qualified
+
+    Args:
+        external_links: mapping of qualified type name to url (see load_inventories)
+        imports: the names the module imports (see get_imports)
+    """
+
+    def __init__(self, external_links: Mapping, imports: Dict[str, str]):
+        self.external_links = external_links
+        self.imports = imports
+
+    def _qualify(self, name: str) -> str:
+        head, _, rest = name.partition('.')
+        if head in self.imports:
+            return self.imports[head] + (f'.{rest}' if rest else '')
+        return name
+
+    def __getitem__(self, name: str) -> str:
+        return self.external_links[self._qualify(name)]
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self._qualify(name) in self.external_links
+
+    def __iter__(self) -> Iterator[str]:
+        for name, target in self.imports.items():
+            if target in self.external_links:
+                yield name
+        for name in self.external_links:
+            if name.split('.')[0] not in self.imports:
+                yield name
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
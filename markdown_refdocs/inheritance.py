@@ -0,0 +1,241 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+from .imports import get_dotted_name
+from .types import Parsed, ParsedClass, ParsedFunction, ParsedModule
+
+# (output filename of the module, name of the class within the module)
+ClassKey = Tuple[str, str]
+
+
+def get_short_name(module: ParsedModule, cls: ParsedClass) -> str:
+    """
+    Get the name of a class within its module (class names include the module with namespace_headers)
+    """
+    name = cls['name']
+    if name.startswith(f'{module["name"]}.'):
+        return name[len(module['name']) + 1 :]
+    return name
+
+
+def c3_merge(sequences: List[List[ClassKey]]) -> Optional[List[ClassKey]]:
+    """
+    Merge the linearizations of the bases of a class (the C3 algorithm used by python for the MRO)
+
+    Returns:
+        the merged order or None if there is no consistent order
+    """
+    sequences = [list(seq) for seq in sequences if seq]
+    result: List[ClassKey] = []
+    while sequences:
+        for seq in sequences:
+            head = seq[0]
+            if not any(head in other[1:] for other in sequences):
+                break
+        else:
+            return None
+        result.append(head)
+        sequences = [seq[1:] if seq[0] == head else seq for seq in sequences]
+        sequences = [seq for seq in sequences if seq]
+    return result
+
+
+class ClassIndex:
+    """
+    Package-wide index of classes used to resolve base classes and the members they pass down
+
+    Bases given as plain, partially or fully qualified names are resolved against the classes of
+    the package. Bases which are not part of the package (ex. Exception) are ignored. The method
+    resolution order and inherited members of each class are computed once and reused by all of
+    its subclasses
+
+    Args:
+        modules: mapping of output filename (ex. package/module.md) to parsed module
+    """
+
+    def __init__(self, modules: Dict[str, ParsedModule]):
+        self.classes: Dict[ClassKey, ParsedClass] = {}
+        self._modules = modules
+        # qualified name or any of its dotted suffixes => class (None when ambiguous)
+        self._names: Dict[str, Optional[ClassKey]] = {}
+        self._bases: Dict[ClassKey, List[ClassKey]] = {}
+        self._mro: Dict[ClassKey, List[ClassKey]] = {}
+        self._members: Dict[ClassKey, Dict[str, Tuple[ClassKey, Parsed]]] = {}
+        self._inherited_copies: Dict[Tuple[ClassKey, int, str], Parsed] = {}
+
+        for page, module in modules.items():
+            dotted_module = get_dotted_name(module['name'])
+            for cls in module.get('classes', []):
+                short_name = get_short_name(module, cls)
+                key = (page, short_name)
+                self.classes[key] = cls
+                parts = f'{dotted_module}.{short_name}'.split('.')
+                for index in range(len(parts)):
+                    suffix = '.'.join(parts[index:])
+                    self._names[suffix] = None if suffix in self._names else key
+
+        for key, cls in self.classes.items():
+            bases = []
+            for base in cls.get('inherits', []):
+                resolved = self.resolve(str(base), key[0])
+                if resolved is not None and resolved != key and resolved not in bases:
+                    bases.append(resolved)
+            self._bases[key] = bases
+
+    def resolve(self, name: str, page: str) -> Optional[ClassKey]:
+        """
+        Find the class for a base class name used in a module
+
+        Args:
+            name: the base class as written (ex. Base, models.Base or Generic[T])
+            page: the output filename of the module the name is used in
+        """
+        name = name.split('[', 1)[0].strip()
+        if (page, name) in self.classes:
+            return (page, name)
+        return self._names.get(name)
+
+    def mro(self, key: ClassKey) -> List[ClassKey]:
+        """
+        Get the method resolution order of a class (within the package)
+
+        Classes are linearized iteratively in dependency order so that deep hierarchies do not
+        recurse. Cycles and inconsistent hierarchies fall back to a depth-first order
+        """
+        if key in self._mro:
+            return self._mro[key]
+
+        stack = [key]
+        visiting: Set[ClassKey] = set()
+        while stack:
+            current = stack[-1]
+            if current in self._mro:
+                stack.pop()
+                continue
+            bases = self._bases[current]
+            pending = [base for base in bases if base not in self._mro]
+            if pending and current not in visiting:
+                visiting.add(current)
+                if not any(base in visiting for base in pending):
+                    stack.extend(reversed(pending))
+                    continue
+            stack.pop()
+
+            base_orders = [self._mro.get(base, [base]) for base in bases]
+            if len(bases) == 1:
+                order = [current] + [k for k in base_orders[0] if k != current]
+            else:
+                merged = c3_merge(base_orders + [bases])
+                if merged is None:
+                    merged = []
+                    for base_order in base_orders:
+                        merged.extend(k for k in base_order if k not in merged)
+                order = [current] + [k for k in merged if k != current]
+            self._mro[current] = order
+        return self._mro[key]
+
+    def _own_members(self, key: ClassKey) -> Dict[str, Tuple[ClassKey, Parsed]]:
+        cls = self.classes[key]
+        members: Dict[str, Tuple[ClassKey, Parsed]] = {}
+        for attr in cls.get('attributes', []):
+            if not attr.get('hidden', False) and 'inherited_from' not in attr:
+                members[attr['name']] = (key, attr)
+        for func in cls.get('functions', []):
+            name = func['name'].rsplit('.', 1)[-1]
+            if name == '__init__' or func.get('hidden', False) or 'inherited_from' in func:
+                continue
+            members[name] = (key, func)
+        return members
+
+    def members(self, key: ClassKey) -> Dict[str, Tuple[ClassKey, Parsed]]:
+        """
+        Get the public members of a class, including inherited ones, and the classes defining them
+        """
+        if key in self._members:
+            return self._members[key]
+        order = self.mro(key)
+        for current in reversed(order):
+            if current in self._members:
+                continue
+            bases = self._bases[current]
+            if len(bases) == 1 and bases[0] in self._members:
+                # single inheritance extends the members of the base instead of re-walking its MRO
+                members = dict(self._members[bases[0]])
+            else:
+                members = {}
+                for base in reversed(self.mro(current)[1:]):
+                    members.update(self._own_members(base))
+            members.update(self._own_members(current))
+            self._members[current] = members
+        return self._members[key]
+
+    def _inherited_copy(self, key: ClassKey, owner: ClassKey, member: Parsed) -> Parsed:
+        name = member['name']
+        if '.' in name:
+            # methods are named by their class (ex. Base.save is User.save when User inherits it)
+            name = f'{self.classes[key]["name"]}.{name.rsplit(".", 1)[-1]}'
+        # one copy of each attribute is shared by all the classes which inherit it
+        copy_key = (owner, id(member), name)
+        if copy_key not in self._inherited_copies:
+            copy = member.copy()
+            copy['name'] = name
+            copy['inherited_from'] = self.classes[owner]['name']
+            self._inherited_copies[copy_key] = copy
+        return self._inherited_copies[copy_key]
+
+    def inherited_members(self, key: ClassKey) -> List[Parsed]:
+        """
+        Get copies of the members a class inherits, marked with the class they are inherited from
+
+        The copies of methods are named after the class which inherits them
+        """
+        return [
+            self._inherited_copy(key, owner, member)
+            for owner, member in self.members(key).values()
+            if owner != key
+        ]
+
+    def dependencies(self, page: str) -> Set[str]:
+        """
+        Get the output filenames of the modules which define the base classes used by a module
+        """
+        pages = set()
+        for cls in self._modules[page].get('classes', []):
+            key = (page, get_short_name(self._modules[page], cls))
+            pages.update(base[0] for base in self.mro(key)[1:])
+        return pages
+
+
+def add_inherited_members(modules: Dict[str, ParsedModule]) -> Dict[str, ParsedModule]:
+    """
+    Add the inherited attributes and methods to the classes of a package
+
+    The parsed modules are not modified. Modules with classes which inherit members are copied
+
+    Args:
+        modules: mapping of output filename (ex. package/module.md) to parsed module
+
+    Returns:
+        mapping of output filename to (possibly copied) parsed module
+    """
+    index = ClassIndex(modules)
+    result: Dict[str, ParsedModule] = {}
+    for page, module in modules.items():
+        classes = []
+        changed = False
+        for cls in module.get('classes', []):
+            inherited = index.inherited_members((page, get_short_name(module, cls)))
+            if inherited:
+                cls = cls.copy()
+                cls['attributes'] = list(cls.get('attributes', [])) + [
+                    m for m in inherited if not isinstance(m, ParsedFunction)
+                ]
+                cls['functions'] = list(cls.get('functions', [])) + [
+                    m for m in inherited if isinstance(m, ParsedFunction)
+                ]
+                changed = True
+            classes.append(cls)
+        if changed:
+            module = module.copy()
+            module['classes'] = classes
+        result[page] = module
+    return result
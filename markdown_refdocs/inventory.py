@@ -0,0 +1,85 @@
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+INVENTORY_VERSION = 1
+
+
+def parse_inventory_spec(spec: str) -> Tuple[str, Optional[str]]:
+    """
+    Split an inventory argument given as path[=base_url]
+    """
+    if '=' in spec:
+        filename, base_url = spec.split('=', 1)
+        return filename, base_url
+    return spec, None
+
+
+def write_inventory(filename: str, types_mapping: Dict[str, str]) -> None:
+    """
+    Write the symbol inventory for a package so that other projects can link to its pages
+
+    Page paths are stored once and referenced by index from each symbol. Only qualified names are
+    written so that other projects link the names they import from the package rather than any
+    name which happens to match
+
+    Args:
+        filename: the path to write the inventory to
+        types_mapping: mapping of qualified type name to link (see ImportGraph.get_qualified_links)
+    """
+    pages: List[str] = []
+    page_index: Dict[str, int] = {}
+    symbols = []
+
+    for name, link in sorted(types_mapping.items()):
+        path, anchor = link.split('#', 1)
+        # ./package/module.md/ => package/module/
+        page = path[2:] if path.startswith('./') else path
+        if page.endswith('.md/'):
+            page = page[:-4] + '/'
+        if page not in page_index:
+            page_index[page] = len(pages)
+            pages.append(page)
+        symbols.append([name, page_index[page], anchor])
+
+    dirname = os.path.dirname(filename)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    with open(filename, 'w') as fh:
+        json.dump(
+            {'version': INVENTORY_VERSION, 'pages': pages, 'symbols': symbols},
+            fh,
+            separators=(',', ':'),
+        )
+
+
+def load_inventory(filename: str, base_url: Optional[str] = None) -> Dict[str, str]:
+    """
+    Load a symbol inventory written by another project
+
+    Args:
+        filename: the path to the inventory file
+        base_url: the url the other project's reference pages are published under. If not given
+            the links are the page paths relative to the root of those pages
+
+    Returns:
+        mapping of qualified type name to the url of its documentation
+    """
+    with open(filename, 'r') as fh:
+        content = json.load(fh)
+    if content.get('version') != INVENTORY_VERSION:
+        raise ValueError(f'unsupported inventory version ({content.get("version")}) in {filename}')
+
+    prefix = base_url.rstrip('/') + '/' if base_url else ''
+    pages = [f'{prefix}{page}#' for page in content['pages']]
+    return {name: pages[page] + anchor for name, page, anchor in content['symbols']}
+
+
+def load_inventories(specs: List[str]) -> Dict[str, str]:
+    """
+    Load and combine inventories given as path[=base_url]. Earlier inventories take precedence
+    """
+    links: Dict[str, str] = {}
+    for spec in reversed(specs):
+        links.update(load_inventory(*parse_inventory_spec(spec)))
+    return links
@@ -0,0 +1,240 @@
+import mmap
+import struct
+import zlib
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .failures import describe_failure
+from .imports import ImportedLinks, ModuleLinks
+from .links import create_relative_link
+from .markdown import module_to_markdown
+from .types import ParsedModule
+
+LINK_INDEX_MAGIC = b'MRLI'
+LINK_INDEX_VERSION = 1
+
+# the pages sent to a render worker at a time. Pages are small, so sending them one at a time
+# costs more than rendering them
+RENDER_BATCH_SIZE = 32
+
+# magic, version, number of slots, number of entries
+HEADER = struct.Struct('<4sIII')
+# offset of the entry in the file (0 for an empty slot)
+SLOT = struct.Struct('<I')
+# hash of the name, length of the name, length of the link
+ENTRY = struct.Struct('<III')
+
+
+def hash_name(name: bytes) -> int:
+    # stable between processes (unlike hash(), which is randomized per interpreter)
+    return zlib.crc32(name)
+
+
+def write_link_index(types_mapping: Mapping, filename: str) -> None:
+    """
+    Write a mapping of type name to link as a hash table which LinkIndex can read in place
+
+    The table is an open addressing (linear probing) array of entry offsets, at most half full,
+    followed by the entries (the utf8 name and link with their hash)
+
+    Args:
+        types_mapping: mapping of type name to link (ex. from create_types_mapping)
+        filename: where to write the index
+    """
+    slot_count = 8
+    while slot_count < len(types_mapping) * 2:
+        slot_count *= 2
+    mask = slot_count - 1
+
+    slots = [0] * slot_count
+    entries = []
+    offset = HEADER.size + SLOT.size * slot_count
+    for name, link in types_mapping.items():
+        name_bytes = name.encode('utf8')
+        link_bytes = link.encode('utf8')
+        name_hash = hash_name(name_bytes)
+        index = name_hash & mask
+        while slots[index]:
+            index = (index + 1) & mask
+        slots[index] = offset
+        entry = ENTRY.pack(name_hash, len(name_bytes), len(link_bytes)) + name_bytes + link_bytes
+        entries.append(entry)
+        offset += len(entry)
+
+    with open(filename, 'wb') as fh:
+        fh.write(HEADER.pack(LINK_INDEX_MAGIC, LINK_INDEX_VERSION, slot_count, len(entries)))
+        fh.write(b''.join(SLOT.pack(slot) for slot in slots))
+        fh.write(b''.join(entries))
+
+
+class LinkIndex(Mapping):
+    """
+    Read-only mapping of type name to link backed by a memory-mapped file (see write_link_index)
+
+    Names are looked up in the file without loading it, so processes which open the same index
+    share the pages of the file rather than each holding a copy of the mapping. Pickling an index
+    only pickles its filename, for passing it to other processes
+
+    Args:
+        filename: the index written by write_link_index
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        with open(filename, 'rb') as fh:
+            self._data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._slot_count, self._length = HEADER.unpack_from(self._data, 0)
+        if magic != LINK_INDEX_MAGIC or version != LINK_INDEX_VERSION:
+            self._data.close()
+            raise ValueError(f'not a link index (or an unsupported version): {filename}')
+        self._mask = self._slot_count - 1
+
+    def __reduce__(self):
+        return (self.__class__, (self.filename,))
+
+    def close(self) -> None:
+        self._data.close()
+
+    def _slot(self, index: int) -> int:
+        return SLOT.unpack_from(self._data, HEADER.size + SLOT.size * index)[0]
+
+    def _entry(self, offset: int):
+        name_hash, name_length, link_length = ENTRY.unpack_from(self._data, offset)
+        start = offset + ENTRY.size
+        return name_hash, start, name_length, link_length
+
+    def _find(self, name: str) -> Optional[str]:
+        name_bytes = name.encode('utf8')
+        name_hash = hash_name(name_bytes)
+        index = name_hash & self._mask
+        while True:
+            offset = self._slot(index)
+            if not offset:
+                return None
+            entry_hash, start, name_length, link_length = self._entry(offset)
+            if entry_hash == name_hash and self._data[start : start + name_length] == name_bytes:
+                link_start = start + name_length
+                return self._data[link_start : link_start + link_length].decode('utf8')
+            index = (index + 1) & self._mask
+
+    def __getitem__(self, name: str) -> str:
+        link = self._find(name) if isinstance(name, str) else None
+        if link is None:
+            raise KeyError(name)
+        return link
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self._find(name) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self._slot_count):
+            offset = self._slot(index)
+            if offset:
+                _, start, name_length, _ = self._entry(offset)
+                yield self._data[start : start + name_length].decode('utf8')
+
+    def __len__(self) -> int:
+        return self._length
+
+
+class RelativeLinks(Mapping):
+    """
+    The links of a package mapping relative to one of its pages, resolved as they are looked up
+
+    Looks up the same links as create_relative_types_mapping without creating the relative link
+    of every type for every page (only those the page references)
+
+    Args:
+        page: the output filename of the page the links are from (ex. package/module.md)
+        types_mapping: mapping of type name to link within the package (ex. a LinkIndex)
+        external_links: mapping of type name to url for other projects. Types within the package
+            take precedence
+    """
+
+    def __init__(self, page: str, types_mapping: Mapping, external_links: Optional[Mapping] = None):
+        self.page = page
+        self.types_mapping = types_mapping
+        self.external_links = external_links or {}
+        self._relative: Dict[str, str] = {}
+
+    def __getitem__(self, name: str) -> str:
+        if name in self._relative:
+            return self._relative[name]
+        if name in self.types_mapping:
+            link = create_relative_link(self.page, self.types_mapping[name])
+            self._relative[name] = link
+            return link
+        return self.external_links[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.types_mapping or name in self.external_links
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.types_mapping
+        for name in self.external_links:
+            if name not in self.types_mapping:
+                yield name
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+# the indexes opened by a render worker process, by filename
+_worker_indexes: Dict[str, LinkIndex] = {}
+
+
+def _open_worker_index(filename: str) -> LinkIndex:
+    if filename not in _worker_indexes:
+        _worker_indexes[filename] = LinkIndex(filename)
+    return _worker_indexes[filename]
+
+
+def render_pages(
+    pages: List[
+        Tuple[
+            str,
+            str,
+            ParsedModule,
+            Dict[str, Optional[str]],
+            Optional[Dict[str, List[Tuple[str, str]]]],
+        ]
+    ],
+    types_index: str,
+    external_index: str,
+    keep_going: bool = False,
+) -> List[Tuple[Optional[str], Optional[Dict[str, Any]]]]:
+    """
+    Render a batch of pages in a worker process
+
+    Only the filenames of the link indexes are sent with each batch. Each worker opens an index the
+    first time it is used and keeps it open for the batches after it
+
+    Args:
+        pages: the output filename (ex. package/module.md), source filename, parsed module, the
+            links which differ for the module (see ImportGraph.get_overrides) and the backlinks of
+            its classes (see ReferenceIndex.get_backlinks) of each page
+        types_index: the index of the links within the package (see write_link_index)
+        external_index: the index of the links to other projects
+        keep_going: describe the pages which fail to render (see describe_failure) instead of
+            raising
+
+    Returns:
+        the markdown or the failure for each page
+    """
+    types_mapping = _open_worker_index(types_index)
+    external_links = _open_worker_index(external_index)
+    results: List[Tuple[Optional[str], Optional[Dict[str, Any]]]] = []
+    for page, filename, parsed, overrides, backlinks in pages:
+        try:
+            module_links = ModuleLinks(types_mapping, overrides)
+            imported_links = ImportedLinks(external_links, parsed.get('imports') or {})
+            markdown = module_to_markdown(
+                parsed, RelativeLinks(page, module_links, imported_links), backlinks
+            )
+        except Exception as err:
+            if not keep_going:
+                raise
+            results.append((None, describe_failure(page, filename, 'render', err)))
+            continue
+        results.append((markdown, None))
+    return results
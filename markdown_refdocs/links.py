@@ -1,56 +1,145 @@
 import os
 import re
-from typing import Dict, Optional
+from sys import intern
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
 
-from .types import ParsedModule
+from .markdown import TYPE_DELIMITERS
+from .types import Parsed, ParsedClass, ParsedModule, ParsedVariable
+
+
+def iter_linkable_symbols(path: str, module: ParsedModule) -> Iterator[Tuple[str, str]]:
+    """
+    Get the names a module defines which can be linked to (classes and type-like variables)
+
+    Args:
+        path: the output filename of the module (ex. package/module.md)
+        module: the parsed module
+
+    Returns:
+        pairs of the (interned) name and its link
+    """
+    for var in module.get('variables', []):
+        if re.match(r'^[A-Z][a-z]', var['name']):
+            short_name = intern(var['name'])
+            yield short_name, f'./{path}/#{short_name.lower()}'
+
+    for cls in module.get('classes', []):
+        short_name = intern(cls['name'])
+        yield short_name, f'./{path}/#class-{short_name.lower()}'
 
 
 def create_types_mapping(modules: Dict[str, ParsedModule]) -> Dict[str, str]:
     """
     Creates mapping of type name to links
 
+    Names defined by more than one module are dropped (see ImportGraph for resolving them through
+    the imports of the module they are used in)
+
     Note:
         This only links within a package
     """
     simple_mapping: Dict[str, Optional[str]] = {}
     qualified_mapping: Dict[str, Optional[str]] = {}
 
-    def add_to_mappings(path, module: ParsedModule, short_name: str, prefix: str = 'class-'):
-        qualified_name = f'{module["name"]}.{short_name}'
-        url = f'./{path}/#{prefix}{short_name.lower()}'
-
-        if short_name in simple_mapping:
-            simple_mapping[short_name] = None  # drop name clashes
-        else:
-            simple_mapping[short_name] = url
-
-        if qualified_name in qualified_mapping:
-            qualified_mapping[qualified_name] = None  # drop name clashes
-        else:
-            qualified_mapping[qualified_name] = url
-
     for path, module in modules.items():
-        for var in module.get('variables', []):
-            if re.match(r'^[A-Z][a-z]', var['name']):
-                add_to_mappings(path, module, var['name'], '')
+        for short_name, url in iter_linkable_symbols(path, module):
+            qualified_name = intern(f'{module["name"]}.{short_name}')
+
+            if short_name in simple_mapping:
+                simple_mapping[short_name] = None  # drop name clashes
+            else:
+                simple_mapping[short_name] = url
 
-        for cls in module.get('classes', []):
-            add_to_mappings(path, module, cls['name'])
+            if qualified_name in qualified_mapping:
+                qualified_mapping[qualified_name] = None  # drop name clashes
+            else:
+                qualified_mapping[qualified_name] = url
 
     simple_mapping.update(qualified_mapping)
     return {k: v for (k, v) in simple_mapping.items() if v is not None}
 
 
-def create_relative_types_mapping(current_file: str, types_mapping: Dict[str, str]):
-    relative_mapping: Dict[str, str] = {}
+def get_module_symbols(module: ParsedModule) -> ParsedModule:
+    """
+    Copy a parsed module keeping only the parts used by create_types_mapping and ImportGraph
+    """
+    return ParsedModule(
+        {
+            'name': module['name'],
+            'classes': [ParsedClass({'name': cls['name']}) for cls in module.get('classes', [])],
+            'variables': [
+                ParsedVariable({'name': var['name']})
+                for var in module.get('variables', [])
+                if re.match(r'^[A-Z][a-z]', var['name'])
+            ],
+            'imports': module.get('imports') or {},
+        }
+    )
+
+
+def create_relative_link(current_file: str, path_link: str) -> str:
+    """
+    Make a link created by create_types_mapping relative to the page it is used on
+    """
+    original_path, hash_location = path_link.split('#')
+    relative_path = re.sub(r'\.md$', '', os.path.join(os.path.relpath(original_path, current_file)))
+    if relative_path == '.':
+        return f'#{hash_location}'
+    return f'{relative_path}/#{hash_location}'
+
+
+def create_relative_types_mapping(
+    current_file: str, types_mapping: Dict[str, str]
+) -> Dict[str, str]:
+    return {
+        linked_type: create_relative_link(current_file, path_link)
+        for linked_type, path_link in types_mapping.items()
+    }
+
+
+def collect_type_references(module: ParsedModule) -> Set[str]:
+    """
+    Collect the type name tokens a module page could link to
+
+    These are the tokens of all the types which are passed to create_type_link when the module is
+    rendered (parameters, returns, raises, attributes, base classes and the classes members are
+    inherited from)
+    """
+    types = []
+
+    def add_arguments(arguments: Iterable[Parsed]) -> None:
+        for arg in arguments or []:
+            if arg.get('type'):
+                types.append(arg['type'])
+            if arg.get('inherited_from'):
+                types.append(arg['inherited_from'])
+
+    def add_function(func: Parsed) -> None:
+        if func.get('inherited_from'):
+            types.append(func['inherited_from'])
+        add_arguments(func.get('parameters', []))
+        add_arguments(func.get('raises', []))
+        if func.get('returns'):
+            add_arguments([func['returns']])
+
+    for var in module.get('variables', []):
+        add_arguments(var.get('attributes', []))
+    for func in module.get('functions', []):
+        add_function(func)
+    for cls in module.get('classes', []):
+        types.extend(t for t in cls.get('inherits', []) if t)
+        add_arguments(cls.get('attributes', []))
+        for func in cls.get('functions', []):
+            add_function(func)
 
-    for linked_type, path_link in types_mapping.items():
-        original_path, hash_location = path_link.split('#')
-        relative_path = re.sub(
-            r'\.md$', '', os.path.join(os.path.relpath(original_path, current_file))
-        )
-        if relative_path == '.':
-            relative_mapping[linked_type] = f'#{hash_location}'
-        else:
-            relative_mapping[linked_type] = f'{relative_path}/#{hash_location}'
-    return relative_mapping
+    tokens = set()
+    for type_name in types:
+        tokens.update(TYPE_DELIMITERS.split(str(type_name)))
+    return tokens
+
+
+def get_short_names(names: Iterable[str]) -> Set[str]:
+    """
+    Get the last part of dotted type names (ex. Config for models.Config)
+    """
+    return {name.split('.')[-1] for name in names}
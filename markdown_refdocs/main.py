@@ -1,11 +1,49 @@
 import argparse
 import ast
 import os
-from typing import Dict, List, Optional, Tuple, Union, cast
+import re
+import sys
+import tempfile
+from collections import ChainMap
+from concurrent.futures import ProcessPoolExecutor
+from sys import intern
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 
-from .links import create_relative_types_mapping, create_types_mapping
+from .archives import is_source_archive, read_archive_modules
+from .backlinks import ReferenceIndex
+from .cache import ModuleCache
+from .coverage import CoverageError, CoverageReport
+from .expressions import DEFAULT_MAX_EXPRESSION_DEPTH, ExpressionRenderer
+from .failures import describe_failure, load_failure_report, write_failure_report
+from .git import find_changed_files, get_repository_root, read_file_at
+from .inheritance import ClassIndex, add_inherited_members
+from .inventory import load_inventories, write_inventory
+from .imports import ImportGraph, ImportedLinks, ModuleLinks, get_imports, get_package_name
+from .linkindex import RENDER_BATCH_SIZE, RelativeLinks, render_pages, write_link_index
+from .links import (
+    collect_type_references,
+    create_types_mapping,
+    get_module_symbols,
+    get_short_names,
+)
 from .markdown import module_to_markdown
 from .parsers import left_align_block, parse_google_docstring
+from .public import find_public_modules, get_all_names
+from .stubs import extract_docstrings, read_stub
 from .types import (
     ParsedClass,
     ParsedDocstring,
@@ -15,6 +53,8 @@ from .types import (
     ParsedReturn,
     ParsedVariable,
 )
+from .validation import BrokenLinksError, LinkValidator
+from .writers import ARCHIVE_FORMATS, DEFAULT_WRITE_WORKERS, archive_format, create_writer
 
 
 class LinkedAstNode(ast.AST):
@@ -29,18 +69,52 @@ def get_by_name(name: str, list_to_search: List[Dict]) -> Optional[Dict]:
 
 
 def get_lines_covered(node: ast.AST) -> Tuple[int, int]:
-    lines = []
-    if hasattr(node, 'lineno'):
-        lines.append(node.lineno)
-    for n in ast.walk(node):
-        if hasattr(n, 'lineno'):
-            lines.append(n.lineno)
-    return min(lines), max(lines)
+    """
+    Get the first and last line of the source code of a node and its children
+
+    Nodes which have an end position (python 3.8+) contain their children, apart from the
+    decorators of functions and classes which come before them, so only the children of nodes
+    without one are visited. The children are visited from an explicit stack rather than
+    recursively, so deeply nested code can not exceed the recursion limit
+
+    Raises:
+        ValueError: if neither the node nor its children have a position
+    """
+    start: Optional[int] = None
+    end = 0
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        lineno = getattr(current, 'lineno', None)
+        end_lineno = getattr(current, 'end_lineno', None)
+        if lineno is not None:
+            start = lineno if start is None else min(start, lineno)
+            end = max(end, end_lineno or lineno)
+        if end_lineno is None:
+            stack.extend(ast.iter_child_nodes(current))
+        else:
+            stack.extend(getattr(current, 'decorator_list', []))
+    if start is None:
+        raise ValueError('the node does not have a position in the source code')
+    return start, end
+
+
+def get_module_name(filename: str, prefix: str = '') -> str:
+    """
+    Get the name used for a module from its filename and the portion of the path outside the package
+    """
+    name = filename.replace(prefix, '')
+    if name.startswith('/'):
+        name = name[1:]
+    return intern(name.replace('.py', '').replace('.__init__', ''))
 
 
 class ModuleAnalyzer(ast.NodeVisitor):
     """
     Parse a python module into reference docs using the source code and docstrings
+
+    The content analyzed can be a type stub for the module, in which case fallback_docstrings
+    provides the docstrings of the implementation for the definitions the stub does not document
     """
 
     def __init__(
@@ -51,21 +125,52 @@ class ModuleAnalyzer(ast.NodeVisitor):
         hide_undoc: bool = True,
         hide_undoc_args: bool = True,
         namespace_headers: bool = False,
+        content: Optional[str] = None,
+        max_constant_lines: Optional[int] = None,
+        max_constant_bytes: Optional[int] = None,
+        public_api: bool = False,
+        public_names: Optional[Iterable[str]] = None,
+        fallback_docstrings: Optional[Callable[[], Dict[str, str]]] = None,
+        max_expression_depth: int = DEFAULT_MAX_EXPRESSION_DEPTH,
     ):
         print('processing module', filename)
-        name = filename.replace(prefix, '')
-        if name.startswith('/'):
-            name = name[1:]
-
-        self.name = name.replace('.py', '').replace('.__init__', '')
+        self.name = get_module_name(filename, prefix)
         self.hide_private = hide_private
         self.hide_undoc = hide_undoc
         self.hide_undoc_args = hide_undoc_args
         self.namespace_headers = namespace_headers
-
-        with open(filename, "r") as source:
-            self.content = source.read()
-            self.lines = self.content.split('\n')
+        self.max_constant_lines = max_constant_lines
+        self.max_constant_bytes = max_constant_bytes
+        self.public_api = public_api
+        self.public_names = None if public_names is None else frozenset(public_names)
+        self.fallback_docstrings = fallback_docstrings
+        self._fallback_docstrings: Optional[Dict[str, str]] = None
+
+        if content is None:
+            with open(filename, "r") as source:
+                content = source.read()
+        self.content = content
+        self.lines = self.content.split('\n')
+        self.expressions = ExpressionRenderer(self.lines, max_expression_depth)
+
+    def render_annotation(self, node: Optional[ast.AST]) -> Optional[str]:
+        return self.expressions.render(node, annotation=True)
+
+    def get_docstring(self, node: LinkedAstNode) -> Optional[str]:
+        """
+        Get the docstring of a module, class or function, from the implementation when analyzing a
+        stub which does not document it
+        """
+        docstring = ast.get_docstring(node)
+        if docstring or self.fallback_docstrings is None:
+            return docstring
+        if self._fallback_docstrings is None:
+            self._fallback_docstrings = self.fallback_docstrings()  # only read when needed
+        names = []
+        while not isinstance(node, ast.Module):
+            names.append(node.name)
+            node = node.parent
+        return self._fallback_docstrings.get('.'.join(reversed(names)))
 
     def get_qualified_name(self, node: LinkedAstNode, name: str) -> Optional[str]:
         parents = []
@@ -81,7 +186,7 @@ class ModuleAnalyzer(ast.NodeVisitor):
             except Exception:
                 break
         parents.reverse()
-        return '.'.join(parents + [name])
+        return intern('.'.join(parents + [name]))
 
     def get_source_segment(self, node: ast.AST, expected_end_char: str = None) -> str:
         # only builtin  in py3.8+ so re-implemented here
@@ -92,6 +197,81 @@ class ModuleAnalyzer(ast.NodeVisitor):
             content = '\n'.join(self.lines[start - 1 : end])
         return content
 
+    def find_closing_line(self, node: Union[ast.Assign, ast.AnnAssign], end: int) -> int:
+        """
+        Find the line which closes the brackets of an assigned value (before python 3.8)
+
+        The last child of a dict, list, set, tuple or call is not always on the line of the closing
+        bracket (ex. with a trailing comma), so the lines after it are searched up to the next
+        statement
+
+        Args:
+            node: the assignment
+            end: the last line of the children of the node
+        """
+        closing = {ast.Dict: '}', ast.Set: '}', ast.List: ']', ast.Tuple: ')', ast.Call: ')'}.get(
+            type(node.value)
+        )
+        if closing is None:
+            return end
+        if isinstance(node.value, ast.Tuple):
+            # only a parenthesized tuple has a closing bracket (its position is its first element)
+            value = node.value
+            before = self.lines[node.lineno - 1 : value.lineno - 1]
+            before.append(self.lines[value.lineno - 1][: value.col_offset])
+            if not ''.join(line.split('#')[0] for line in before).rstrip().endswith('('):
+                return end
+
+        limit = len(self.lines)
+        for sibling in getattr(getattr(node, 'parent', None), 'body', []):
+            first = min(
+                [sibling.lineno] + [d.lineno for d in getattr(sibling, 'decorator_list', [])]
+            )
+            if first > node.lineno:
+                limit = min(limit, first - 1)
+        for lineno in range(end, limit + 1):
+            line = self.lines[lineno - 1]
+            if line.rstrip().endswith(closing) or line.split('#')[0].rstrip().endswith(closing):
+                return lineno
+        return end
+
+    def get_constant_segment(self, node: Union[ast.Assign, ast.AnnAssign]) -> str:
+        """
+        Get the source code lines of a variable assignment, truncated to the constant size limits
+
+        Only the lines which will be kept are read so that huge generated tables are never copied
+        """
+        end = getattr(node, 'end_lineno', None)
+        if end is not None:
+            start = node.lineno
+        else:
+            # before python 3.8 the last line must be found from the children of the node
+            start, end = get_lines_covered(node)
+            end = self.find_closing_line(node, end)
+
+        stop = end
+        if self.max_constant_lines and end - start + 1 > self.max_constant_lines:
+            stop = start - 1 + self.max_constant_lines
+        if self.max_constant_bytes:
+            size = 0
+            for index in range(start - 1, stop):
+                size += len(self.lines[index].encode('utf8')) + 1
+                if size > self.max_constant_bytes:
+                    stop = index
+                    break
+
+        if stop >= end:
+            return left_align_block('\n'.join(self.lines[start - 1 : end]))
+
+        first_line = self.lines[start - 1]
+        lines = self.lines[start - 1 : stop]
+        if not lines:
+            # the first line alone is over the size limit
+            lines = [first_line[: self.max_constant_bytes]]
+        indent = re.match(r'\s*', first_line).group(0)  # type: ignore
+        lines.append(f'{indent}# ... truncated ({end - stop} more lines)')
+        return left_align_block('\n'.join(lines))
+
     def get_function_def_segment(self, node: ast.FunctionDef) -> str:
         """
         Get the source code lines covering the function defintion
@@ -120,6 +300,11 @@ class ModuleAnalyzer(ast.NodeVisitor):
 
         return left_align_block(content)
 
+    def generic_visit(self, node: ast.AST) -> None:
+        # nodes without a visitor are not documented. Walking into them (ex. a module level
+        # expression statement or if test) would recurse once per level of nesting
+        return None
+
     def visit_ClassDef(self, node: ast.ClassDef) -> ParsedClass:
         """convert a class into markdown"""
         result = ParsedClass(
@@ -128,12 +313,12 @@ class ModuleAnalyzer(ast.NodeVisitor):
                 'description': '',
                 'attributes': [],
                 'functions': [],
-                'inherits': [self.visit(b) for b in node.bases],
+                'inherits': [self.render_annotation(b) for b in node.bases],
                 'hidden': False,
             }
         )
         doc = parse_google_docstring(
-            ast.get_docstring(node), self.hide_undoc_args, self.get_qualified_name(node, node.name)
+            self.get_docstring(node), self.hide_undoc_args, self.get_qualified_name(node, node.name)
         )
         result.update(
             {d: doc[d] for d in doc if d not in ['parameters', 'raises', 'returns', 'attributes']}
@@ -159,7 +344,7 @@ class ModuleAnalyzer(ast.NodeVisitor):
 
     def visit_FunctionDef(self, node: ast.FunctionDef) -> ParsedFunction:
         """convert a function into markdown"""
-        decorators = [self.visit(d) for d in node.decorator_list]
+        decorators = [self.expressions.render(d) for d in node.decorator_list]
         result = ParsedFunction(
             {
                 'name': self.get_qualified_name(node, node.name),
@@ -188,7 +373,7 @@ class ModuleAnalyzer(ast.NodeVisitor):
         )
 
         doc = parse_google_docstring(
-            ast.get_docstring(node), self.hide_undoc_args, self.get_qualified_name(node, node.name)
+            self.get_docstring(node), self.hide_undoc_args, self.get_qualified_name(node, node.name)
         )
         result.update({d: doc[d] for d in doc if d != 'parameters'})
 
@@ -196,7 +381,7 @@ class ModuleAnalyzer(ast.NodeVisitor):
 
         if class_parent and node.name == '__init__':
             class_doc = parse_google_docstring(
-                ast.get_docstring(node.parent),
+                self.get_docstring(node.parent),
                 self.hide_undoc_args,
                 self.get_qualified_name(node, node.name),
             )
@@ -213,8 +398,9 @@ class ModuleAnalyzer(ast.NodeVisitor):
 
         # mix the python built-in annotations with the docstring ones
         result['returns'].update(doc['returns'])
-        parsed_return = self.visit(node.returns)
-        if parsed_return:
+        parsed_return = self.render_annotation(node.returns)
+        # a function annotated as returning None does not return anything to document
+        if parsed_return and parsed_return != 'None':
             result['returns']['type'] = parsed_return
 
         for index, arg in enumerate(node.args.args):
@@ -235,9 +421,9 @@ class ModuleAnalyzer(ast.NodeVisitor):
                 defn.update(function_arg_doc)
 
             if index >= diff:
-                defn['default_value'] = self.visit(defaults[index - diff])
+                defn['default_value'] = self.expressions.render(defaults[index - diff])
             if arg.annotation:
-                defn['type'] = self.visit(arg.annotation)
+                defn['type'] = self.render_annotation(arg.annotation)
 
             result['parameters'].append(defn)
 
@@ -257,20 +443,41 @@ class ModuleAnalyzer(ast.NodeVisitor):
                 'functions': functions,
                 'classes': classes,
                 'hidden': False,
-                'description': ast.get_docstring(node) or '',
+                'description': self.get_docstring(node) or '',
             }
         )
         node.name = self.name
+        imports = get_imports(node, get_package_name(self.name))
+        if imports:
+            result['imports'] = imports
 
         # register parents
         for subnode in ast.walk(node):
             for child in ast.iter_child_nodes(subnode):
                 child.parent = subnode
 
+        public_names = self.public_names
+        if public_names is None and self.public_api:
+            all_names = get_all_names(node)
+            public_names = frozenset(all_names) if all_names is not None else None
+
         for elem in node.body:
+            if (
+                public_names is not None
+                and isinstance(elem, (ast.ClassDef, ast.FunctionDef))
+                and elem.name not in public_names
+            ):
+                continue
             subnode = self.visit(elem)
             if not subnode:
                 continue
+            if public_names is not None and isinstance(elem, (ast.Assign, ast.AnnAssign)):
+                if isinstance(elem, ast.Assign):
+                    subnode = [v for v in subnode if v['name'] in public_names]
+                    if not subnode:
+                        continue
+                elif subnode['name'] not in public_names:
+                    continue
             if isinstance(elem, ast.ClassDef):
                 classes.append(cast(ParsedClass, subnode))
             elif isinstance(elem, ast.FunctionDef):
@@ -280,76 +487,32 @@ class ModuleAnalyzer(ast.NodeVisitor):
             elif isinstance(elem, ast.AnnAssign):
                 constants.append(cast(ParsedVariable, subnode))
 
-        module_docstring = ast.get_docstring(node)
+        module_docstring = self.get_docstring(node)
         if not classes and not functions and not module_docstring and self.hide_undoc:
             result['hidden'] = True
 
         return result
 
-    def visit_Name(self, node: ast.Name) -> str:
-        return node.id
-
-    def visit_Constant(self, node: ast.Constant) -> str:
-        return node.value
-
-    def visit_Str(self, node: ast.Str) -> str:
-        return node.s
-
-    def visit_NoneType(self, node: None) -> None:
-        return node
-
-    def visit_Tuple(self, node: ast.Tuple) -> str:
-        content = ', '.join([str(self.visit(e)) for e in node.elts])
-        return content
-
-    def visit_List(self, node: ast.List) -> str:
-        content = ', '.join([str(self.visit(e)) for e in node.elts])
-        return f'[{content}]'
-
-    def visit_Subscript(self, node: ast.Subscript) -> str:
-        try:
-            inner = self.visit(node.slice.value)  # python 3.9+ this was changed
-        except AttributeError:
-            inner = self.visit(node.slice)
-        return f'{self.visit(node.value)}[{inner}]'
-
     def visit_Assign(self, node: ast.Assign) -> List[ParsedVariable]:
-        expected_end_char = None
-
-        if isinstance(node.value, ast.List):
-            expected_end_char = ']'
-        elif isinstance(node.value, ast.Call):
-            expected_end_char = ')'
+        # shared by all the targets of a chained assignment (a = b = ...)
+        source_code = self.get_constant_segment(node)
 
         result: List[ParsedVariable] = []
         for target in node.targets:
             result.append(
                 ParsedVariable(
-                    {
-                        'name': self.visit(target),
-                        'source_code': left_align_block(
-                            self.get_source_segment(node, expected_end_char)
-                        ),
-                    }
+                    {'name': self.expressions.render(target), 'source_code': source_code}
                 )
             )
         return result
 
     def visit_AnnAssign(self, node: ast.AnnAssign) -> List[Union[ParsedVariable, ParsedClass]]:
-        expected_end_char = None
-
-        if isinstance(node.value, ast.List):
-            expected_end_char = ']'
-        elif isinstance(node.value, ast.Call):
-            expected_end_char = ')'
-
-        if self.visit(node.annotation) == 'TypedDict':
+        annotation = self.render_annotation(node.annotation)
+        if annotation == 'TypedDict':
             return ParsedClass(
                 {
-                    'name': self.visit(node.target),
-                    'source_code': left_align_block(
-                        self.get_source_segment(node, expected_end_char)
-                    ),
+                    'name': self.expressions.render(node.target),
+                    'source_code': self.get_constant_segment(node),
                     'attributes': self.visit(node.value),
                     'type': 'TypedDict',
                 }
@@ -357,25 +520,18 @@ class ModuleAnalyzer(ast.NodeVisitor):
 
         return ParsedVariable(
             {
-                'name': self.visit(node.target),
-                'source_code': left_align_block(self.get_source_segment(node, expected_end_char)),
-                'type': self.visit(node.annotation),
+                'name': self.expressions.render(node.target),
+                'source_code': self.get_constant_segment(node),
+                'type': annotation,
             }
         )
 
-    def visit_Attribute(self, node: ast.Attribute) -> str:
-        name = self.visit(node.value)
-
-        if node.attr:
-            return f'{name}.{node.attr}'
-        return name
-
     def visit_Call(self, node: ast.Call) -> List[ParsedVariable]:
-        name = self.visit(node.func)
+        name = self.expressions.render(node.func)
         if name == 'TypedDict':
             attributes = node.args[1]
-            keys = [self.visit(k) for k in attributes.keys]
-            values = [self.visit(v) for v in attributes.values]
+            keys = [self.render_annotation(k) for k in attributes.keys]
+            values = [self.render_annotation(v) for v in attributes.values]
             return [ParsedVariable({'name': k, 'type': v}) for (k, v) in zip(keys, values)]
         return []
 
@@ -387,6 +543,14 @@ def parse_module_file(
     hide_undoc: bool = True,
     hide_undoc_args: bool = True,
     namespace_headers: bool = False,
+    content: Optional[str] = None,
+    max_constant_lines: Optional[int] = None,
+    max_constant_bytes: Optional[int] = None,
+    public_api: bool = False,
+    public_names: Optional[Iterable[str]] = None,
+    prefer_stubs: bool = False,
+    stub: Optional[str] = None,
+    max_expression_depth: int = DEFAULT_MAX_EXPRESSION_DEPTH,
 ) -> ParsedModule:
     """
     convert a module into markdown
@@ -397,10 +561,35 @@ def parse_module_file(
         hide_private: hide privated functions, do not document (does not apply to __init__)
         hide_undoc: exclude undocumented functions (no docstring)
         hide_undoc_args: do not list arguments with neither type nor description
+        content: the source code of the module, read from filename when not given
+        max_constant_lines: truncate the source code shown for variables to this many lines
+        max_constant_bytes: truncate the source code shown for variables to this many bytes
+        public_api: only document the names listed in the __all__ of the module, if it has one
+        public_names: only document these top-level names (see find_public_modules)
+        prefer_stubs: document the type stub next to the module file (module.pyi) instead of the
+            module, if it has one. Only read from disk when content is not given
+        stub: the source of the type stub to document instead of the module. Docstrings missing
+            from the stub are taken from the module, which is only read if needed
+        max_expression_depth: show types and default values nested deeper than this as their
+            source code instead of rendering them
 
     Returns:
         the markdown string for this module
     """
+    fallback_docstrings: Optional[Callable[[], Dict[str, str]]] = None
+    if stub is None and prefer_stubs and content is None:
+        stub = read_stub(filename)
+    if stub is not None:
+        implementation = content
+
+        def read_implementation_docstrings() -> Dict[str, str]:
+            if implementation is not None:
+                return extract_docstrings(implementation)
+            with open(filename, 'r') as fh:
+                return extract_docstrings(fh.read())
+
+        fallback_docstrings = read_implementation_docstrings
+        content = stub
 
     analyzer = ModuleAnalyzer(
         filename,
@@ -409,12 +598,544 @@ def parse_module_file(
         hide_undoc=hide_undoc,
         hide_undoc_args=hide_undoc_args,
         namespace_headers=namespace_headers,
+        content=content,
+        max_constant_lines=max_constant_lines,
+        max_constant_bytes=max_constant_bytes,
+        public_api=public_api,
+        public_names=public_names,
+        fallback_docstrings=fallback_docstrings,
+        max_expression_depth=max_expression_depth,
     )
     tree = ast.parse(analyzer.content)
     content = analyzer.visit(tree)
     return content
 
 
+def find_module_files(path: str) -> Tuple[str, List[str]]:
+    """
+    Find the python files for a package directory (or single module file)
+
+    Args:
+        path: the package directory or module file
+
+    Returns:
+        the prefix (the portion of the path that is not part of the package) and the module files
+    """
+    if path.endswith('/'):
+        path = path[:-1]
+
+    package = os.path.basename(path)
+    prefix = path[0 : len(path) - len(package)]
+    files = []
+    if os.path.isfile(path):
+        files.append(path)
+    else:
+        for root, dirs, walkfiles in os.walk(path):
+            dirs.sort()  # walk in a stable order so output is reproducible
+            files.extend([os.path.join(root, w) for w in sorted(walkfiles) if w.endswith('.py')])
+    return prefix, files
+
+
+def find_changed_modules(since: str, path: str) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Find the modules of a package which changed in its git repository since a given ref
+
+    Args:
+        since: the git ref to compare against
+        path: the package directory or module file
+
+    Returns:
+        the changed (or added) and the deleted modules, by output filename (ex. package/module.md)
+    """
+    if path.endswith('/'):
+        path = path[:-1]
+    path = os.path.realpath(path)
+    package_prefix = os.path.dirname(path)
+    changed, deleted = find_changed_files(since, path)
+
+    def to_pages(filenames: Set[str]) -> Dict[str, str]:
+        pages = {}
+        for filename in filenames:
+            if not filename.endswith('.py'):
+                continue
+            if filename != path and not filename.startswith(path + os.sep):
+                continue
+            page = os.path.relpath(filename, package_prefix).replace(os.sep, '/')
+            pages[page[:-3] + '.md'] = filename
+        return pages
+
+    return to_pages(changed), to_pages(deleted)
+
+
+def render_modules(
+    modules: Iterable[Tuple[str, ParsedModule]],
+    link: bool = False,
+    pages: Optional[Set[str]] = None,
+    external_links: Optional[Dict[str, str]] = None,
+    cache: Optional[ModuleCache] = None,
+    inherited_members: bool = False,
+    failures: Optional[List[Dict[str, Any]]] = None,
+    validator: Optional[LinkValidator] = None,
+    render_workers: int = 1,
+    backlinks: bool = False,
+    filenames: Optional[Dict[str, str]] = None,
+) -> Iterator[Tuple[str, ParsedModule, str]]:
+    """
+    Render parsed modules to markdown, skipping hidden modules
+
+    Modules are consumed lazily unless linking or adding inherited members, which need every module
+    of the package parsed before the first page can be rendered. When linking, the type names used
+    by a module are resolved through its imports (see ImportGraph) before the package level mapping
+
+    Args:
+        modules: pairs of the output filename (relative, ex. package/module.md) and parsed module
+        link: create links between types within the modules
+        pages: only render the modules with these output filenames (all other modules are still
+            used for linking)
+        external_links: mapping of qualified type name to url for types documented by other
+            projects, linked where the modules import them (see ImportedLinks). Types within the
+            modules take precedence
+        cache: reuse the markdown rendered by a previous run for pages whose module and links have
+            not changed
+        inherited_members: document the attributes and methods classes inherit from the other
+            classes of the modules
+        failures: when given, pages which fail to render are added to this list (see
+            describe_failure) and skipped instead of raising
+        validator: collects the anchors and links of the pages to check the links between them.
+            The anchors of the pages not rendered (see pages) are also collected
+        render_workers: render the pages in this many processes (1 renders them in this process).
+            The links are written to memory-mapped indexes (see write_link_index) which the
+            workers share rather than being sent with each page. Pages are still returned in order
+        backlinks: list the functions, methods and attributes which reference each class on its
+            page (see ReferenceIndex). Requires link
+        filenames: the source filename of each module by output filename, for the failures. The
+            output filename is used for modules without one
+
+    Returns:
+        tuples of the output filename, parsed module and markdown for the module
+    """
+    if filenames is None:
+        filenames = {}
+    type_mapping: Dict[str, str] = {}
+    graph: Optional[ImportGraph] = None
+    references: Optional[ReferenceIndex] = None
+    # output filename => the links which differ for the module (see ImportGraph.get_overrides)
+    overrides: Dict[str, Dict[str, Optional[str]]] = {}
+
+    def get_overrides(module_filename: str, parsed: ParsedModule) -> Dict[str, Optional[str]]:
+        if graph is None:
+            return {}
+        if module_filename not in overrides:
+            overrides[module_filename] = graph.get_overrides(parsed, type_mapping)
+        return overrides[module_filename]
+
+    if inherited_members:
+        modules = list(add_inherited_members(dict(modules)).items())
+    if link:
+        modules = list(modules)
+        type_mapping = create_types_mapping(dict(modules))
+        graph = ImportGraph(dict(modules))
+        if backlinks:
+            references = ReferenceIndex()
+            for module_filename, parsed in modules:
+                module_links = ModuleLinks(type_mapping, get_overrides(module_filename, parsed))
+                references.add_module(module_filename, parsed, module_links)
+            references.build()
+    if render_workers > 1:
+        yield from _render_modules_in_workers(
+            modules,
+            type_mapping,
+            get_overrides,
+            references,
+            render_workers,
+            pages=pages,
+            external_links=external_links,
+            cache=cache,
+            failures=failures,
+            validator=validator,
+            filenames=filenames,
+        )
+        return
+
+    def render(
+        module_filename: str,
+        parsed: ParsedModule,
+        module_links: Mapping,
+        page_backlinks: Optional[Dict[str, List[Tuple[str, str]]]],
+    ) -> str:
+        imported_links = ImportedLinks(external_links or {}, parsed.get('imports') or {})
+        return module_to_markdown(
+            parsed, RelativeLinks(module_filename, module_links, imported_links), page_backlinks
+        )
+
+    for module_filename, parsed in modules:
+        if parsed.get('hidden', False):
+            continue
+        if pages is not None and module_filename not in pages:
+            if validator is not None:
+                validator.add_page(module_filename, parsed)  # written by a previous run
+            continue
+        try:
+            module_links = ModuleLinks(type_mapping, get_overrides(module_filename, parsed))
+            page_backlinks = (
+                references.get_backlinks(module_filename, parsed)
+                if references is not None
+                else None
+            )
+            if cache is None:
+                markdown = render(module_filename, parsed, module_links, page_backlinks)
+            else:
+                links = ChainMap(
+                    module_links, ImportedLinks(external_links or {}, parsed.get('imports') or {})
+                )
+                markdown = cache.render(
+                    module_filename,
+                    parsed,
+                    links,  # type: ignore
+                    lambda: render(module_filename, parsed, module_links, page_backlinks),
+                    backlinks=page_backlinks,
+                )
+        except Exception as err:
+            if failures is None:
+                raise
+            filename = filenames.get(module_filename, module_filename)
+            failures.append(describe_failure(module_filename, filename, 'render', err))
+            continue
+        if validator is not None:
+            validator.add_page(module_filename, parsed, markdown)
+        yield module_filename, parsed, markdown
+
+
+def _render_modules_in_workers(
+    modules: Iterable[Tuple[str, ParsedModule]],
+    type_mapping: Dict[str, str],
+    get_overrides: Callable[[str, ParsedModule], Dict[str, Optional[str]]],
+    references: Optional[ReferenceIndex],
+    render_workers: int,
+    pages: Optional[Set[str]] = None,
+    external_links: Optional[Dict[str, str]] = None,
+    cache: Optional[ModuleCache] = None,
+    failures: Optional[List[Dict[str, Any]]] = None,
+    validator: Optional[LinkValidator] = None,
+    filenames: Optional[Dict[str, str]] = None,
+) -> Iterator[Tuple[str, ParsedModule, str]]:
+    """
+    Render the modules for render_modules in a pool of worker processes
+    """
+    if filenames is None:
+        filenames = {}
+    # the pages to return, with the links which differ for the module (see ImportGraph), the
+    # backlinks of its classes and the markdown if it was reused from the cache
+    entries: List[
+        Tuple[
+            str,
+            ParsedModule,
+            Dict[str, Optional[str]],
+            Optional[Dict[str, List[Tuple[str, str]]]],
+            Optional[str],
+        ]
+    ] = []
+    for module_filename, parsed in modules:
+        if parsed.get('hidden', False):
+            continue
+        if pages is not None and module_filename not in pages:
+            if validator is not None:
+                validator.add_page(module_filename, parsed)  # written by a previous run
+            continue
+        overrides = get_overrides(module_filename, parsed)
+        page_backlinks = (
+            references.get_backlinks(module_filename, parsed) if references is not None else None
+        )
+        markdown = None
+        if cache is not None:
+            links = ChainMap(
+                ModuleLinks(type_mapping, overrides),
+                ImportedLinks(external_links or {}, parsed.get('imports') or {}),
+            )
+            markdown = cache.get_markdown(
+                module_filename, parsed, links, backlinks=page_backlinks  # type: ignore
+            )
+        entries.append((module_filename, parsed, overrides, page_backlinks, markdown))
+    to_render = [
+        (page, filenames.get(page, page), parsed, overrides, page_backlinks)
+        for page, parsed, overrides, page_backlinks, markdown in entries
+        if markdown is None
+    ]
+
+    with tempfile.TemporaryDirectory(prefix='refdocs-links-') as dirname:
+        types_index = os.path.join(dirname, 'types.links')
+        external_index = os.path.join(dirname, 'external.links')
+        write_link_index(type_mapping, types_index)
+        write_link_index(external_links or {}, external_index)
+
+        with ProcessPoolExecutor(max_workers=render_workers) as executor:
+            futures = [
+                executor.submit(
+                    render_pages,
+                    to_render[start : start + RENDER_BATCH_SIZE],
+                    types_index,
+                    external_index,
+                    keep_going=failures is not None,
+                )
+                for start in range(0, len(to_render), RENDER_BATCH_SIZE)
+            ]
+            # the rendered pages in the order they were submitted
+            rendered = (result for future in futures for result in future.result())
+            try:
+                for module_filename, parsed, overrides, page_backlinks, markdown in entries:
+                    module_links = ModuleLinks(type_mapping, overrides)
+                    if markdown is None:
+                        markdown, failure = next(rendered)
+                        if failure is not None:
+                            failures.append(failure)  # type: ignore
+                            continue
+                        if cache is not None:
+                            links = ChainMap(
+                                module_links,
+                                ImportedLinks(external_links or {}, parsed.get('imports') or {}),
+                            )
+                            cache.set_markdown(
+                                module_filename,
+                                parsed,
+                                links,  # type: ignore
+                                markdown,
+                                backlinks=page_backlinks,
+                            )
+                    if validator is not None:
+                        validator.add_page(module_filename, parsed, markdown)
+                    yield module_filename, parsed, markdown  # type: ignore
+            finally:
+                # do not wait for the pages nobody will use (ex. after an error)
+                for future in futures:
+                    future.cancel()
+
+
+def iter_markdown(
+    paths: List[str],
+    link: bool = False,
+    since: Optional[str] = None,
+    external_links: Optional[Dict[str, str]] = None,
+    cache: Optional[ModuleCache] = None,
+    inherited_members: bool = False,
+    failures: Optional[List[Dict[str, Any]]] = None,
+    retry: Optional[Iterable[str]] = None,
+    validator: Optional[LinkValidator] = None,
+    coverage: Optional[CoverageReport] = None,
+    render_workers: int = 1,
+    backlinks: bool = False,
+    changes: Optional[Dict[str, Tuple[Dict[str, str], Dict[str, str]]]] = None,
+    **parse_options,
+) -> Iterator[Tuple[str, ParsedModule, str]]:
+    """
+    Generate the markdown pages for python packages without writing anything to disk
+
+    Args:
+        paths: path(s) to python package directories or modules to pull docstrings from. Wheels,
+            sdists and zips (.whl, .zip, .tar.gz or .tgz) are read without extracting them
+        link: create links between types within each package
+        since: only generate the pages for modules which changed since this git ref. When linking,
+            pages which reference the types defined in (or removed from) the changed modules are
+            also generated, as are the pages of subclasses when adding inherited members
+        external_links: mapping of type name to url for types documented by other projects (see
+            load_inventories)
+        cache: reuse the parsed modules and rendered pages of previous runs where possible
+        inherited_members: document the attributes and methods classes inherit from the other
+            classes of the same package
+        failures: when given, modules which fail to parse or render are added to this list (see
+            describe_failure) and skipped instead of raising
+        retry: only generate these pages (ex. the pages which failed in a previous run). As with
+            since, pages which link to (or inherit from) them are also generated
+        validator: collects the anchors and links of the pages to check the links between them
+        coverage: counts the documented and undocumented symbols of the modules as they are parsed
+        render_workers: render the pages of each package in this many processes
+        backlinks: list the functions, methods and attributes which reference each class on its
+            page. Requires link
+        changes: when given with since, the changed and deleted modules found for each path are
+            added to this (see find_changed_modules)
+        parse_options: options passed to parse_module_file (ex. hide_private)
+
+    Returns:
+        tuples of the relative output filename (ex. package/module.md), parsed module and markdown
+    """
+    if since and retry is not None:
+        raise ValueError('since and retry can not be used together')
+    if coverage is not None and (since or retry is not None):
+        raise ValueError('the coverage of all the modules is needed (not only changed or retried)')
+    retry_pages = set(retry) if retry is not None else None
+
+    public: Dict[str, Optional[FrozenSet[str]]] = {}
+    # filename => source, for the modules read from an archive
+    sources: Dict[str, str] = {}
+    # output filename => source filename, for the failures
+    filenames: Dict[str, str] = {}
+
+    def parse(filename: str, prefix: str, content: Optional[str] = None) -> ParsedModule:
+        options = dict(parse_options, public_names=public.get(filename))
+        if cache is not None and content is None:
+            stub = (
+                read_stub(filename) if parse_options.get('prefer_stubs') and not sources else None
+            )
+            return cache.parse(
+                filename[len(prefix) :].replace('.py', '.md'),
+                filename,
+                lambda source: parse_module_file(
+                    filename, prefix, content=source, stub=stub, **options
+                ),
+                dict(options, stub=stub),
+                content=sources.get(filename),
+            )
+        if content is None:
+            content = sources.get(filename)
+        return parse_module_file(filename, prefix, content=content, **options)
+
+    def parse_files(files: List[str], prefix: str) -> Iterator[Tuple[str, ParsedModule]]:
+        for filename in files:
+            module_filename = filename[len(prefix) :].replace('.py', '.md')
+            filenames[module_filename] = filename
+            try:
+                parsed = parse(filename, prefix)
+            except Exception as err:
+                if failures is None:
+                    raise
+                failures.append(describe_failure(module_filename, filename, 'parse', err))
+                continue
+            if coverage is not None:
+                coverage.add_module(parsed)
+            yield module_filename, parsed
+
+    for path in paths:
+        if is_source_archive(path):
+            if since:
+                raise ValueError(
+                    f'only updating changed pages is not supported for archives ({path})'
+                )
+            prefix, sources = read_archive_modules(path)
+            files = list(sources)
+        else:
+            prefix, files = find_module_files(path)
+            sources = {}
+        pages: Optional[Set[str]] = None
+
+        if parse_options.get('public_api'):
+            public = find_public_modules(
+                prefix, files, read=sources.__getitem__ if sources else None
+            )
+            files = list(public)
+
+        changed: Dict[str, str] = {}
+        deleted: Dict[str, str] = {}
+        if since:
+            changed, deleted = find_changed_modules(since, path)
+            if changes is not None:
+                changes[path] = (changed, deleted)
+        elif retry_pages is not None:
+            for filename in files:
+                module_filename = filename[len(prefix) :].replace('.py', '.md')
+                if module_filename in retry_pages:
+                    changed[module_filename] = os.path.realpath(filename)
+        if since or retry_pages is not None:
+            pages = set(changed)
+            if not link and not inherited_members:
+                changed_files = set(changed.values())
+                files = [f for f in files if os.path.realpath(f) in changed_files]
+
+        modules = parse_files(files, prefix)
+
+        if pages is not None and inherited_members:
+            modules = list(modules)  # type: ignore
+            index = ClassIndex(dict(modules))
+            for module_filename, _ in modules:
+                if index.dependencies(module_filename) & set(changed):
+                    pages.add(module_filename)  # type: ignore
+
+        if pages is not None and link:
+            modules = list(modules)  # type: ignore
+            # names which may have been added, removed or changed their link target
+            changed_symbols: Set[str] = set()
+            # names the changed modules reference (or referenced), whose backlinks may change
+            changed_references: Set[str] = set()
+            for module_filename, parsed in modules:
+                if module_filename in changed:
+                    changed_symbols.update(create_types_mapping({module_filename: parsed}))
+                    changed_symbols.update(parsed.get('imports') or {})
+                    changed_references.update(get_short_names(collect_type_references(parsed)))
+            root = get_repository_root(path) if since else ''
+            for module_filename, filename in list(changed.items()) + list(deleted.items()):
+                previous = read_file_at(since, filename, root) if since else None
+                if previous is not None:
+                    local_filename = prefix + module_filename[:-3] + '.py'
+                    try:
+                        previous_module = parse(local_filename, prefix, content=previous)
+                    except Exception:
+                        if failures is None:
+                            raise
+                        continue  # a previous version which can not be parsed had no symbols
+                    changed_symbols.update(create_types_mapping({module_filename: previous_module}))
+                    changed_symbols.update(previous_module.get('imports') or {})
+                    changed_references.update(
+                        get_short_names(collect_type_references(previous_module))
+                    )
+            for module_filename, parsed in modules:
+                if collect_type_references(parsed) & changed_symbols:
+                    pages.add(module_filename)  # type: ignore
+                elif backlinks and any(
+                    cls['name'] in changed_references for cls in parsed.get('classes', [])
+                ):
+                    pages.add(module_filename)  # type: ignore
+
+        yield from render_modules(
+            modules,
+            link=link,
+            pages=pages,
+            external_links=external_links,
+            cache=cache,
+            inherited_members=inherited_members,
+            failures=failures,
+            validator=validator,
+            render_workers=render_workers,
+            backlinks=backlinks,
+            filenames=filenames,
+        )
+
+
+def iter_markdown_from_sources(
+    sources: Dict[str, str],
+    link: bool = False,
+    external_links: Optional[Dict[str, str]] = None,
+    inherited_members: bool = False,
+    **parse_options,
+) -> Iterator[Tuple[str, ParsedModule, str]]:
+    """
+    Generate the markdown pages for in-memory module sources
+
+    Args:
+        sources: mapping of dotted module name (ex. package.module) to the module source code
+        link: create links between types within the modules
+        external_links: mapping of type name to url for types documented by other projects
+        inherited_members: document the attributes and methods classes inherit from the other
+            classes of the modules
+        parse_options: options passed to parse_module_file (ex. hide_private)
+
+    Returns:
+        tuples of the relative output filename (ex. package/module.md), parsed module and markdown
+
+    Examples:
+        >>> pages = iter_markdown_from_sources({'package.module': 'def func():\n    pass\n'})
+    """
+    modules = (
+        (
+            module_name.replace('.', '/') + '.md',
+            parse_module_file(
+                module_name.replace('.', '/') + '.py', content=source, **parse_options
+            ),
+        )
+        for module_name, source in sources.items()
+    )
+    yield from render_modules(
+        modules, link=link, external_links=external_links, inherited_members=inherited_members
+    )
+
+
 def extract_to_markdown(
     paths: List[str],
     output_dir: str,
@@ -423,55 +1144,159 @@ def extract_to_markdown(
     hide_undoc_args: bool = True,
     namespace_headers: bool = False,
     link: bool = False,
-) -> None:
+    write_workers: int = DEFAULT_WRITE_WORKERS,
+    render_workers: int = 1,
+    archive: Optional[str] = None,
+    since: Optional[str] = None,
+    inventories: Optional[List[str]] = None,
+    inventory: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    inherited_members: bool = False,
+    keep_going: bool = False,
+    failure_report: Optional[str] = None,
+    retry_failed: Optional[str] = None,
+    validate_links: bool = False,
+    coverage_report: Optional[str] = None,
+    fail_under: Optional[float] = None,
+    backlinks: bool = False,
+    **parse_options,
+) -> List[Dict[str, Any]]:
+    """
+    Generate the markdown pages for python packages and write them to a directory or archive
 
-    for path in paths:
-        if path.endswith('/'):
-            path = path[:-1]
-
-        package = os.path.basename(path)
-        prefix = path[0 : len(path) - len(package)]
-        files = []
-        if os.path.isfile(path):
-            files.append(path)
-        else:
-            for root, dirs, walkfiles in os.walk(path):
-                files.extend([os.path.join(root, w) for w in walkfiles if w.endswith('.py')])
+    Args:
+        paths: path(s) to python package directories or modules to pull docstrings from
+        output_dir: the output directory or archive filename
+        link: create links between types within each package
+        write_workers: maximum concurrent writes when writing to a directory
+        render_workers: render the pages in this many processes
+        archive: write to an archive of this format (implied by an archive extension on output_dir)
+        since: only update the pages for modules which changed since this git ref
+        inventories: symbol inventories of other projects to link to, as path[=base_url]
+        inventory: path to write the symbol inventory of the generated pages to
+        cache_dir: directory to cache parsed modules and rendered pages in between runs. Pages
+            which are unchanged since the last run are not written again
+        inherited_members: document the attributes and methods classes inherit from the other
+            classes of the same package
+        keep_going: skip the modules which fail to parse or render instead of stopping at the
+            first error (implied by failure_report and retry_failed)
+        failure_report: path to write the JSON report of the modules which failed to
+        retry_failed: path to a failure report from a previous run. Only the pages which failed
+            (and the pages which link to them) are generated
+        validate_links: check that the page and anchor of every link between the pages exist
+        coverage_report: path to write the JSON report of the documented and undocumented symbols
+        fail_under: the minimum documentation coverage (percent of symbols documented)
+        backlinks: list the functions, methods and attributes which reference each class on its
+            page. Requires link
+        parse_options: other options passed to parse_module_file (ex. max_constant_lines)
 
-        modules: Dict[str, ParsedModule] = {}
-        type_mapping: Dict[str, str] = {}
+    Returns:
+        the modules which failed (see describe_failure) when keep_going
 
-        for filename in files:
-            parsed = parse_module_file(
-                filename,
-                prefix,
-                hide_private=hide_private,
-                hide_undoc=hide_undoc,
-                hide_undoc_args=hide_undoc_args,
-                namespace_headers=namespace_headers,
+    Raises:
+        BrokenLinksError: when validating links and any are broken (after writing the pages)
+        CoverageError: when the documentation coverage is under fail_under (after writing the pages)
+    """
+    partial = 'only updating changed pages' if since else 'retrying failed pages'
+    if (since or retry_failed) and (archive or archive_format(output_dir)):
+        raise ValueError(f'{partial} requires a directory output')
+    if (since or retry_failed) and inventory:
+        raise ValueError(f'the inventory can not be written when {partial}')
+
+    cache = ModuleCache(cache_dir) if cache_dir else None
+    failures: Optional[List[Dict[str, Any]]] = None
+    if keep_going or failure_report or retry_failed:
+        failures = []
+    retry = None
+    if retry_failed:
+        retry = [failure['page'] for failure in load_failure_report(retry_failed)]
+    validator = LinkValidator() if validate_links else None
+    # path => the changed and deleted modules, when only updating the changed pages
+    changes: Dict[str, Tuple[Dict[str, str], Dict[str, str]]] = {}
+    coverage = None
+    if coverage_report or fail_under is not None:
+        coverage = CoverageReport(hide_private=hide_private)
+    pages = iter_markdown(
+        paths,
+        hide_private=hide_private,
+        hide_undoc=hide_undoc,
+        hide_undoc_args=hide_undoc_args,
+        namespace_headers=namespace_headers,
+        link=link,
+        since=since,
+        external_links=load_inventories(inventories) if inventories else None,
+        cache=cache,
+        inherited_members=inherited_members,
+        failures=failures,
+        retry=retry,
+        validator=validator,
+        coverage=coverage,
+        render_workers=render_workers,
+        backlinks=backlinks,
+        changes=changes,
+        **parse_options,
+    )
+    symbols: Dict[str, ParsedModule] = {}
+    with create_writer(output_dir, archive=archive, workers=write_workers) as writer:
+        written = set()
+        for module_filename, parsed, markdown in pages:
+            if (
+                cache is None
+                or module_filename not in cache.unchanged
+                or not writer.exists(module_filename)
+            ):
+                writer.write(module_filename, markdown)
+            written.add(module_filename)
+            if inventory:
+                symbols[module_filename] = get_module_symbols(parsed)
+
+        if since:
+            # remove the pages of deleted modules and of changed modules which are now hidden
+            failed = {failure['page'] for failure in failures or []}
+            for changed, deleted in changes.values():
+                for module_filename in sorted(set(deleted) | (set(changed) - written - failed)):
+                    writer.remove(module_filename)
+
+    if inventory:
+        write_inventory(inventory, ImportGraph(symbols).get_qualified_links())
+
+    for failure in failures or []:
+        print(f'failed to {failure["stage"]}:', failure['filename'], f'({failure["message"]})')
+    if failure_report:
+        write_failure_report(failure_report, failures or [])
+        print('wrote failure report:', failure_report)
+
+    if coverage is not None:
+        total = coverage.get_total()
+        print(
+            f'documentation coverage: {total["documented"]} of {total["total"]} ({total["percent"]}%)'
+        )
+        if coverage_report:
+            coverage.write(coverage_report)
+            print('wrote coverage report:', coverage_report)
+
+    if validator is not None:
+        broken = validator.validate()
+        for broken_link in broken:
+            print(
+                f'broken link ({broken_link["reason"]}):',
+                broken_link['page'],
+                '->',
+                broken_link['target'],
             )
-            module_filename = filename[len(prefix) :].replace('.py', '.md')
-
-            modules[module_filename] = parsed
-
-        if link:
-            type_mapping = create_types_mapping(modules)
-
-        for module_filename, parsed in modules.items():
-            if parsed.get('hidden', False):
-                continue
-            module_file_output = os.path.join(output_dir, module_filename)
-            dirname = os.path.dirname(module_file_output)
-            os.makedirs(dirname, exist_ok=True)
-
-            print('writing:', module_file_output)
-            with open(module_file_output, 'w') as fh:
-                relative_mapping = create_relative_types_mapping(module_filename, type_mapping)
-                fh.write(module_to_markdown(parsed, relative_mapping))
+        if broken:
+            raise BrokenLinksError(broken)
+    if coverage is not None and fail_under is not None:
+        percent = coverage.get_total()['percent']
+        if percent < fail_under:
+            raise CoverageError(percent, fail_under)
+    return failures or []
 
 
-def command_interface() -> None:
-    parser = argparse.ArgumentParser()
+def add_parse_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the input and parsing options shared by the command line interfaces
+    """
     parser.add_argument(
         '--show_private',
         default=False,
@@ -490,7 +1315,6 @@ def command_interface() -> None:
         action='store_true',
         help='show/list function arguments with neither type nor description',
     )
-    parser.add_argument('-o', '--output_dir', help='The output directory', required=True)
     parser.add_argument(
         'inputs', nargs='+', help='path(s) to python package directories to pull docstrings from'
     )
@@ -506,13 +1330,285 @@ def command_interface() -> None:
         action='store_true',
         help='Base URL to use for creating internal links',
     )
-    args = parser.parse_args()
-    extract_to_markdown(
-        args.inputs,
-        args.output_dir,
-        link=args.link,
-        hide_private=not args.show_private,
-        hide_undoc=not args.show_undoc,
-        hide_undoc_args=not args.show_undoc_args,
-        namespace_headers=args.namespace_headers,
+    parser.add_argument(
+        '--public_api',
+        default=False,
+        action='store_true',
+        help='Only document the public API given by the __all__ of each package and module. Private (underscore) modules and modules the packages do not export from are not parsed',
+    )
+    parser.add_argument(
+        '--max_constant_lines',
+        type=int,
+        help='Truncate the source code shown for module variables to this many lines',
+    )
+    parser.add_argument(
+        '--max_constant_bytes',
+        type=int,
+        help='Truncate the source code shown for module variables to this many bytes',
+    )
+    parser.add_argument(
+        '--prefer_stubs',
+        default=False,
+        action='store_true',
+        help='Document the type stub (module.pyi) next to a module instead of the module when there is one. Docstrings missing from the stub are taken from the module',
+    )
+    parser.add_argument(
+        '--max_expression_depth',
+        type=int,
+        default=DEFAULT_MAX_EXPRESSION_DEPTH,
+        help='Show types and default values nested deeper than this as their source code instead of rendering them (for generated code which would exceed the recursion limit)',
+    )
+
+
+def get_parse_options(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Get the keyword arguments for parse_module_file from the arguments added by add_parse_arguments
+    """
+    return {
+        'hide_private': not args.show_private,
+        'hide_undoc': not args.show_undoc,
+        'hide_undoc_args': not args.show_undoc_args,
+        'namespace_headers': args.namespace_headers,
+        'max_constant_lines': args.max_constant_lines,
+        'max_constant_bytes': args.max_constant_bytes,
+        'public_api': args.public_api,
+        'prefer_stubs': args.prefer_stubs,
+        'max_expression_depth': args.max_expression_depth,
+    }
+
+
+def command_interface() -> None:
+    # subcommands are imported here since they depend on this module
+    if sys.argv[1:2] == ['serve']:
+        from .serve import serve_interface
+
+        serve_interface(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ['merge']:
+        from .shards import merge_interface
+
+        merge_interface(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(
+        epilog='Use "markdown_refdocs serve -h" for the options to run a local preview server and "markdown_refdocs merge -h" to link the output of sharded runs'
     )
+    add_parse_arguments(parser)
+    parser.add_argument(
+        '-o',
+        '--output_dir',
+        help='The output directory, or archive file when it ends with an archive extension (ex. docs.zip)',
+        required=True,
+    )
+    parser.add_argument(
+        '--write_workers',
+        default=DEFAULT_WRITE_WORKERS,
+        type=int,
+        help='The maximum number of output files to write concurrently',
+    )
+    parser.add_argument(
+        '--render_workers',
+        default=1,
+        type=int,
+        help='Render the pages in this many processes. The links between the pages are shared between the processes through memory-mapped files',
+    )
+    parser.add_argument(
+        '--archive',
+        choices=ARCHIVE_FORMATS,
+        help='Write all pages into a single archive of this format at the output path instead of a directory',
+    )
+    parser.add_argument(
+        '--since',
+        metavar='REF',
+        help='Only update the pages for modules which changed, were added or were deleted since this git ref',
+    )
+    parser.add_argument(
+        '--shard',
+        metavar='I/N',
+        help='Only generate the I-th of N (1-based) deterministic partitions of the modules and write a symbol manifest. Use "markdown_refdocs merge" on the manifests of all the shards to add the links',
+    )
+    parser.add_argument(
+        '--manifest',
+        help='Where to write the shard manifest (default: refdocs-shard-I-of-N.json)',
+    )
+    parser.add_argument(
+        '--inventory',
+        metavar='PATH[=BASE_URL]',
+        action='append',
+        help='Link to the types in the symbol inventory of another project, published under the optional base url. May be given multiple times',
+    )
+    parser.add_argument(
+        '--write_inventory',
+        metavar='PATH',
+        help='Write the symbol inventory of the generated pages for other projects to link to',
+    )
+    parser.add_argument(
+        '--inherited_members',
+        default=False,
+        action='store_true',
+        help='Document the attributes and methods each class inherits from the other classes of the package',
+    )
+    parser.add_argument(
+        '--keep_going',
+        default=False,
+        action='store_true',
+        help='Skip the modules which fail to parse or render instead of stopping at the first error. Exits with an error status if any failed',
+    )
+    parser.add_argument(
+        '--failure_report',
+        metavar='PATH',
+        help='Write a JSON report of the modules which failed to parse or render (implies --keep_going)',
+    )
+    parser.add_argument(
+        '--retry_failed',
+        metavar='REPORT',
+        help='Only generate the pages which failed in the run which wrote this failure report (implies --keep_going). Combine with --cache_dir to reuse the parsed modules of the other pages',
+    )
+    parser.add_argument(
+        '--cache_dir',
+        help='Cache the parsed modules and rendered pages here so that unchanged pages are not parsed, rendered or written again on the next run',
+    )
+    parser.add_argument(
+        '--backlinks',
+        default=False,
+        action='store_true',
+        help='Add a "Referenced by" section to each class listing the functions, methods and attributes whose types reference it (requires --link)',
+    )
+    parser.add_argument(
+        '--validate_links',
+        default=False,
+        action='store_true',
+        help='Check that the page and anchor of every link between the generated pages exist. Exits with an error status if any are broken',
+    )
+    parser.add_argument(
+        '--coverage_report',
+        metavar='PATH',
+        help='Write a JSON report of the documented and undocumented modules, classes, functions and parameters',
+    )
+    parser.add_argument(
+        '--fail_under',
+        metavar='PERCENT',
+        type=float,
+        help='Exit with an error status if less than this percent of the symbols are documented',
+    )
+    parser.add_argument(
+        '--versions',
+        metavar='REF[=NAME]',
+        nargs='+',
+        help='Generate the pages of each of these git refs into a directory (NAME, or the ref) under the output directory. Sources are read from git without checking out the refs and pages identical between versions are hard linked',
+    )
+    args = parser.parse_args()
+
+    if args.versions:
+        from .versions import extract_versions
+
+        for option in [
+            'since',
+            'shard',
+            'archive',
+            'cache_dir',
+            'keep_going',
+            'failure_report',
+            'retry_failed',
+            'write_inventory',
+            'validate_links',
+            'coverage_report',
+            'fail_under',
+        ]:
+            value = getattr(args, option)
+            if value is not None and value is not False:
+                parser.error(f'--versions can not be used with --{option}')
+        try:
+            extract_versions(
+                args.inputs,
+                args.output_dir,
+                args.versions,
+                link=args.link,
+                external_links=load_inventories(args.inventory) if args.inventory else None,
+                inherited_members=args.inherited_members,
+                write_workers=args.write_workers,
+                render_workers=args.render_workers,
+                backlinks=args.backlinks,
+                **get_parse_options(args),
+            )
+        except ValueError as err:
+            parser.error(str(err))
+        return
+
+    if args.shard:
+        from .shards import extract_shard, parse_shard
+
+        if args.inherited_members:
+            parser.error(
+                '--inherited_members needs all the modules and can not be used with --shard'
+            )
+        if args.render_workers > 1:
+            parser.error('--render_workers can not be used with --shard')
+        if args.backlinks:
+            parser.error('--backlinks needs all the modules and can not be used with --shard')
+        for option in [
+            'since',
+            'archive',
+            'inventory',
+            'write_inventory',
+            'cache_dir',
+            'keep_going',
+            'failure_report',
+            'retry_failed',
+            'validate_links',
+            'coverage_report',
+            'fail_under',
+        ]:
+            value = getattr(args, option)
+            if value is not None and value is not False:
+                parser.error(f'--shard can not be used with --{option}')
+
+        try:
+            shard = parse_shard(args.shard)
+            extract_shard(
+                args.inputs,
+                args.output_dir,
+                shard,
+                args.manifest or f'refdocs-shard-{shard[0]}-of-{shard[1]}.json',
+                write_workers=args.write_workers,
+                **get_parse_options(args),
+            )
+        except ValueError as err:
+            parser.error(str(err))
+        return
+
+    if args.since and args.retry_failed:
+        parser.error('--since and --retry_failed can not be used together')
+    if args.validate_links and not args.link:
+        parser.error('--validate_links requires --link')
+    if args.backlinks and not args.link:
+        parser.error('--backlinks requires --link')
+    if (args.coverage_report or args.fail_under is not None) and (args.since or args.retry_failed):
+        parser.error('--coverage_report and --fail_under need all the modules')
+
+    try:
+        failures = extract_to_markdown(
+            args.inputs,
+            args.output_dir,
+            link=args.link,
+            write_workers=args.write_workers,
+            render_workers=args.render_workers,
+            archive=args.archive,
+            since=args.since,
+            inventories=args.inventory,
+            inventory=args.write_inventory,
+            cache_dir=args.cache_dir,
+            inherited_members=args.inherited_members,
+            keep_going=args.keep_going,
+            failure_report=args.failure_report,
+            retry_failed=args.retry_failed,
+            validate_links=args.validate_links,
+            coverage_report=args.coverage_report,
+            fail_under=args.fail_under,
+            backlinks=args.backlinks,
+            **get_parse_options(args),
+        )
+    except (BrokenLinksError, CoverageError) as err:
+        sys.exit(str(err))
+    if failures:
+        sys.exit(f'{len(failures)} module(s) failed')
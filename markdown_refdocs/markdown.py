@@ -1,11 +1,19 @@
 import re
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 from .types import ParsedClass, ParsedFunction, ParsedModule, ParsedVariable, ADMONITIONS
 
+TYPE_DELIMITERS = re.compile(r'(\[|\]|\s|,)')
+
 
 def create_type_link(type_name: str, types_links: Dict[str, str] = {}) -> str:
-    tokens = re.split(r'(\[|\]|\s|,)', str(type_name))
+    # simple (undelimited) names are looked up whole. Type names and mapping keys are both
+    # interned by the analyzer so the lookup succeeds on identity without comparing the strings
+    if type_name in types_links:
+        return f'[{type_name}]({types_links[type_name]})'
+    tokens = TYPE_DELIMITERS.split(str(type_name))
+    if len(tokens) == 1:
+        return f'`{type_name}`'
 
     linked = []
     contains_link = False
@@ -32,6 +40,7 @@ def argument_md(
     default_value: str = None,
     hidden: bool = False,
     types_links: Dict[str, str] = {},
+    inherited_from: str = None,
     **kwargs,
 ) -> str:
     md = ''
@@ -49,6 +58,8 @@ def argument_md(
 
     if description:
         md += f': {description}'
+    if inherited_from:
+        md += f' (inherited from {create_type_link(inherited_from, types_links)})'
     return md
 
 
@@ -82,6 +93,10 @@ def function_to_markdown(
     heading = '#' * heading_level
     name = parsed['name'].replace('_', '\\_')
     md = [f'{heading} {name}()\n']
+    if parsed.get('inherited_from', ''):
+        md.extend(
+            [f'*inherited from* {create_type_link(parsed["inherited_from"], types_links)}', '']
+        )
     if parsed.get('description', ''):
         md.extend([parsed['description'], ''])
     if parsed.get('source_definition', ''):
@@ -117,7 +132,11 @@ def function_to_markdown(
     return '\n'.join(md)
 
 
-def class_to_markdown(parsed: ParsedClass, types_links: Dict[str, str] = {}) -> str:
+def class_to_markdown(
+    parsed: ParsedClass,
+    types_links: Dict[str, str] = {},
+    referenced_by: Optional[List[Tuple[str, str]]] = None,
+) -> str:
     if parsed.get('hidden', False):
         return ''
     md = [f'## class {parsed["name"]}', '']
@@ -143,6 +162,13 @@ def class_to_markdown(parsed: ParsedClass, types_links: Dict[str, str] = {}) ->
     if admon_md:
         md.append(admon_md)
 
+    if referenced_by:
+        md.append('**Referenced by**\n')
+        for name, link in referenced_by:
+            label = name.replace('_', '\\_')
+            md.append(f'- [{label}]({link})')
+        md.append('')
+
     if parsed.get('functions', ''):
         for func in parsed['functions']:
             md.append(function_to_markdown(func, heading_level=3, types_links=types_links))
@@ -164,7 +190,20 @@ def constant_to_markdown(parsed: ParsedVariable, types_links: Dict[str, str] = {
     return '\n'.join(md)
 
 
-def module_to_markdown(parsed: ParsedModule, types_links: Dict[str, str] = {}) -> str:
+def module_to_markdown(
+    parsed: ParsedModule,
+    types_links: Dict[str, str] = {},
+    backlinks: Optional[Dict[str, List[Tuple[str, str]]]] = None,
+) -> str:
+    """
+    Generate the markdown page for a module
+
+    Args:
+        parsed: the parsed module
+        types_links: mapping of type name to (relative) link
+        backlinks: mapping of class name to the names of the symbols which reference the class and
+            the links to them, listed in a "Referenced by" section of the class
+    """
     if parsed.get('hidden', False):
         return ''
     md = [f'# {parsed["name"]}\n']
@@ -177,7 +216,11 @@ def module_to_markdown(parsed: ParsedModule, types_links: Dict[str, str] = {}) -
             md.append(constant_to_markdown(variable, types_links=types_links))
 
     for cls in parsed['classes']:
-        md.append(class_to_markdown(cls, types_links=types_links))
+        md.append(
+            class_to_markdown(
+                cls, types_links=types_links, referenced_by=(backlinks or {}).get(cls['name'])
+            )
+        )
 
     for func in parsed['functions']:
         md.append(function_to_markdown(func, types_links=types_links))
@@ -0,0 +1,108 @@
+import os
+import posixpath
+from typing import Any, Dict, Optional
+
+from mkdocs.config import config_options
+from mkdocs.plugins import BasePlugin
+from mkdocs.structure.files import File, Files
+
+from .cache import ModuleCache
+from .expressions import DEFAULT_MAX_EXPRESSION_DEPTH
+from .inventory import load_inventories
+from .main import iter_markdown
+
+
+class RefdocsPlugin(BasePlugin):
+    """
+    mkdocs plugin which generates the reference pages while building the site
+
+    The pages are added to the site as virtual files (nothing is written to the docs directory).
+    Parsed modules and rendered pages are kept in memory so that the rebuilds done by mkdocs serve
+    only parse the modules whose source changed
+
+    Examples:
+        plugins:
+          - markdown_refdocs:
+              inputs: [path/to/package]
+              output_dir: reference
+              link: true
+    """
+
+    config_scheme = (
+        ('inputs', config_options.Type(list, default=[])),
+        ('output_dir', config_options.Type(str, default='reference')),
+        ('link', config_options.Type(bool, default=False)),
+        ('show_private', config_options.Type(bool, default=False)),
+        ('show_undoc', config_options.Type(bool, default=False)),
+        ('show_undoc_args', config_options.Type(bool, default=False)),
+        ('namespace_headers', config_options.Type(bool, default=False)),
+        ('public_api', config_options.Type(bool, default=False)),
+        ('prefer_stubs', config_options.Type(bool, default=False)),
+        ('max_constant_lines', config_options.Type(int, default=None)),
+        ('max_constant_bytes', config_options.Type(int, default=None)),
+        ('max_expression_depth', config_options.Type(int, default=DEFAULT_MAX_EXPRESSION_DEPTH)),
+        ('inventories', config_options.Type(list, default=[])),
+        ('inherited_members', config_options.Type(bool, default=False)),
+        ('backlinks', config_options.Type(bool, default=False)),
+    )
+
+    # mkdocs serve creates new plugin instances when it reloads the config for a rebuild, so the
+    # cache is shared by the class to outlive them
+    module_cache = ModuleCache()
+
+    def __init__(self) -> None:
+        super().__init__()
+        # src path (ex. reference/package/module.md) => markdown
+        self.pages: Dict[str, str] = {}
+
+    def get_parse_options(self) -> Dict[str, Any]:
+        return {
+            'hide_private': not self.config['show_private'],
+            'hide_undoc': not self.config['show_undoc'],
+            'hide_undoc_args': not self.config['show_undoc_args'],
+            'namespace_headers': self.config['namespace_headers'],
+            'public_api': self.config['public_api'],
+            'prefer_stubs': self.config['prefer_stubs'],
+            'max_constant_lines': self.config['max_constant_lines'],
+            'max_constant_bytes': self.config['max_constant_bytes'],
+            'max_expression_depth': self.config['max_expression_depth'],
+        }
+
+    def on_files(self, files: Files, config: Any) -> Files:
+        self.module_cache.reset()
+        inventories = self.config['inventories']
+        pages = iter_markdown(
+            self.config['inputs'],
+            link=self.config['link'],
+            external_links=load_inventories(inventories) if inventories else None,
+            cache=self.module_cache,
+            inherited_members=self.config['inherited_members'],
+            backlinks=self.config['backlinks'],
+            **self.get_parse_options(),
+        )
+        self.pages = {}
+        for module_filename, _, markdown in pages:
+            src_path = posixpath.join(self.config['output_dir'].strip('/'), module_filename)
+            self.pages[src_path] = markdown
+
+            existing = files.get_file_from_path(src_path)
+            if existing is not None:
+                files.remove(existing)
+            files.append(
+                File(
+                    src_path,
+                    config['docs_dir'],
+                    config['site_dir'],
+                    config['use_directory_urls'],
+                )
+            )
+        return files
+
+    def on_page_read_source(self, page: Any, config: Any) -> Optional[str]:
+        # returning None lets mkdocs read the pages which are not generated from the docs directory
+        return self.pages.get(page.file.src_path.replace(os.sep, '/'))
+
+    def on_serve(self, server: Any, config: Any, builder: Any) -> Any:
+        for path in self.config['inputs']:
+            server.watch(path)
+        return server
@@ -113,11 +113,11 @@ def parse_google_docstring(
     for i, line in enumerate(content['returns']):
         _, arg_type, arg_desc = re.match(r'^(([^:]+):)?\s*(.*)$', line).groups()  # type: ignore
         if result['returns']:
-            result['returns']['description'] += ' ' + line
-        else:
             print(
                 f'warning: {function_name} multiple return lines, being appended to the description'
             )
+            result['returns']['description'] += ' ' + line
+        else:
             result['returns'] = ParsedReturn({'type': arg_type, 'description': arg_desc})
 
     result['description'] = '\n'.join(content['desc']).strip()
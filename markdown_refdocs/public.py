@@ -0,0 +1,161 @@
+import ast
+import os
+from typing import Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from .imports import get_import_base
+
+
+def get_all_names(tree: ast.Module) -> Optional[List[str]]:
+    """
+    Get the names listed in the __all__ of a module
+
+    Only literal lists and tuples of strings (assigned or added to __all__) are understood
+
+    Returns:
+        the names or None if the module does not define __all__ (or it could not be read statically)
+    """
+    names: Optional[List[str]] = None
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, (ast.AugAssign, ast.AnnAssign)):
+            targets = [node.target]
+        else:
+            continue
+        if not any(isinstance(t, ast.Name) and t.id == '__all__' for t in targets):
+            continue
+        if not isinstance(node.value, (ast.List, ast.Tuple)):
+            return None
+        values = []
+        for elt in node.value.elts:
+            value = getattr(elt, 'value', getattr(elt, 's', None))
+            if not isinstance(value, str):
+                return None
+            values.append(value)
+        if isinstance(node, ast.AugAssign):
+            if names is None:
+                return None
+            names.extend(values)
+        else:
+            names = values
+    return names
+
+
+def get_reexports(tree: ast.Module, package: str) -> List[Tuple[str, str]]:
+    """
+    Get the names a package __init__ imports from modules within the same top-level package
+
+    Names are given as they are bound in the package (ex. the alias of an import as)
+
+    Args:
+        tree: the parsed __init__ module
+        package: the dotted name of the package (ex. package.subpackage)
+
+    Returns:
+        pairs of the dotted name of the module imported from and the name imported
+    """
+    root = package.split('.')[0]
+    reexports = []
+    for node in tree.body:
+        if not isinstance(node, ast.ImportFrom):
+            continue
+        base = get_import_base(node, package)
+        if base != root and not base.startswith(f'{root}.'):
+            continue
+        for alias in node.names:
+            reexports.append((base, alias.asname or alias.name))
+    return reexports
+
+
+def find_public_modules(
+    prefix: str, files: List[str], read: Optional[Callable[[str], str]] = None
+) -> Dict[str, Optional[FrozenSet[str]]]:
+    """
+    Find the modules of a package which can contribute to its public API, without parsing them
+
+    Packages are visited from the top down and only their __init__ files are read. A module or
+    subpackage is public when it is listed in the __all__ of its package, or when its package has
+    no __all__ and its name does not start with an underscore. A module which is not public but
+    which defines names that a public package re-exports (ex. from ._impl import Thing) is kept with
+    only those names. Everything else, including the whole tree under a pruned subpackage, is
+    skipped. The names of a module are None when the module's own __all__ (if any) decides
+
+    Args:
+        prefix: the portion of the path that is not part of the package
+        files: the module files of the package (see find_module_files)
+        read: called to get the source of a file instead of reading it from disk
+
+    Returns:
+        the public module files (in the order given) mapped to the names to document for them
+    """
+    modules: Dict[str, str] = {}
+    names: Set[str] = set()
+    for filename in files:
+        parts = filename[len(prefix) :].replace(os.sep, '/')[:-3].split('/')
+        if parts[-1] == '__init__':
+            parts = parts[:-1]
+        modules['.'.join(parts)] = filename
+        # include directories without an __init__ so the modules under them can be reached
+        names.update('.'.join(parts[: i + 1]) for i in range(len(parts)))
+
+    # dotted module name => names restricted to by the packages above it (None for unrestricted)
+    restrictions: Dict[str, Optional[Set[str]]] = {}
+    # dotted module name => names public packages import from it
+    exported: Dict[str, Set[str]] = {}
+    # package name => the names it makes public (None if all public by naming convention)
+    package_names: Dict[str, Optional[Set[str]]] = {}
+
+    for name in sorted(names, key=lambda n: (n.count('.'), n)):
+        parent, _, last = name.rpartition('.')
+        restriction: Optional[Set[str]] = None
+        if parent:
+            if parent not in restrictions:
+                continue  # the parent package was pruned
+            public_names = package_names[parent]
+            if public_names is None and not last.startswith('_'):
+                restriction = None
+            elif public_names is not None and last in public_names:
+                restriction = None
+            elif name in exported:
+                restriction = set(exported[name])
+            else:
+                continue
+        restrictions[name] = restriction
+
+        filename = modules.get(name)
+        if filename is None:
+            # a directory without an __init__
+            package_names[name] = restriction
+            continue
+        if os.path.basename(filename) != '__init__.py':
+            continue
+        if read is not None:
+            tree = ast.parse(read(filename))
+        else:
+            with open(filename, 'r') as fh:
+                tree = ast.parse(fh.read())
+        public_names = restriction
+        if public_names is None:
+            all_names = get_all_names(tree)
+            public_names = set(all_names) if all_names is not None else None
+        package_names[name] = public_names
+
+        for module_name, imported in get_reexports(tree, name):
+            if public_names is None and imported.startswith('_'):
+                continue
+            if public_names is not None and imported not in public_names:
+                continue
+            exported.setdefault(module_name, set()).add(imported)
+            # the packages containing the module also have to be kept to reach it
+            while '.' in module_name:
+                module_name = module_name.rpartition('.')[0]
+                exported.setdefault(module_name, set())
+
+    order = {filename: index for index, filename in enumerate(files)}
+    return {
+        modules[name]: (None if restriction is None else frozenset(restriction))
+        for name, restriction in sorted(
+            ((n, r) for n, r in restrictions.items() if n in modules),
+            key=lambda item: order[modules[item[0]]],
+        )
+    }
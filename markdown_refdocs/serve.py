@@ -0,0 +1,355 @@
+import argparse
+import ast
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from typing import Dict, FrozenSet, Hashable, List, Optional, Tuple
+
+from .archives import is_source_archive
+from .imports import ImportGraph, ModuleLinks, get_imports, get_package_name
+from .linkindex import RelativeLinks
+from .links import create_types_mapping
+from .main import (
+    add_parse_arguments,
+    find_module_files,
+    get_module_name,
+    get_parse_options,
+    parse_module_file,
+)
+from .markdown import module_to_markdown
+from .public import find_public_modules
+from .types import ParsedClass, ParsedModule, ParsedVariable
+
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_RESCAN_INTERVAL = 1.0
+
+CLASS_PATTERN = re.compile(r'^class\s+(\w+)', re.MULTILINE)
+VARIABLE_PATTERN = re.compile(r'^([A-Z][a-z]\w*)\s*(?::[^=\n]*)?=', re.MULTILINE)
+
+
+def scan_symbols(filename: str, module_name: str, namespace_headers: bool = False) -> ParsedModule:
+    """
+    Find the top-level classes, type-like variables and imports of a module without analyzing it
+
+    This is much cheaper than a full parse and is enough to build the links between pages
+
+    Returns:
+        a partial parsed module with only the names of its classes, variables and imports
+    """
+    with open(filename, 'r') as fh:
+        content = fh.read()
+    class_prefix = f'{module_name}.' if namespace_headers else ''
+    result = ParsedModule(
+        {
+            'name': module_name,
+            'classes': [
+                ParsedClass({'name': f'{class_prefix}{name}'})
+                for name in CLASS_PATTERN.findall(content)
+            ],
+            'variables': [
+                ParsedVariable({'name': name}) for name in VARIABLE_PATTERN.findall(content)
+            ],
+        }
+    )
+    try:
+        imports = get_imports(ast.parse(content), get_package_name(module_name))
+    except SyntaxError:
+        imports = {}  # the error is shown when the page itself is rendered
+    if imports:
+        result['imports'] = imports
+    return result
+
+
+class PageCache:
+    """
+    Least recently used cache of rendered pages which are invalidated when the version they were
+    rendered from (ex. the source mtime) changes
+
+    Args:
+        maxsize: the maximum number of pages to keep
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._pages: 'OrderedDict[str, Tuple[Hashable, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, page: str, version: Hashable) -> Optional[str]:
+        with self._lock:
+            cached = self._pages.get(page)
+            if cached is None or cached[0] != version:
+                return None
+            self._pages.move_to_end(page)
+            return cached[1]
+
+    def put(self, page: str, version: Hashable, markdown: str) -> None:
+        with self._lock:
+            self._pages[page] = (version, markdown)
+            self._pages.move_to_end(page)
+            while len(self._pages) > self.maxsize:
+                self._pages.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+
+class PreviewSite:
+    """
+    Index of the pages for a set of packages which are rendered the first time they are requested
+
+    Only the list of module files is built up front. It is listed again when a page is requested
+    at least rescan_interval seconds after the last listing, so that modules created while serving
+    are found. With linking, the class names and imports of the modules are found (without parsing)
+    the first time a page is rendered, and found again for the modules which have changed when the
+    package is rescanned. Type names are resolved through the imports of the page as with generated
+    pages (see ImportGraph). The links of a package are versioned by a generation which changes
+    when they do, so that cached pages linking to a renamed or new class are rendered again
+
+    Args:
+        paths: path(s) to python package directories or modules
+        cache_size: the maximum number of rendered pages to keep in memory
+        link: create links between types within each package
+        rescan_interval: the minimum number of seconds between listing the module files and
+            checking them for changes to the links (the source of a page is always checked)
+        parse_options: other options passed to parse_module_file (ex. max_constant_lines)
+    """
+
+    def __init__(
+        self,
+        paths: List[str],
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        hide_private: bool = True,
+        hide_undoc: bool = True,
+        hide_undoc_args: bool = True,
+        namespace_headers: bool = False,
+        link: bool = False,
+        rescan_interval: float = DEFAULT_RESCAN_INTERVAL,
+        **parse_options,
+    ):
+        self.namespace_headers = namespace_headers
+        self.parse_options = dict(
+            parse_options,
+            hide_private=hide_private,
+            hide_undoc=hide_undoc,
+            hide_undoc_args=hide_undoc_args,
+            namespace_headers=namespace_headers,
+        )
+        self.link = link
+        self.rescan_interval = rescan_interval
+        self.paths = paths
+        self.cache = PageCache(cache_size)
+        # page (ex. package/module.md) => (filename, prefix, package index)
+        self.pages: Dict[str, Tuple[str, str, int]] = {}
+        # page => the names to document for it when only showing the public api
+        self._public_names: Dict[str, Optional[FrozenSet[str]]] = {}
+        # per package, page => (source mtime, module symbols)
+        self._symbols: List[Dict[str, Tuple[float, ParsedModule]]] = [{} for _ in paths]
+        self._type_mappings: List[Optional[Dict[str, str]]] = [None for _ in paths]
+        self._graphs: List[Optional[ImportGraph]] = [None for _ in paths]
+        # per package, the imports of each page the graph was built from
+        self._imports: List[Dict[str, Dict[str, str]]] = [{} for _ in paths]
+        # per package, incremented each time its type mapping or imports change
+        self._generations: List[int] = [0 for _ in paths]
+        # the time the module files were last listed and each package was last scanned
+        self._refreshed = 0.0
+        self._scanned: List[Optional[float]] = [None for _ in paths]
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        List the module files of the packages again, finding the modules created or removed since
+        """
+        pages: Dict[str, Tuple[str, str, int]] = {}
+        public_names: Dict[str, Optional[FrozenSet[str]]] = {}
+        for package_index, path in enumerate(self.paths):
+            prefix, files = find_module_files(path)
+            public: Dict[str, Optional[FrozenSet[str]]] = {}
+            if self.parse_options.get('public_api'):
+                public = find_public_modules(prefix, files)
+                files = list(public)
+            for filename in files:
+                page = filename[len(prefix) :].replace('.py', '.md')
+                pages[page] = (filename, prefix, package_index)
+                public_names[page] = public.get(filename)
+        with self._lock:
+            self.pages = pages
+            self._public_names = public_names
+            self._refreshed = time.monotonic()
+
+    def _refresh_if_stale(self) -> None:
+        if time.monotonic() - self._refreshed >= self.rescan_interval:
+            self.refresh()
+
+    def resolve(self, url_path: str) -> Optional[str]:
+        """
+        Get the page for a request path, accepting both page.md and directory style (page/) urls
+        """
+        self._refresh_if_stale()
+        path = url_path.split('?')[0].split('#')[0].strip('/')
+        if not path.endswith('.md'):
+            path = f'{path}.md'
+        return path if path in self.pages else None
+
+    def _get_links(self, package_index: int) -> Tuple[Dict[str, str], Optional[ImportGraph], int]:
+        # the links of a package and their generation, scanning the modules which changed
+        if not self.link:
+            return {}, None, 0
+        with self._lock:
+            symbols = self._symbols[package_index]
+            pages = {
+                page: (filename, prefix)
+                for page, (filename, prefix, index) in self.pages.items()
+                if index == package_index
+            }
+            mapping = self._type_mappings[package_index]
+            scanned = self._scanned[package_index]
+            if (
+                mapping is not None
+                and scanned is not None
+                and time.monotonic() - scanned < self.rescan_interval
+                and pages.keys() == symbols.keys()
+            ):
+                return mapping, self._graphs[package_index], self._generations[package_index]
+            self._scanned[package_index] = time.monotonic()
+
+            changed = False
+            for page in list(symbols):
+                if page not in pages:
+                    del symbols[page]
+                    changed = True
+            for page, (filename, prefix) in pages.items():
+                mtime = os.stat(filename).st_mtime
+                if page not in symbols or symbols[page][0] != mtime:
+                    module_name = get_module_name(filename, prefix)
+                    symbols[page] = (
+                        mtime,
+                        scan_symbols(filename, module_name, self.namespace_headers),
+                    )
+                    changed = True
+
+            if mapping is None or changed:
+                modules = {p: s for p, (_, s) in symbols.items()}
+                new_mapping = create_types_mapping(modules)
+                imports = {p: s.get('imports') or {} for p, s in modules.items()}
+                if new_mapping != mapping or imports != self._imports[package_index]:
+                    self._generations[package_index] += 1
+                mapping = self._type_mappings[package_index] = new_mapping
+                self._imports[package_index] = imports
+                self._graphs[package_index] = ImportGraph(modules)
+            return mapping, self._graphs[package_index], self._generations[package_index]
+
+    def render(self, page: str) -> str:
+        """
+        Get the markdown for a page, rendering it if it is not cached or its source (or with
+        linking, the links of its package) has changed
+        """
+        filename, prefix, package_index = self.pages[page]
+        mtime = os.stat(filename).st_mtime
+        mapping, graph, generation = self._get_links(package_index)
+        markdown = self.cache.get(page, (mtime, generation))
+        if markdown is not None:
+            return markdown
+
+        parsed = parse_module_file(
+            filename, prefix, public_names=self._public_names[page], **self.parse_options
+        )
+        links: Mapping = mapping
+        if graph is not None:
+            with self._lock:
+                # the graph memoizes the names it resolves, which is not thread safe
+                links = ModuleLinks(mapping, graph.get_overrides(parsed, mapping))
+        markdown = module_to_markdown(parsed, RelativeLinks(page, links))
+        self.cache.put(page, (mtime, generation), markdown)
+        return markdown
+
+    def index(self) -> str:
+        """
+        Markdown listing of all the pages
+        """
+        self._refresh_if_stale()
+        md = ['# Reference\n']
+        for page in sorted(self.pages):
+            md.append(f'- [{page[:-3]}](/{page[:-3]}/)')
+        return '\n'.join(md) + '\n'
+
+
+class PreviewRequestHandler(BaseHTTPRequestHandler):
+    site: PreviewSite
+
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path.split('?')[0] in ['', '/']:
+            self._respond(200, self.site.index())
+            return
+        page = self.site.resolve(self.path)
+        if page is None:
+            self._respond(404, f'page not found: {self.path}\n')
+            return
+        try:
+            self._respond(200, self.site.render(page))
+        except Exception as err:
+            self._respond(500, f'error rendering {page}: {err}\n')
+
+    def _respond(self, status: int, content: str) -> None:
+        body = content.encode('utf8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/markdown; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class PreviewServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def create_server(site: PreviewSite, host: str = '127.0.0.1', port: int = 8000) -> PreviewServer:
+    handler = type('SiteRequestHandler', (PreviewRequestHandler,), {'site': site})
+    return PreviewServer((host, port), handler)
+
+
+def serve_interface(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='markdown_refdocs serve',
+        description='Serve the markdown pages for a package, rendering each page when it is requested',
+    )
+    add_parse_arguments(parser)
+    parser.add_argument('--host', default='127.0.0.1', help='The address to listen on')
+    parser.add_argument('--port', default=8000, type=int, help='The port to listen on')
+    parser.add_argument(
+        '--cache_size',
+        default=DEFAULT_CACHE_SIZE,
+        type=int,
+        help='The maximum number of rendered pages to keep in memory',
+    )
+    parser.add_argument(
+        '--rescan_interval',
+        default=DEFAULT_RESCAN_INTERVAL,
+        type=float,
+        help='The minimum number of seconds between checking the packages for new, removed or '
+        'changed modules',
+    )
+    args = parser.parse_args(argv)
+    for path in args.inputs:
+        if is_source_archive(path):
+            parser.error(f'archives can not be previewed, generate the pages instead ({path})')
+    site = PreviewSite(
+        args.inputs,
+        cache_size=args.cache_size,
+        link=args.link,
+        rescan_interval=args.rescan_interval,
+        **get_parse_options(args),
+    )
+    server = create_server(site, args.host, args.port)
+    print(f'serving {len(site.pages)} pages at http://{args.host}:{server.server_port}/')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,316 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import zlib
+from collections.abc import Mapping
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from .archives import is_source_archive, read_archive_modules
+from .imports import ImportGraph, ModuleLinks
+from .linkindex import RelativeLinks
+from .links import collect_type_references, create_types_mapping
+from .main import find_module_files, parse_module_file
+from .markdown import module_to_markdown
+from .public import find_public_modules
+from .types import ParsedClass, ParsedModule, ParsedVariable
+from .writers import DEFAULT_WRITE_WORKERS, archive_format, create_writer
+
+MANIFEST_VERSION = 2
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Parse a shard given as I/N (ex. 2/4 for the second of four shards)
+    """
+    match = re.match(r'^(\d+)/(\d+)$', value.strip())
+    if not match:
+        raise ValueError(f'expected the shard as I/N (ex. 1/4) not {value}')
+    index, count = int(match.group(1)), int(match.group(2))
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f'shard index must be between 1 and the number of shards ({value})')
+    return index, count
+
+
+def partition_modules(pages: Dict[str, int], count: int) -> List[List[str]]:
+    """
+    Deterministically split modules into shards of roughly equal total file size
+
+    Largest modules are assigned first, each to the shard with the least total size so far. Ties
+    are broken by a hash of the page path so that every node computes the same partition
+
+    Args:
+        pages: mapping of output filename (ex. package/module.md) to the size of its source file
+        count: the number of shards
+
+    Returns:
+        the output filenames assigned to each shard
+    """
+    shards: List[List[str]] = [[] for _ in range(count)]
+    loads = [0] * count
+    ordered = sorted(pages, key=lambda p: (-pages[p], zlib.crc32(p.encode('utf8')), p))
+    for page in ordered:
+        target = min(range(count), key=lambda i: (loads[i], i))
+        shards[target].append(page)
+        loads[target] += max(pages[page], 1)
+    return shards
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return dict(value)
+    return repr(value)
+
+
+def hash_source(source: str) -> str:
+    return hashlib.sha1(source.encode('utf8')).hexdigest()
+
+
+def module_symbols(parsed: ParsedModule) -> Dict[str, Any]:
+    """
+    The parts of a parsed module which are used to create the type mapping and import graph
+    """
+    return {
+        'name': parsed['name'],
+        'classes': [cls['name'] for cls in parsed.get('classes', [])],
+        'variables': [
+            var['name']
+            for var in parsed.get('variables', [])
+            if re.match(r'^[A-Z][a-z]', var['name'])
+        ],
+        'imports': parsed.get('imports') or {},
+    }
+
+
+def extract_shard(
+    paths: List[str],
+    output_dir: str,
+    shard: Tuple[int, int],
+    manifest: str,
+    hide_private: bool = True,
+    hide_undoc: bool = True,
+    hide_undoc_args: bool = True,
+    namespace_headers: bool = False,
+    write_workers: int = DEFAULT_WRITE_WORKERS,
+    **parse_options,
+) -> None:
+    """
+    Parse and render one shard of the modules and write the manifest used to link them later
+
+    Pages are rendered without links. The manifest records the linkable symbols of every module in
+    the shard, and the type names referenced by the pages which could contain links with where to
+    read their source, so that the merge step only has to parse and render those pages again
+
+    Args:
+        paths: path(s) to python package directories or modules to pull docstrings from
+        output_dir: the output directory for the pages of this shard
+        shard: the (1-based) index of this shard and the total number of shards
+        manifest: path to write the shard manifest to
+        parse_options: other options passed to parse_module_file (ex. max_constant_lines)
+    """
+    if archive_format(output_dir):
+        raise ValueError(f'shards must be written to a directory to be merged ({output_dir})')
+    index, count = shard
+    packages = []
+    options = dict(
+        parse_options,
+        hide_private=hide_private,
+        hide_undoc=hide_undoc,
+        hide_undoc_args=hide_undoc_args,
+        namespace_headers=namespace_headers,
+    )
+
+    with create_writer(output_dir, workers=write_workers) as writer:
+        for path in paths:
+            sources: Dict[str, str] = {}
+            if is_source_archive(path):
+                prefix, sources = read_archive_modules(path)
+                files = list(sources)
+            else:
+                prefix, files = find_module_files(path)
+            public: Dict[str, Optional[FrozenSet[str]]] = {}
+            if parse_options.get('public_api'):
+                public = find_public_modules(
+                    prefix, files, read=sources.__getitem__ if sources else None
+                )
+                files = list(public)
+            sizes = {}
+            for filename in files:
+                size = len(sources[filename]) if sources else os.path.getsize(filename)
+                sizes[filename[len(prefix) :].replace('.py', '.md')] = size
+            selected = set(partition_modules(sizes, count)[index - 1])
+
+            symbols = {}
+            pages = {}
+            for filename in files:
+                module_filename = filename[len(prefix) :].replace('.py', '.md')
+                if module_filename not in selected:
+                    continue
+                parsed = parse_module_file(
+                    filename,
+                    prefix,
+                    content=sources.get(filename),
+                    public_names=public.get(filename),
+                    **options,
+                )
+                symbols[module_filename] = module_symbols(parsed)
+                if parsed.get('hidden', False):
+                    continue
+                writer.write(module_filename, module_to_markdown(parsed))
+
+                references = sorted(t for t in collect_type_references(parsed) if t)
+                if not references:
+                    continue
+                if sources:
+                    source = sources[filename]
+                else:
+                    with open(filename, 'r') as fh:
+                        source = fh.read()
+                public_names = public.get(filename)
+                pages[module_filename] = {
+                    'references': references,
+                    'filename': filename,
+                    'prefix': prefix,
+                    'archive': path if sources else None,
+                    'public_names': sorted(public_names) if public_names is not None else None,
+                    'hash': hash_source(source),
+                }
+
+            packages.append(
+                {
+                    'package': os.path.basename(path.rstrip('/')),
+                    'modules': symbols,
+                    'pages': pages,
+                }
+            )
+
+    dirname = os.path.dirname(manifest)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    with open(manifest, 'w') as fh:
+        json.dump(
+            {
+                'version': MANIFEST_VERSION,
+                'shard': [index, count],
+                'options': options,
+                'packages': packages,
+            },
+            fh,
+            default=_json_default,
+            separators=(',', ':'),
+        )
+    print('wrote shard manifest:', manifest)
+
+
+def merge_shards(
+    manifests: List[str], output_dir: str, write_workers: int = DEFAULT_WRITE_WORKERS
+) -> None:
+    """
+    Combine the shard manifests into the type mapping and re-render the pages which link to it
+
+    The result is the same as generating all the shards in a single run with linking. The pages
+    which link to other pages are parsed again, so their sources must be where (and as) they were
+    when the shards were generated
+
+    Args:
+        manifests: paths to the manifests for all the shards
+        output_dir: the output directory (which contains the pages written by the shards)
+    """
+    contents = []
+    for filename in manifests:
+        with open(filename, 'r') as fh:
+            contents.append(json.load(fh))
+        if contents[-1].get('version') != MANIFEST_VERSION:
+            raise ValueError(f'unsupported shard manifest version ({filename})')
+
+    counts = {tuple(content['shard'])[1] for content in contents}
+    indices = sorted(content['shard'][0] for content in contents)
+    if len(counts) != 1 or indices != list(range(1, counts.pop() + 1)):
+        raise ValueError(
+            f'expected exactly one manifest for each shard, found shards {indices} ({manifests})'
+        )
+
+    options = contents[0]['options']
+    if any(content['options'] != options for content in contents):
+        raise ValueError(f'the shards were generated with different options ({manifests})')
+
+    # combine by package, keeping the order the packages were given in
+    symbols: Dict[str, Dict[str, Any]] = {}
+    pages: Dict[str, Dict[str, Any]] = {}
+    for content in sorted(contents, key=lambda c: c['shard'][0]):
+        for package in content['packages']:
+            symbols.setdefault(package['package'], {}).update(package['modules'])
+            pages.setdefault(package['package'], {}).update(package['pages'])
+
+    # archive => filename => source, for the modules read from an archive
+    archives: Dict[str, Dict[str, str]] = {}
+
+    def parse(page: Dict[str, Any]) -> ParsedModule:
+        content = None
+        if page['archive']:
+            if page['archive'] not in archives:
+                archives[page['archive']] = read_archive_modules(page['archive'])[1]
+            source = content = archives[page['archive']][page['filename']]
+        else:
+            with open(page['filename'], 'r') as fh:
+                source = fh.read()
+        if hash_source(source) != page['hash']:
+            raise ValueError(f'{page["filename"]} changed since its shard was generated')
+        return parse_module_file(
+            page['filename'],
+            page['prefix'],
+            content=content,
+            public_names=page['public_names'],
+            **options,
+        )
+
+    with create_writer(output_dir, workers=write_workers) as writer:
+        for package_name, package_symbols in symbols.items():
+            modules = {
+                module_filename: ParsedModule(
+                    {
+                        'name': module['name'],
+                        'classes': [ParsedClass({'name': name}) for name in module['classes']],
+                        'variables': [
+                            ParsedVariable({'name': name}) for name in module['variables']
+                        ],
+                        'imports': module.get('imports', {}),
+                    }
+                )
+                for module_filename, module in sorted(package_symbols.items())
+            }
+            type_mapping = create_types_mapping(modules)
+            graph = ImportGraph(modules)
+
+            for module_filename, page in sorted(pages[package_name].items()):
+                overrides = graph.get_overrides(
+                    modules[module_filename], type_mapping, page['references']
+                )
+                module_links = ModuleLinks(type_mapping, overrides)
+                if not any(ref in module_links for ref in page['references']):
+                    continue
+                parsed = parse(page)
+                writer.write(
+                    module_filename,
+                    module_to_markdown(parsed, RelativeLinks(module_filename, module_links)),
+                )
+
+
+def merge_interface(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='markdown_refdocs merge',
+        description='Link the pages generated by separate --shard runs',
+    )
+    parser.add_argument('manifests', nargs='+', help='the manifest files written by each shard')
+    parser.add_argument(
+        '-o', '--output_dir', required=True, help='The output directory containing the shard pages'
+    )
+    parser.add_argument(
+        '--write_workers',
+        default=DEFAULT_WRITE_WORKERS,
+        type=int,
+        help='The maximum number of output files to write concurrently',
+    )
+    args = parser.parse_args(argv)
+    merge_shards(args.manifests, args.output_dir, write_workers=args.write_workers)
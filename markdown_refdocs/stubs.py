@@ -0,0 +1,56 @@
+import ast
+import os
+from typing import Dict, List, Optional, Tuple
+
+
+def get_stub_filename(filename: str) -> str:
+    """
+    Get the filename of the type stub for a module (ex. package/module.pyi for package/module.py)
+    """
+    return f'{filename}i'
+
+
+def read_stub(filename: str) -> Optional[str]:
+    """
+    Read the type stub next to a module file
+
+    Returns:
+        the source of the stub or None if the module does not have one
+    """
+    stub_filename = get_stub_filename(filename)
+    if not os.path.isfile(stub_filename):
+        return None
+    with open(stub_filename, 'r') as fh:
+        return fh.read()
+
+
+def extract_docstrings(source: str) -> Dict[str, str]:
+    """
+    Collect the docstrings of a module, its classes, functions and methods without analyzing it
+
+    Only the module and class bodies are visited (not the bodies of functions), which is much
+    cheaper than a full parse for large implementation modules. Docstrings are keyed by their
+    dotted path within the module (ex. Class.method, or an empty string for the module itself)
+
+    Returns:
+        mapping of the dotted path to the docstring
+    """
+    tree = ast.parse(source)
+    docstrings: Dict[str, str] = {}
+    module_docstring = ast.get_docstring(tree)
+    if module_docstring:
+        docstrings[''] = module_docstring
+
+    stack: List[Tuple[str, List[ast.stmt]]] = [('', tree.body)]
+    while stack:
+        prefix, body = stack.pop()
+        for node in body:
+            if not isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            path = f'{prefix}{node.name}'
+            docstring = ast.get_docstring(node)
+            if docstring:
+                docstrings.setdefault(path, docstring)
+            if isinstance(node, ast.ClassDef):
+                stack.append((f'{path}.', node.body))
+    return docstrings
@@ -1,31 +1,143 @@
-from typing import List
+from collections.abc import MutableMapping
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Tuple
 
-try:
-    from typing import TypedDict  # type: ignore
-except ImportError:
-    from typing_extensions import TypedDict
 
-Parsed: TypedDict = TypedDict(
-    'Parsed', {'name': str, 'source_code': str, 'hidden': bool}, total=False
-)
+class ParsedRecord(MutableMapping):
+    """
+    Compact, slotted record with a dict-compatible interface
 
+    Fields which have not been set behave as missing keys (the equivalent of a TypedDict with
+    total=False). Keys which are not declared fields (ex. optional admonitions from a docstring)
+    are kept in an overflow dict which is only created when it is needed
+    """
 
-class ParsedParameter(Parsed, total=False):
+    __slots__ = ('_extra',)
+    _fields: Tuple[str, ...] = ()
+    _field_set: FrozenSet[str] = frozenset()
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)  # type: ignore
+        fields: List[str] = []
+        for base in reversed(cls.__mro__):
+            for slot in base.__dict__.get('__slots__', ()):
+                if slot != '_extra' and slot not in fields:
+                    fields.append(slot)
+        cls._fields = tuple(fields)
+        cls._field_set = frozenset(fields)
+
+    def __init__(self, *args, **kwargs) -> None:
+        self._extra: Optional[Dict[str, Any]] = None
+        if args or kwargs:
+            self.update(*args, **kwargs)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._field_set:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self._field_set:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._field_set:
+            try:
+                delattr(self, key)
+                return
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None or key not in self._extra:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._field_set:
+            return hasattr(self, key)  # type: ignore
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for field in self._fields:
+            if hasattr(self, field):
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({dict(self)!r})'
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self),))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._field_set:
+            return getattr(self, key, default)
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def update(self, *args, **kwargs) -> None:  # type: ignore
+        for data in args + (kwargs,):
+            items = data.items() if hasattr(data, 'items') else data
+            for key, value in items:
+                self[key] = value
+
+    def copy(self) -> 'ParsedRecord':
+        return self.__class__(self)
+
+
+class Parsed(ParsedRecord):
+    __slots__ = ('name', 'source_code', 'hidden', 'inherited_from')
+    name: str
+    source_code: str
+    hidden: bool
+    inherited_from: str
+
+
+class ParsedParameter(Parsed):
+    __slots__ = ('default_value', 'type', 'description')
     default_value: str
     type: str
     description: str
 
 
-class ParsedReturn(TypedDict, total=False):
+class ParsedReturn(ParsedRecord):
+    __slots__ = ('type', 'description')
     type: str
     description: str
 
 
-class ParsedFunction(Parsed, total=False):
+class ParsedFunction(Parsed):
     """
     Result of the combination of parsing the source code and combining with the docstring of a function
     """
 
+    __slots__ = (
+        'parameters',
+        'returns',
+        'note',
+        'raises',
+        'examples',
+        'description',
+        'is_static',
+        'is_method',
+        'is_class_method',
+        'is_getter',
+        'source_definition',
+        'attributes',
+        'todo',
+    )
     parameters: List[ParsedParameter]
     returns: ParsedReturn
     note: str
@@ -36,9 +148,22 @@ class ParsedFunction(Parsed, total=False):
     is_method: bool
     is_class_method: bool
     is_getter: bool
+    source_definition: str
+    attributes: List[ParsedParameter]
+    todo: List[str]
 
 
-class ParsedDocstring(TypedDict, total=False):
+class ParsedDocstring(ParsedRecord):
+    __slots__ = (
+        'description',
+        'note',
+        'examples',
+        'raises',
+        'returns',
+        'parameters',
+        'attributes',
+        'todo',
+    )
     description: str
     note: str
     examples: List[str]
@@ -49,26 +174,44 @@ class ParsedDocstring(TypedDict, total=False):
     todo: List[str]
 
 
-class ParsedVariable(Parsed, total=False):
+class ParsedVariable(Parsed):
+    __slots__ = ('type', 'description', 'value', 'attributes')
     type: str
     description: str
     value: str
     attributes: List[Parsed]
 
 
-class ParsedClass(Parsed, total=False):
+class ParsedClass(Parsed):
+    __slots__ = (
+        'functions',
+        'variables',
+        'description',
+        'inherits',
+        'attributes',
+        'examples',
+        'note',
+        'todo',
+        'type',
+    )
     functions: List[ParsedFunction]
     variables: List[ParsedVariable]
     description: str
     inherits: List[str]
     attributes: List[Parsed]
+    examples: List[str]
+    note: str
+    todo: List[str]
+    type: str
 
 
-class ParsedModule(Parsed, total=False):
+class ParsedModule(Parsed):
+    __slots__ = ('classes', 'functions', 'variables', 'description', 'imports')
     classes: List[ParsedClass]
     functions: List[ParsedFunction]
     variables: List[ParsedVariable]
     description: str
+    imports: Dict[str, str]
 
 
 ADMONITIONS = [
@@ -0,0 +1,200 @@
+import posixpath
+import re
+import unicodedata
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .types import ParsedModule
+
+ANCHOR_COUNT_RE = re.compile(r'^(.*)_([0-9]+)$')
+HEADING_RE = re.compile(r'^#{1,6}\s+(.*?)\s*$')
+# the links the renderers create between the pages (see create_relative_link)
+PAGE_LINK_RE = re.compile(r'\[((?:\\.|[^\]\\])*)\]\(((?:[^()\s#:]*/)?#[^()\s]+)\)')
+INLINE_LINK_RE = re.compile(r'\[((?:\\.|[^\]\\])*)\]\([^()\s]*\)')
+
+
+def slugify(heading: str) -> str:
+    """
+    Create the anchor for a heading the same way as the markdown toc extension (used by mkdocs)
+    """
+    value = unicodedata.normalize('NFKD', heading).encode('ascii', 'ignore').decode('ascii')
+    value = re.sub(r'[^\w\s-]', '', value).strip().lower()
+    return re.sub(r'[-\s]+', '-', value)
+
+
+def unique_anchor(anchor: str, anchors: Set[str]) -> str:
+    """
+    Suffix a repeated anchor with a count (ex. save, save_1, save_2) as the markdown toc does
+    """
+    while anchor in anchors or not anchor:
+        match = ANCHOR_COUNT_RE.match(anchor)
+        if match:
+            anchor = f'{match.group(1)}_{int(match.group(2)) + 1}'
+        else:
+            anchor = f'{anchor}_1'
+    return anchor
+
+
+def unescape(text: str) -> str:
+    """
+    Remove the backslash escapes of markdown text (ex. get\\_thing)
+    """
+    return re.sub(r'\\(.)', r'\1', text)
+
+
+def iter_markdown_lines(markdown: str) -> Iterator[str]:
+    """
+    Get the lines of a markdown page which are not in fenced code blocks
+    """
+    fenced = False
+    for line in markdown.splitlines():
+        if line.lstrip().startswith('```'):
+            fenced = not fenced
+        elif not fenced:
+            yield line
+
+
+def collect_markdown_anchors(markdown: str) -> Set[str]:
+    """
+    Collect the anchors of the headings of a rendered page
+    """
+    anchors: Set[str] = set()
+    for line in iter_markdown_lines(markdown):
+        match = HEADING_RE.match(line)
+        if match:
+            heading = unescape(INLINE_LINK_RE.sub(r'\1', match.group(1)))
+            anchors.add(unique_anchor(slugify(heading), anchors))
+    return anchors
+
+
+def iter_page_links(markdown: str) -> Iterator[Tuple[str, str]]:
+    """
+    Get the links of a rendered page to itself and the other generated pages, in order
+
+    Returns:
+        pairs of the link text and the link
+    """
+    for line in iter_markdown_lines(markdown):
+        for match in PAGE_LINK_RE.finditer(line):
+            yield unescape(match.group(1)), match.group(2)
+
+
+def iter_heading_anchors(module: ParsedModule) -> Iterator[Tuple[str, str]]:
+    """
+    Get the headings module_to_markdown renders for a module, in order, with their anchors
+
+    This mirrors the headings of the renderers so that the anchors of pages which are not
+    rendered again (ex. written by a previous run with --since) are known without reading them
+
+    Returns:
+        pairs of the heading (ex. class Thing or save()) and its anchor
+    """
+    headings = [module['name']]
+    for var in module.get('variables', []):
+        headings.append(var['name'])
+    for cls in module.get('classes', []):
+        if cls.get('hidden', False):
+            continue
+        headings.append(f'class {cls["name"]}')
+        headings.extend(
+            f'{func["name"]}()' for func in cls.get('functions', []) if not func.get('hidden')
+        )
+    headings.extend(
+        f'{func["name"]}()' for func in module.get('functions', []) if not func.get('hidden')
+    )
+
+    anchors: Set[str] = set()
+    for heading in headings:
+        anchor = unique_anchor(slugify(heading), anchors)
+        anchors.add(anchor)
+        yield heading, anchor
+
+
+def collect_anchors(module: ParsedModule) -> Set[str]:
+    """
+    Collect the anchors of the headings module_to_markdown renders for a module
+    """
+    return {anchor for _, anchor in iter_heading_anchors(module)}
+
+
+def resolve_link(page: str, link: str) -> str:
+    """
+    Resolve a relative link from a page to the page and anchor it targets
+
+    Examples:
+        >>> resolve_link('package/api.md', '../models/#class-thing')
+        'package/models.md#class-thing'
+    """
+    path, anchor = link.split('#', 1)
+    if not path:
+        return f'{page}#{anchor}'
+    target = posixpath.normpath(posixpath.join(page[:-3], path))
+    return f'{target}.md#{anchor}'
+
+
+class LinkValidator:
+    """
+    Collects the anchors and links of the pages as they are generated and reports the links whose
+    page or anchor does not exist
+
+    Only links between the generated pages are checked (not those to other projects)
+    """
+
+    def __init__(self) -> None:
+        # page => anchors of its headings
+        self.anchors: Dict[str, Set[str]] = {}
+        # (page, type name, link)
+        self.links: List[Tuple[str, str, str]] = []
+
+    def add_page(self, page: str, parsed: ParsedModule, markdown: Optional[str] = None) -> None:
+        """
+        Add the anchors and links of a page
+
+        The anchors and links are taken from the markdown when it is given. Otherwise the page was
+        written by a previous run and only its anchors are collected, from the parsed module
+
+        Args:
+            page: the output filename of the module (ex. package/module.md)
+            parsed: the parsed module the page is rendered from
+            markdown: the rendered page
+        """
+        if markdown is None:
+            self.anchors[page] = collect_anchors(parsed)
+            return
+        self.anchors[page] = collect_markdown_anchors(markdown)
+        for name, link in dict.fromkeys(iter_page_links(markdown)):
+            self.links.append((page, name, link))
+
+    def validate(self) -> List[Dict[str, str]]:
+        """
+        Check the links collected against the anchors collected
+
+        Each broken link is described by the page it is on, the type name, the link, the page and
+        anchor it resolves to and the reason it is broken
+
+        Returns:
+            the broken links
+        """
+        broken = []
+        for page, name, link in self.links:
+            target = resolve_link(page, link)
+            target_page, anchor = target.split('#', 1)
+            if target_page not in self.anchors:
+                reason = 'missing page'
+            elif anchor not in self.anchors[target_page]:
+                reason = 'missing anchor'
+            else:
+                continue
+            broken.append(
+                {'page': page, 'type': name, 'link': link, 'target': target, 'reason': reason}
+            )
+        return broken
+
+
+class BrokenLinksError(Exception):
+    """
+    Raised after generating the pages when some of the links between them are broken
+    """
+
+    def __init__(self, broken: List[Dict[str, str]]):
+        super().__init__(f'{len(broken)} broken link(s)')
+        self.broken = broken
@@ -0,0 +1,167 @@
+import hashlib
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .cache import ContentCache
+from .git import get_repository_root, list_files_at, read_blobs
+from .main import parse_module_file, render_modules
+from .public import find_public_modules
+from .stubs import get_stub_filename
+from .types import ParsedModule
+from .writers import DEFAULT_WRITE_WORKERS, DirectoryWriter
+
+
+def parse_version_spec(spec: str) -> Tuple[str, str]:
+    """
+    Split a version given as REF[=NAME] into the git ref and the name of its output directory
+
+    The name defaults to the ref with any slashes replaced (ex. release/1.0 => release-1.0)
+    """
+    if '=' in spec:
+        ref, name = spec.split('=', 1)
+    else:
+        ref, name = spec, spec.replace('/', '-')
+    if not ref or not name or name in ['.', '..'] or '/' in name or os.sep in name:
+        raise ValueError(f'expected the version as REF[=NAME] with a plain directory name: {spec}')
+    return ref, name
+
+
+def iter_version_modules(
+    path: str, ref: str, cache: ContentCache, **parse_options
+) -> Iterator[Tuple[str, ParsedModule]]:
+    """
+    Parse the modules of a package as they were at a git ref, reading them from the repository
+
+    Only the sources of modules which are not already in the cache are read
+
+    Args:
+        path: the package directory or module file (within a git repository)
+        ref: the git ref to read the modules from
+        cache: the parsed modules of other versions
+
+    Returns:
+        pairs of the output filename (ex. package/module.md) and parsed module
+    """
+    if path.endswith('/'):
+        path = path[:-1]
+    path = os.path.realpath(path)
+    root = get_repository_root(path)
+    prefix = os.path.dirname(path) + os.sep
+    blobs = {filename: blob for blob, filename in list_files_at(ref, path, root)}
+    files = [filename for filename in blobs if filename.endswith('.py')]
+    contents: Dict[str, str] = {}
+
+    public: Dict[str, Any] = {}
+    if parse_options.get('public_api'):
+        init_blobs = [blobs[f] for f in files if os.path.basename(f) == '__init__.py']
+        contents.update(read_blobs(init_blobs, root))
+        public = find_public_modules(prefix, files, read=lambda f: contents[blobs[f]])
+        files = list(public)
+
+    def get_page(filename: str) -> str:
+        return filename[len(prefix) :].replace(os.sep, '/')[:-3] + '.md'
+
+    def get_options(filename: str) -> Dict[str, Any]:
+        return dict(parse_options, public_names=public.get(filename))
+
+    def get_stub_blob(filename: str) -> Optional[str]:
+        if not parse_options.get('prefer_stubs'):
+            return None
+        return blobs.get(get_stub_filename(filename))
+
+    def get_content_hash(filename: str) -> str:
+        return f'{blobs[filename]}:{get_stub_blob(filename) or ""}'
+
+    missing = []
+    for filename in files:
+        if not cache.has_parsed(
+            get_page(filename), get_content_hash(filename), get_options(filename)
+        ):
+            missing.extend(b for b in [blobs[filename], get_stub_blob(filename)] if b)
+    contents.update(read_blobs([b for b in missing if b not in contents], root))
+
+    for filename in files:
+        blob = blobs[filename]
+        stub_blob = get_stub_blob(filename)
+        options = get_options(filename)
+        yield get_page(filename), cache.parse_content(
+            get_page(filename),
+            get_content_hash(filename),
+            lambda: parse_module_file(
+                filename,
+                prefix,
+                content=contents[blob],
+                stub=contents[stub_blob] if stub_blob else None,
+                **options,
+            ),
+            options,
+        )
+
+
+def extract_versions(
+    paths: List[str],
+    output_dir: str,
+    versions: List[str],
+    link: bool = False,
+    external_links: Optional[Dict[str, str]] = None,
+    inherited_members: bool = False,
+    write_workers: int = DEFAULT_WRITE_WORKERS,
+    render_workers: int = 1,
+    backlinks: bool = False,
+    **parse_options,
+) -> None:
+    """
+    Generate the markdown pages for several git refs of the same packages in one run
+
+    Sources are read from the git repository without checking out the refs. Modules are parsed,
+    and pages rendered, once per distinct source (git blob) and link targets. Pages identical to
+    one written for an earlier version are hard linked to it where the filesystem supports it
+
+    Args:
+        paths: path(s) to python package directories or modules within a git repository
+        output_dir: the output directory. Each version is written to a directory under it
+        versions: the git refs to generate, as REF[=NAME] where NAME is the output directory
+        link: create links between types within each package
+        external_links: mapping of type name to url for types documented by other projects
+        inherited_members: document the attributes and methods classes inherit
+        write_workers: maximum concurrent writes
+        render_workers: render the pages in this many processes
+        backlinks: list the symbols which reference each class on its page
+        parse_options: options passed to parse_module_file (ex. hide_private)
+    """
+    specs = [parse_version_spec(spec) for spec in versions]
+    names = [name for _, name in specs]
+    if len(set(names)) != len(names):
+        raise ValueError(f'the output directory names of the versions must be unique ({names})')
+
+    cache = ContentCache()
+    # hash of the markdown => absolute path of the first page written with it
+    written: Dict[str, str] = {}
+
+    for ref, name in specs:
+        print('generating version:', ref)
+        version_dir = os.path.join(output_dir, name)
+        version_written: Dict[str, str] = {}
+        with DirectoryWriter(version_dir, workers=write_workers) as writer:
+            for path in paths:
+                pages = render_modules(
+                    iter_version_modules(path, ref, cache, **parse_options),
+                    link=link,
+                    external_links=external_links,
+                    cache=cache,
+                    inherited_members=inherited_members,
+                    render_workers=render_workers,
+                    backlinks=backlinks,
+                )
+                for module_filename, _, markdown in pages:
+                    digest = hashlib.sha1(markdown.encode('utf8')).hexdigest()
+                    if digest in written:
+                        writer.link(module_filename, written[digest], markdown)
+                    else:
+                        writer.write(module_filename, markdown)
+                        version_written.setdefault(
+                            digest, os.path.join(version_dir, module_filename)
+                        )
+        # only link to pages once the writer has finished writing them
+        for digest, filename in version_written.items():
+            written.setdefault(digest, filename)
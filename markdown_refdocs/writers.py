@@ -0,0 +1,332 @@
+import gzip
+import io
+from abc import ABC, abstractmethod
+import os
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import TracebackType
+from typing import IO, List, Optional, Set, Tuple, Type
+
+DEFAULT_WRITE_WORKERS = 8
+
+ARCHIVE_FORMATS = ['zip', 'tar', 'tar.gz', 'tgz', 'tar.bz2', 'tar.xz']
+
+ZIP_EPOCH = 315532800  # 1980-01-01, the earliest time a zip member can have
+
+
+class PageWriter(ABC):
+    """
+    Destination for rendered markdown pages
+
+    Pages are identified by their path relative to the output root (ex. package/module.md)
+    """
+
+    @abstractmethod
+    def write(self, relative_path: str, content: str) -> None:
+        pass
+
+    @abstractmethod
+    def remove(self, relative_path: str) -> None:
+        """
+        Remove a previously written page if it exists
+        """
+
+    def exists(self, relative_path: str) -> bool:
+        """
+        Check if a page was written by a previous run (and so may not need to be written again)
+        """
+        return False
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> 'PageWriter':
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        try:
+            self.close()
+        except Exception:
+            pass  # do not mask the original error
+
+
+class DirectoryWriter(PageWriter):
+    """
+    Writes pages as files under an output directory using a bounded pool of threads
+
+    Each file is written to a temporary file in the same directory and then renamed into place so
+    that readers never see a partially written page. Directories are only created once per run.
+    Errors are reported in the order the pages were submitted once all writes have finished
+
+    Args:
+        output_dir: the directory to write pages to
+        workers: the maximum number of pages written concurrently (1 writes synchronously)
+    """
+
+    def __init__(self, output_dir: str, workers: int = DEFAULT_WRITE_WORKERS):
+        self.output_dir = output_dir
+        self.workers = max(1, workers)
+        self._created_dirs: Set[str] = set()
+        self._dirs_lock = threading.Lock()
+        self._pending: List[Tuple[str, Future]] = []
+        self._errors: List[Tuple[str, Exception]] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # bound the number of rendered pages held in memory waiting to be written
+        self._slots = threading.BoundedSemaphore(self.workers * 2)
+
+        umask = os.umask(0)
+        os.umask(umask)
+        self._file_mode = 0o666 & ~umask
+
+        if self.workers > 1:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers)
+
+    def _makedirs(self, dirname: str) -> None:
+        with self._dirs_lock:
+            if dirname in self._created_dirs:
+                return
+            os.makedirs(dirname, exist_ok=True)
+            self._created_dirs.add(dirname)
+
+    def _write_file(self, filename: str, content: str) -> None:
+        dirname = os.path.dirname(filename)
+        self._makedirs(dirname)
+        handle, temp_filename = tempfile.mkstemp(
+            dir=dirname, prefix=f'.{os.path.basename(filename)}.', suffix='.tmp'
+        )
+        try:
+            with os.fdopen(handle, 'w', encoding='utf8') as fh:
+                fh.write(content)
+            os.chmod(temp_filename, self._file_mode)
+            os.replace(temp_filename, filename)
+        except BaseException:
+            try:
+                os.remove(temp_filename)
+            except OSError:
+                pass
+            raise
+
+    def _write_task(self, filename: str, content: str) -> None:
+        try:
+            self._write_file(filename, content)
+        finally:
+            self._slots.release()
+
+    def write(self, relative_path: str, content: str) -> None:
+        filename = os.path.join(self.output_dir, relative_path)
+        print('writing:', filename)
+
+        if self._executor is None:
+            try:
+                self._write_file(filename, content)
+            except Exception as err:
+                self._errors.append((filename, err))
+            return
+
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._write_task, filename, content)
+        except BaseException:
+            self._slots.release()
+            raise
+        self._pending.append((filename, future))
+
+    def link(self, relative_path: str, source: str, content: str) -> None:
+        """
+        Write a page as a hard link to an identical file which has already been written
+
+        Falls back to writing the content when the filesystem does not support hard links (or the
+        source is on another device)
+
+        Args:
+            relative_path: the page to write
+            source: path to the existing file with the same content
+            content: the content of the page
+        """
+        filename = os.path.join(self.output_dir, relative_path)
+        dirname = os.path.dirname(filename)
+        self._makedirs(dirname)
+        temp_filename = os.path.join(dirname, f'.{os.path.basename(filename)}.{os.getpid()}.link')
+        try:
+            os.link(source, temp_filename)
+            os.replace(temp_filename, filename)
+        except OSError:
+            try:
+                os.remove(temp_filename)
+            except OSError:
+                pass
+            self.write(relative_path, content)
+            return
+        print('linking:', filename)
+
+    def remove(self, relative_path: str) -> None:
+        filename = os.path.join(self.output_dir, relative_path)
+        if os.path.exists(filename):
+            print('removing:', filename)
+            os.remove(filename)
+
+    def exists(self, relative_path: str) -> bool:
+        return os.path.isfile(os.path.join(self.output_dir, relative_path))
+
+    def close(self) -> None:
+        """
+        Wait for all pending writes to finish
+
+        Raises:
+            OSError: the first error (in submission order) encountered writing a page
+        """
+        if self._executor is not None:
+            for filename, future in self._pending:
+                err = future.exception()
+                if err is not None:
+                    self._errors.append((filename, err))  # type: ignore
+            self._pending = []
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        errors, self._errors = self._errors, []
+        for filename, err in errors:
+            print('error writing:', filename, f'({err})')
+        if errors:
+            raise errors[0][1]
+
+
+def archive_format(filename: str) -> Optional[str]:
+    """
+    Get the archive format implied by the extension of a filename
+
+    Returns:
+        the archive format or None if the filename is not an archive
+    """
+    for ext in sorted(ARCHIVE_FORMATS, key=len, reverse=True):
+        if filename.lower().endswith(f'.{ext}'):
+            return ext
+    return None
+
+
+def reproducible_timestamp() -> int:
+    """
+    Timestamp to use for archive members, from SOURCE_DATE_EPOCH if set so builds can match it
+
+    Note:
+        zip archives can not represent times before 1980 so they are clamped to 1980-01-01
+    """
+    try:
+        return int(os.environ['SOURCE_DATE_EPOCH'])
+    except (KeyError, ValueError):
+        return 0
+
+
+class ArchiveWriter(PageWriter):
+    """
+    Streams pages directly into a single zip or tar archive
+
+    Each page is added as an archive member as soon as it is written so only one rendered page is
+    held in memory at a time. Members are written in the order pages are given with fixed
+    timestamps, ownership and permissions so that the same input produces an identical archive
+
+    Args:
+        filename: path to the archive to create
+        archive: the archive format (see ARCHIVE_FORMATS). Defaults to the filename extension
+    """
+
+    def __init__(self, filename: str, archive: Optional[str] = None):
+        self.filename = filename
+        self.archive = archive or archive_format(filename)
+        if self.archive not in ARCHIVE_FORMATS:
+            raise ValueError(
+                f'unsupported archive format ({self.archive}) expected one of {ARCHIVE_FORMATS}'
+            )
+        self.timestamp = reproducible_timestamp()
+        self._names: Set[str] = set()
+        self._fileobj: Optional[IO[bytes]] = None
+        self._gzip: Optional[gzip.GzipFile] = None
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._tar: Optional[tarfile.TarFile] = None
+
+        dirname = os.path.dirname(filename)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+
+        if self.archive == 'zip':
+            self._zip = zipfile.ZipFile(filename, 'w', compression=zipfile.ZIP_DEFLATED)
+        elif self.archive in ['tar.gz', 'tgz']:
+            self._fileobj = open(filename, 'wb')
+            self._gzip = gzip.GzipFile(
+                filename='', mode='wb', fileobj=self._fileobj, mtime=self.timestamp
+            )
+            self._tar = tarfile.open(fileobj=self._gzip, mode='w', format=tarfile.PAX_FORMAT)
+        else:
+            mode = 'w' if self.archive == 'tar' else f'w:{self.archive.split(".")[-1]}'
+            self._tar = tarfile.open(filename, mode=mode, format=tarfile.PAX_FORMAT)
+
+    def write(self, relative_path: str, content: str) -> None:
+        name = relative_path.replace(os.sep, '/').lstrip('/')
+        if name in self._names:
+            raise ValueError(f'duplicate archive member ({name})')
+        self._names.add(name)
+        print('writing:', f'{self.filename}:{name}')
+        data = content.encode('utf8')
+
+        if self._zip is not None:
+            info = zipfile.ZipInfo(name, date_time=time.gmtime(max(self.timestamp, ZIP_EPOCH))[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            self._zip.writestr(info, data)
+        elif self._tar is not None:
+            tarinfo = tarfile.TarInfo(name)
+            tarinfo.size = len(data)
+            tarinfo.mtime = self.timestamp
+            tarinfo.mode = 0o644
+            tarinfo.uid = tarinfo.gid = 0
+            tarinfo.uname = tarinfo.gname = ''
+            self._tar.addfile(tarinfo, io.BytesIO(data))
+
+    def remove(self, relative_path: str) -> None:
+        # the archive is created new, so only pages of this run (which can not be removed) exist
+        name = relative_path.replace(os.sep, '/').lstrip('/')
+        if name in self._names:
+            raise ValueError(f'pages can not be removed from an archive once written ({name})')
+
+    def close(self) -> None:
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+        if self._tar is not None:
+            self._tar.close()
+            self._tar = None
+        if self._gzip is not None:
+            self._gzip.close()
+            self._gzip = None
+        if self._fileobj is not None:
+            self._fileobj.close()
+            self._fileobj = None
+
+
+def create_writer(
+    output: str, archive: Optional[str] = None, workers: int = DEFAULT_WRITE_WORKERS
+) -> PageWriter:
+    """
+    Create the writer for an output location
+
+    Args:
+        output: the output directory or archive filename
+        archive: write to an archive of this format instead of a directory. Implied when the
+            output ends with an archive extension (ex. docs.zip)
+        workers: maximum concurrent writes when writing to a directory
+    """
+    if archive or archive_format(output):
+        return ArchiveWriter(output, archive=archive)
+    return DirectoryWriter(output, workers=workers)
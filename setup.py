@@ -1,7 +1,9 @@
+from typing import List
+
 from setuptools import find_packages, setup
 
 # Dependencies required to use your package
-INSTALL_REQS = ['typing_extensions>=3.7.4.2']
+INSTALL_REQS: List[str] = []
 
 # Dependencies required only for running tests
 TEST_REQS = ['pytest', 'pytest-runner', 'pytest-cov']
@@ -11,6 +13,9 @@ DEPLOYMENT_REQS = ['twine', 'wheel']
 
 DOC_REQS = ['mkdocs', 'mkdocs-material']
 
+# Dependencies required to use the mkdocs plugin
+MKDOCS_REQS = ['mkdocs>=1.2']
+
 DEV_REQS = (
     TEST_REQS + DEPLOYMENT_REQS + DOC_REQS + ['black', 'flake8', 'flake8-annotations', 'mypy']
 )
@@ -38,6 +43,7 @@ setup(
         'deploy': DEPLOYMENT_REQS,
         'test': TEST_REQS,
         'docs': DOC_REQS,
+        'mkdocs': MKDOCS_REQS,
     },
     package_data={'markdown_refdocs': ['py.typed']},
     python_requires='>=3.6',
@@ -47,7 +53,8 @@ setup(
     test_suite='tests',
     tests_require=TEST_REQS,
     entry_points={
-        'console_scripts': ['markdown_refdocs = markdown_refdocs.main:command_interface']
+        'console_scripts': ['markdown_refdocs = markdown_refdocs.main:command_interface'],
+        'mkdocs.plugins': ['markdown_refdocs = markdown_refdocs.mkdocs_plugin:RefdocsPlugin'],
     },
     url='https://github.com/creisle/markdown_refdocs',
 )
@@ -0,0 +1,39 @@
+import subprocess
+from typing import Dict
+
+import pytest
+
+
+@pytest.fixture
+def make_package(tmpdir):
+    """
+    Create a package directory from its module sources, given by path relative to the package
+    (ex. sub/module.py). The package __init__ has a docstring unless another one is given
+    """
+
+    def make(modules: Dict[str, str], name: str = 'package'):
+        pkg = tmpdir.mkdir(name)
+        pkg.join('__init__.py').write('"""the package"""\n')
+        for path, source in modules.items():
+            pkg.join(path).write(source, ensure=True)
+        return pkg
+
+    return make
+
+
+@pytest.fixture
+def git():
+    """
+    Run a git command in the given repository, with a test author for commits
+    """
+
+    def run(repo, *args):
+        subprocess.run(
+            ['git', '-c', 'user.name=test', '-c', 'user.email=test@test', *args],
+            cwd=str(repo),
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+    return run
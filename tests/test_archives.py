@@ -0,0 +1,110 @@
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+from markdown_refdocs.archives import get_module_paths, read_archive_modules
+from markdown_refdocs.main import extract_to_markdown, iter_markdown
+
+MODELS = "class Thing:\n    '''a thing'''\n    name: str\n"
+API = "def get_thing() -> Thing:\n    '''get a thing'''\n"
+
+
+@pytest.fixture
+def wheel(tmpdir):
+    filename = str(tmpdir.join('package-1.0-py3-none-any.whl'))
+    with zipfile.ZipFile(filename, 'w') as archive:
+        archive.writestr('package/__init__.py', '"""the package"""\n')
+        archive.writestr('package/models.py', MODELS)
+        archive.writestr('package/api.py', API)
+        archive.writestr('package-1.0.dist-info/METADATA', 'Name: package\n')
+        archive.writestr('package-1.0.data/purelib/extra.py', '"""extra module"""\n')
+        archive.writestr('package-1.0.data/scripts/run.py', '"""a script"""\n')
+    return filename
+
+
+@pytest.fixture
+def sdist(tmpdir):
+    filename = str(tmpdir.join('package-1.0.tar.gz'))
+    members = {
+        'package-1.0/setup.py': '"""setup"""\n',
+        'package-1.0/PKG-INFO': 'Name: package\n',
+        'package-1.0/docs/conf.py': '"""sphinx config"""\n',
+        'package-1.0/src/package/__init__.py': '"""the package"""\n',
+        'package-1.0/src/package/sub/__init__.py': '',
+        'package-1.0/src/package/sub/models.py': MODELS,
+        'package-1.0/tests/test_models.py': '"""tests"""\n',
+        'package-1.0/src/package/legacy.py': (
+            "# -*- coding: latin-1 -*-\n'''caf\xe9'''\n".encode('latin-1')
+        ),
+    }
+    with tarfile.open(filename, 'w:gz') as archive:
+        for name, content in members.items():
+            data = content if isinstance(content, bytes) else content.encode('utf8')
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return filename
+
+
+def test_get_module_paths():
+    assert get_module_paths(
+        ['a-1.0/setup.py', 'a-1.0/a/__init__.py', 'a-1.0/a/b/__init__.py', 'a-1.0/a/b/c.py']
+    ) == {
+        'a/__init__.py': 'a-1.0/a/__init__.py',
+        'a/b/__init__.py': 'a-1.0/a/b/__init__.py',
+        'a/b/c.py': 'a-1.0/a/b/c.py',
+    }
+    assert get_module_paths(['six.py', 'docs/conf.py']) == {'six.py': 'six.py'}
+
+
+class TestReadArchiveModules:
+    def test_wheel(self, wheel):
+        prefix, sources = read_archive_modules(wheel)
+        assert prefix == wheel + os.sep
+        assert [f[len(prefix) :] for f in sources] == [
+            'extra.py',
+            'package/__init__.py',
+            'package/api.py',
+            'package/models.py',
+        ]
+        assert sources[prefix + 'package/models.py'] == MODELS
+
+    def test_sdist(self, sdist):
+        prefix, sources = read_archive_modules(sdist)
+        assert [f[len(prefix) :] for f in sources] == [
+            'package/__init__.py',
+            'package/legacy.py',
+            'package/sub/__init__.py',
+            'package/sub/models.py',
+        ]
+        assert sources[prefix + 'package/legacy.py'].endswith("'''caf\xe9'''\n")
+
+
+def test_iter_markdown_from_wheel(wheel, tmpdir):
+    pages = {page: md for page, _, md in iter_markdown([wheel], link=True, public_api=True)}
+    assert sorted(pages) == [
+        'extra.md',
+        'package/__init__.md',
+        'package/api.md',
+        'package/models.md',
+    ]
+    assert '[Thing](../models/#class-thing)' in pages['package/api.md']
+
+
+def test_extract_sdist(sdist, tmpdir, capsys):
+    output = tmpdir.join('output')
+    options = dict(link=True, cache_dir=str(tmpdir.join('cache')))
+    extract_to_markdown([sdist], str(output), **options)
+    assert output.join('package', 'sub', 'models.md').check()
+    assert not output.join('docs').check()
+    capsys.readouterr()
+    # parsed modules are cached by their content as for files on disk
+    extract_to_markdown([sdist], str(output), **options)
+    out = capsys.readouterr().out
+    assert 'processing module' not in out
+    assert 'writing:' not in out
+
+    with pytest.raises(ValueError):
+        extract_to_markdown([sdist], str(output), since='HEAD')
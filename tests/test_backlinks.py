@@ -0,0 +1,138 @@
+from markdown_refdocs.backlinks import ReferenceIndex
+from markdown_refdocs.cache import ModuleCache
+from markdown_refdocs.main import iter_markdown
+from markdown_refdocs.types import ParsedModule
+
+LINKS = {
+    'Config': './package/models.md/#class-config',
+    'Client': './package/api.md/#class-client',
+    'DEFAULT': './package/models.md/#default',
+}
+
+
+def function(name, *types, returns=None, **kwargs):
+    func = {
+        'name': name,
+        'parameters': [{'name': f'arg{i}', 'type': t} for i, t in enumerate(types)],
+    }
+    if returns:
+        func['returns'] = {'type': returns}
+    func.update(kwargs)
+    return func
+
+
+def create_index():
+    index = ReferenceIndex()
+    index.add_module(
+        'package/api.md',
+        ParsedModule(
+            {
+                'name': 'package/api',
+                'variables': [],
+                'classes': [
+                    {
+                        'name': 'Client',
+                        'attributes': [{'name': 'config', 'type': 'Optional[Config]'}],
+                        'functions': [
+                            function('Client.reload', 'Config', returns='Config'),
+                            function('Client._hidden', 'Config', hidden=True),
+                            function('Client.copy', 'Config', inherited_from='Base'),
+                        ],
+                    }
+                ],
+                'functions': [
+                    function('connect', 'Config', 'str', returns='Client'),
+                    function('default', returns='DEFAULT'),
+                ],
+            }
+        ),
+        LINKS,
+    )
+    index.build()
+    return index
+
+
+def test_reference_index():
+    index = create_index()
+    names = [
+        index.symbol_names[i] for i in index.referenced_by('./package/models.md/#class-config')
+    ]
+    assert names == [
+        'package.api.Client.config',
+        'package.api.Client.reload()',
+        'package.api.connect()',
+    ]
+    names = [index.symbol_names[i] for i in index.referenced_by('./package/api.md/#class-client')]
+    assert names == ['package.api.connect()']
+    # only classes are indexed
+    assert index.referenced_by('./package/models.md/#default') == []
+    assert index.referenced_by('./package/other.md/#class-other') == []
+    assert index.offsets.typecode == index.referrers.typecode == 'I'
+    assert len(index.referrers) == 4
+
+
+def test_get_backlinks():
+    index = create_index()
+    parsed = ParsedModule({'name': 'package/models', 'classes': [{'name': 'Config'}]})
+    assert index.get_backlinks('package/models.md', parsed) == {
+        'Config': [
+            ('package.api.Client.config', '../api/#class-client'),
+            ('package.api.Client.reload()', '../api/#clientreload'),
+            ('package.api.connect()', '../api/#connect'),
+        ]
+    }
+    assert index.get_backlinks('package/other.md', ParsedModule({'name': 'package/other'})) is None
+
+
+def write_package(tmpdir):
+    pkg = tmpdir.mkdir('package')
+    pkg.join('__init__.py').write('"""the package"""\n')
+    pkg.join('models.py').write('''
+class Config:
+    """the config"""
+
+    def reload(self) -> None:
+        """reload the config"""
+''')
+    pkg.join('api.py').write('''
+from .models import Config
+
+
+def connect(config: Config) -> None:
+    """connect to the server"""
+''')
+    return pkg
+
+
+def test_referenced_by_section(tmpdir):
+    pkg = write_package(tmpdir)
+    for workers in [1, 2]:
+        pages = {
+            page: md
+            for page, _, md in iter_markdown(
+                [str(pkg)], link=True, backlinks=True, render_workers=workers
+            )
+        }
+        assert '**Referenced by**\n\n- [package.api.connect()](../api/#connect)\n' in (
+            pages['package/models.md']
+        )
+
+    pages = {page: md for page, _, md in iter_markdown([str(pkg)], link=True)}
+    assert 'Referenced by' not in pages['package/models.md']
+
+
+def test_cache_notices_new_references(tmpdir):
+    pkg = write_package(tmpdir)
+    cache = ModuleCache()
+    list(iter_markdown([str(pkg)], link=True, backlinks=True, cache=cache))
+    pkg.join('api.py').write(
+        pkg.join('api.py').read()
+        + '\n\ndef disconnect(config: Config) -> None:\n    """disconnect"""\n'
+    )
+    cache.reset()
+    pages = {
+        page: md
+        for page, _, md in iter_markdown([str(pkg)], link=True, backlinks=True, cache=cache)
+    }
+    assert '- [package.api.disconnect()](../api/#disconnect)' in pages['package/models.md']
+    assert 'package/models.md' not in cache.unchanged
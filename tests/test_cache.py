@@ -0,0 +1,102 @@
+import os
+
+import pytest
+from markdown_refdocs import main
+from markdown_refdocs.cache import ModuleCache
+from markdown_refdocs.main import extract_to_markdown, iter_markdown
+
+
+@pytest.fixture
+def package(make_package):
+    return make_package(
+        {
+            'models.py': "class Thing:\n    '''a thing'''\n    name: str\n",
+            'api.py': "def get_thing() -> Thing:\n    '''get a thing'''\n",
+            'other.py': "def other() -> int:\n    '''other'''\n",
+        }
+    )
+
+
+@pytest.fixture
+def counts(monkeypatch):
+    counts = {'parse': 0, 'render': 0}
+    parse_module_file = main.parse_module_file
+    module_to_markdown = main.module_to_markdown
+
+    def counting_parse(*args, **kwargs):
+        counts['parse'] += 1
+        return parse_module_file(*args, **kwargs)
+
+    def counting_render(*args, **kwargs):
+        counts['render'] += 1
+        return module_to_markdown(*args, **kwargs)
+
+    monkeypatch.setattr(main, 'parse_module_file', counting_parse)
+    monkeypatch.setattr(main, 'module_to_markdown', counting_render)
+    return counts
+
+
+def run(package, cache_dir):
+    cache = ModuleCache(str(cache_dir))
+    pages = {p: md for p, _, md in iter_markdown([str(package)], link=True, cache=cache)}
+    return pages, cache
+
+
+class TestModuleCache:
+    def test_reuses_unchanged_pages(self, package, tmpdir, counts):
+        first, _ = run(package, tmpdir.join('cache'))
+        assert counts == {'parse': 4, 'render': 4}
+
+        second, cache = run(package, tmpdir.join('cache'))
+        assert second == first
+        assert counts == {'parse': 4, 'render': 4}
+        assert cache.unchanged == set(first)
+
+    def test_rerenders_pages_when_link_target_moves(self, package, tmpdir, counts):
+        first, _ = run(package, tmpdir.join('cache'))
+        package.join('models.py').write('"""no more things"""\n')
+        package.join('things.py').write("class Thing:\n    '''a thing'''\n    name: str\n")
+
+        second, cache = run(package, tmpdir.join('cache'))
+        # models.py and things.py are parsed, all but other.md are rendered
+        assert counts == {'parse': 6, 'render': 7}
+        assert cache.unchanged == {'package/__init__.md', 'package/other.md'}
+        assert '../things/#class-thing' in second['package/api.md']
+
+    def test_parse_options_invalidate(self, package, tmpdir, counts):
+        run(package, tmpdir.join('cache'))
+        cache = ModuleCache(str(tmpdir.join('cache')))
+        list(iter_markdown([str(package)], link=True, cache=cache, hide_undoc=False))
+        assert counts['parse'] == 8
+        assert not cache.unchanged
+
+    def test_ignores_corrupt_entries(self, package, tmpdir, counts):
+        first, _ = run(package, tmpdir.join('cache'))
+        for filename in tmpdir.join('cache').listdir():
+            filename.write('not a pickle')
+        second, cache = run(package, tmpdir.join('cache'))
+        assert second == first
+        assert counts['parse'] == 8
+        assert not cache.unchanged
+
+    def test_in_memory(self, package, counts):
+        cache = ModuleCache()
+        first = list(iter_markdown([str(package)], link=True, cache=cache))
+        package.join('other.py').write("def other() -> Thing:\n    '''other'''\n")
+        cache.reset()
+        second = list(iter_markdown([str(package)], link=True, cache=cache))
+        assert counts == {'parse': 5, 'render': 5}
+        assert cache.unchanged == {'package/__init__.md', 'package/api.md', 'package/models.md'}
+        assert [p[0] for p in second] == [p[0] for p in first]
+
+
+def test_extract_skips_unchanged_writes(package, tmpdir, capsys):
+    output = str(tmpdir.join('output'))
+    extract_to_markdown([str(package)], output, link=True, cache_dir=str(tmpdir.join('cache')))
+    assert capsys.readouterr().out.count('writing:') == 4
+
+    os.remove(os.path.join(output, 'package', 'other.md'))
+    package.join('api.py').write("def get_thing() -> Thing:\n    '''get the thing'''\n")
+    extract_to_markdown([str(package)], output, link=True, cache_dir=str(tmpdir.join('cache')))
+    written = [line for line in capsys.readouterr().out.splitlines() if 'writing:' in line]
+    assert sorted(os.path.basename(line) for line in written) == ['api.md', 'other.md']
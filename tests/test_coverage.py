@@ -0,0 +1,106 @@
+import json
+import sys
+
+import pytest
+from markdown_refdocs.coverage import CoverageError, CoverageReport
+from markdown_refdocs.main import command_interface, extract_to_markdown, parse_module_file
+
+SOURCE = '''
+"""the module"""
+
+class Thing:
+    """a thing
+
+    Args:
+        name: the name of the thing
+    """
+
+    def __init__(self, name, size):
+        pass
+
+    def grow(self, amount):
+        """grow the thing"""
+
+    def _private(self):
+        pass
+
+
+def get_thing(name: str) -> Thing:
+    """
+    get a thing
+
+    Args:
+        name: the name of the thing
+    """
+
+
+def undocumented():
+    pass
+'''
+
+
+@pytest.fixture
+def package(make_package):
+    return make_package(
+        {
+            'module.py': SOURCE,
+            'sub/__init__.py': '',
+            'sub/other.py': 'def other():\n    """other"""\n',
+        }
+    )
+
+
+class TestCoverageReport:
+    def test_counts(self):
+        coverage = CoverageReport()
+        coverage.add_module(parse_module_file('package/module.py', content=SOURCE))
+        assert coverage.counts['package/module'] == {
+            'module': [1, 1],
+            'class': [1, 1],
+            'function': [1, 2],
+            'method': [2, 2],
+            'parameter': [2, 4],
+        }
+        assert coverage.undocumented['package/module'] == [
+            'Thing.__init__(size)',
+            'Thing.grow(amount)',
+            'undocumented',
+        ]
+
+    def test_private(self):
+        coverage = CoverageReport(hide_private=False)
+        coverage.add_module(
+            parse_module_file('package/module.py', content=SOURCE, hide_private=False)
+        )
+        assert coverage.counts['package/module']['method'] == [2, 3]
+
+
+def test_report(package, tmpdir):
+    report = str(tmpdir.join('coverage.json'))
+    extract_to_markdown([str(package)], str(tmpdir.join('output')), coverage_report=report)
+    with open(report, 'r') as fh:
+        content = json.load(fh)
+    assert content['total']['documented'] == 9
+    assert content['total']['total'] == 14
+    assert content['total']['kinds']['function'] == {
+        'documented': 2,
+        'total': 3,
+        'percent': 66.67,
+    }
+    assert sorted(content['packages']) == ['package', 'package/sub']
+    assert content['packages']['package']['total'] == 14
+    assert content['packages']['package/sub']['documented'] == 1
+    assert content['packages']['package/sub']['total'] == 3
+    assert content['modules']['package/sub/__init__']['undocumented'] == ['package/sub/__init__']
+
+
+def test_fail_under(package, tmpdir, monkeypatch):
+    with pytest.raises(CoverageError):
+        extract_to_markdown([str(package)], str(tmpdir.join('output')), fail_under=70)
+    extract_to_markdown([str(package)], str(tmpdir.join('output')), fail_under=64)
+
+    argv = ['markdown_refdocs', str(package), '-o', str(tmpdir.join('output'))]
+    monkeypatch.setattr(sys, 'argv', argv + ['--fail_under', '90'])
+    with pytest.raises(SystemExit) as exc_info:
+        command_interface()
+    assert exc_info.value.code == 'documentation coverage 64.29% is under 90.0%'
@@ -0,0 +1,177 @@
+import ast
+import sys
+
+import pytest
+from markdown_refdocs.expressions import (
+    ExpressionRenderer,
+    copy_expression,
+    get_expression_depth,
+    unparse_fallback,
+)
+from markdown_refdocs.main import parse_module_file
+
+EXPRESSIONS = [
+    'Dict[str, List[int]]',
+    'Callable[[int, str], Optional[Tuple[int, ...]]]',
+    'int | None',
+    'typing.Union[a.b.C, "D"]',
+    'x[1:2, ::3]',
+    'f(a, *args, key=1, **kwargs)',
+    'lambda a, b=1, *c, d, e=2, **f: a + b',
+    'lambda: None',
+    '-x ** 2 if not a and b or c else (yield)',
+    'a < b <= c is not d not in e',
+    '[x for x in y if x]',
+    '{k: v for k, v in items}',
+    '{1, 2}',
+    '{"a": 1, **b}',
+    '(1,)',
+    "b'bytes'",
+    "f'{a!r:>{width}} {{literal}}'",
+    '(a + b).c',
+    pytest.param(
+        '(a := 1)',
+        marks=pytest.mark.skipif(sys.version_info < (3, 8), reason='assignment expressions'),
+    ),
+]
+
+
+@pytest.mark.parametrize('source', EXPRESSIONS)
+def test_unparse_fallback(source):
+    node = ast.parse(source, mode='eval').body
+    rendered = unparse_fallback(node)
+    assert ast.dump(ast.parse(rendered, mode='eval').body) == ast.dump(node)
+
+
+@pytest.mark.parametrize(
+    'source',
+    ['int | str | None', 'a - (b - c)', 'a * b + c', '(a + b) * c', 'a ** b ** c', '(a ** b) ** c'],
+)
+def test_unparse_fallback_binary_precedence(source):
+    assert unparse_fallback(ast.parse(source, mode='eval').body) == source
+
+
+class TestExpressionRenderer:
+    def render(self, source, annotation=True):
+        renderer = ExpressionRenderer([source])
+        return renderer.render(ast.parse(source, mode='eval').body, annotation=annotation)
+
+    def test_forward_references(self):
+        assert self.render("Optional['Thing']") == 'Optional[Thing]'
+        assert self.render("'Thing'") == 'Thing'
+        assert self.render("'Thing'", annotation=False) == "'Thing'"
+
+    def test_literal_strings(self):
+        assert self.render("Literal['a', 'b']") == "Literal['a', 'b']"
+        assert self.render("Dict['Key', typing.Literal['a']]") == "Dict[Key, typing.Literal['a']]"
+
+    def test_tuple_without_parentheses(self):
+        assert self.render('a, b', annotation=False) == 'a, b'
+
+    def test_memoized_by_source(self):
+        lines = ['def f(a: Dict[str, int], b: Dict[str, int]): pass']
+        function = ast.parse(lines[0]).body[0]
+        renderer = ExpressionRenderer(lines)
+        first, second = [renderer.render(a.annotation, True) for a in function.args.args]
+        assert first == 'Dict[str, int]'
+        assert first is second
+        assert len(renderer._rendered) == 1
+
+
+def test_parse_module_annotations():
+    source = '''
+def create(
+    kind: "Thing" | None = None,
+    mode: Literal["r", "w"] = "r",
+    callback: Callable[..., int] = lambda: 1,
+) -> None:
+    """create a thing"""
+'''
+    parsed = parse_module_file('package/mod.py', content=source)
+    func = parsed['functions'][0]
+    assert [p['type'] for p in func['parameters']] == [
+        'Thing | None',
+        "Literal['r', 'w']",
+        'Callable[..., int]',
+    ]
+    # ast.unparse (python 3.9+) writes lambda: 1 as lambda : 1
+    assert [ast.dump(ast.parse(p['default_value'])) for p in func['parameters']] == [
+        ast.dump(ast.parse(value)) for value in ['None', "'r'", 'lambda: 1']
+    ]
+    assert 'type' not in func['returns']
+
+
+def test_get_expression_depth():
+    assert get_expression_depth(ast.parse('x', mode='eval').body) == 1
+    assert get_expression_depth(ast.parse('Dict[str, List[int]]', mode='eval').body) == 4
+    deep = ast.parse(' | '.join(['int'] * 50), mode='eval').body
+    assert get_expression_depth(deep) == 50
+    assert get_expression_depth(deep, limit=10) == 11
+
+
+def test_copy_expression_deeply_nested():
+    # deeper than the recursion limit, which ast.parse would not allow
+    node: ast.expr = ast.Constant(value='Thing')
+    for _ in range(5000):
+        node = ast.Attribute(value=node, attr='a', ctx=ast.Load())
+    copy = copy_expression(node, forward_references=True)
+    assert copy is not node
+    assert get_expression_depth(copy) == 5001
+    while isinstance(copy, ast.Attribute):
+        copy = copy.value
+    assert isinstance(copy, ast.Name) and copy.id == 'Thing'
+
+
+class TestMaxDepth:
+    def test_shown_as_source(self):
+        lines = ['def f(a: Union["A", ', '    ' + ' | '.join(['int'] * 20) + ']): pass']
+        function = ast.parse('\n'.join(lines)).body[0]
+        annotation = function.args.args[0].annotation
+        assert ExpressionRenderer(lines).render(annotation, True) == (
+            'Union[A, ' + ' | '.join(['int'] * 20) + ']'
+        )
+        # the source of an expression is only known with its end position (python 3.8+)
+        assert ExpressionRenderer(lines, max_depth=10).render(annotation, True) == (
+            'Union["A", ' + ' | '.join(['int'] * 20) + ']' if sys.version_info >= (3, 8) else '...'
+        )
+
+    def test_parse_module_pathological_nesting(self):
+        union = ' | '.join(['int'] * 500)
+        chain = '.'.join(['a'] * 500)
+        source = f'''
+def create(kind: {union}, mode: "Thing" = {chain}) -> None:
+    """create a thing"""
+'''
+        parsed = parse_module_file('package/mod.py', content=source)
+        func = parsed['functions'][0]
+        if sys.version_info >= (3, 8):
+            assert [(p.get('type'), p.get('default_value')) for p in func['parameters']] == [
+                (union, None),
+                ('Thing', chain),
+            ]
+        else:
+            assert [(p.get('type'), p.get('default_value')) for p in func['parameters']] == [
+                ('...', None),
+                ('Thing', '...'),
+            ]
+        assert func['source_definition'].startswith('def create(kind: int | int')
+
+    def test_parse_module_deep_statements(self):
+        chain = ' + '.join(['1'] * 900)
+        source = f'''
+"""the module"""
+{chain}
+if {chain}:
+    pass
+
+
+class Thing:
+    """a thing"""
+    {chain}
+
+    def run(self):
+        """run"""
+'''
+        parsed = parse_module_file('package/mod.py', content=source)
+        assert [cls['name'] for cls in parsed['classes']] == ['Thing']
+        assert [func['name'] for func in parsed['classes'][0]['functions']] == ['Thing.run']
@@ -0,0 +1,100 @@
+import json
+import os
+import sys
+
+import pytest
+from markdown_refdocs import main
+from markdown_refdocs.failures import load_failure_report
+from markdown_refdocs.linkindex import render_pages, write_link_index
+from markdown_refdocs.main import command_interface, extract_to_markdown
+from markdown_refdocs.types import ParsedModule
+
+
+@pytest.fixture
+def package(make_package):
+    return make_package(
+        {
+            'api.py': "def get_thing() -> Thing:\n    '''get a thing'''\n",
+            'broken.py': "class Thing:\n    '''a thing'''\n    name: str\n\ndef (\n",
+            'other.py': "def other() -> int:\n    '''other'''\n",
+        }
+    )
+
+
+def written_pages(out):
+    return sorted(
+        os.path.basename(line.split()[-1]) for line in out.splitlines() if 'writing:' in line
+    )
+
+
+class TestKeepGoing:
+    def test_stops_on_first_error_by_default(self, package, tmpdir):
+        with pytest.raises(SyntaxError):
+            extract_to_markdown([str(package)], str(tmpdir.join('output')))
+
+    def test_reports_failures(self, package, tmpdir, capsys):
+        report = str(tmpdir.join('failures.json'))
+        failures = extract_to_markdown(
+            [str(package)], str(tmpdir.join('output')), link=True, failure_report=report
+        )
+        assert written_pages(capsys.readouterr().out) == ['__init__.md', 'api.md', 'other.md']
+        assert [f['page'] for f in failures] == ['package/broken.md']
+        assert load_failure_report(report) == failures
+        assert failures[0]['error'] == 'SyntaxError'
+        assert failures[0]['stage'] == 'parse'
+        assert failures[0]['line'] == 5
+
+    def test_isolates_render_errors(self, package, tmpdir, monkeypatch):
+        package.join('broken.py').write("class Thing:\n    '''a thing'''\n    name: str\n")
+        module_to_markdown = main.module_to_markdown
+
+        def render(parsed, *args, **kwargs):
+            if parsed['name'] == 'package/other':
+                raise ValueError('unexpected shape')
+            return module_to_markdown(parsed, *args, **kwargs)
+
+        monkeypatch.setattr(main, 'module_to_markdown', render)
+        failures = extract_to_markdown([str(package)], str(tmpdir.join('output')), keep_going=True)
+        assert [(f['page'], f['stage'], f['message']) for f in failures] == [
+            ('package/other.md', 'render', 'unexpected shape')
+        ]
+        assert failures[0]['filename'] == str(package.join('other.py'))
+        assert os.path.exists(str(tmpdir.join('output', 'package', 'api.md')))
+
+    def test_worker_render_errors_name_the_source(self, tmpdir):
+        index = str(tmpdir.join('empty.links'))
+        write_link_index({}, index)
+        parsed = ParsedModule({'name': 'package/mod', 'functions': [{}]})
+        page = ('package/mod.md', 'src/package/mod.py', parsed, {}, None)
+        [(markdown, failure)] = render_pages([page], index, index, keep_going=True)
+        assert markdown is None
+        assert (failure['page'], failure['filename']) == ('package/mod.md', 'src/package/mod.py')
+
+
+def test_retry_failed(package, tmpdir, capsys):
+    report = str(tmpdir.join('failures.json'))
+    output = str(tmpdir.join('output'))
+    cache_dir = str(tmpdir.join('cache'))
+    options = dict(link=True, failure_report=report, cache_dir=cache_dir)
+    extract_to_markdown([str(package)], output, **options)
+    capsys.readouterr()
+
+    package.join('broken.py').write("class Thing:\n    '''a thing'''\n    name: str\n")
+    failures = extract_to_markdown([str(package)], output, retry_failed=report, **options)
+    assert failures == []
+    # api.md links to the type which was missing when broken.py failed
+    assert written_pages(capsys.readouterr().out) == ['api.md', 'broken.md']
+    with open(os.path.join(output, 'package', 'api.md'), 'r') as fh:
+        assert '[Thing](../broken/#class-thing)' in fh.read()
+    with open(report, 'r') as fh:
+        assert json.load(fh)['failures'] == []
+
+
+def test_command_exit_status(package, tmpdir, monkeypatch):
+    report = str(tmpdir.join('failures.json'))
+    argv = ['markdown_refdocs', str(package), '-o', str(tmpdir.join('output'))]
+    monkeypatch.setattr(sys, 'argv', argv + ['--failure_report', report])
+    with pytest.raises(SystemExit) as exc_info:
+        command_interface()
+    assert exc_info.value.code == '1 module(s) failed'
+    assert len(load_failure_report(report)) == 1
@@ -0,0 +1,98 @@
+import os
+from unittest.mock import patch
+
+import pytest
+from markdown_refdocs.main import extract_to_markdown, find_changed_modules
+
+
+@pytest.fixture
+def repo(tmpdir, make_package, git):
+    make_package(
+        {
+            'models.py': "class Thing:\n    '''a thing'''\n    name: str\n",
+            'api.py': "def get_thing() -> Thing:\n    '''get a thing'''\n",
+            'other.py': "def other() -> int:\n    '''other'''\n",
+            'old.py': "def old():\n    '''old'''\n",
+        }
+    )
+    git(tmpdir, 'init', '-q')
+    git(tmpdir, 'add', '.')
+    git(tmpdir, 'commit', '-q', '-m', 'initial')
+    return tmpdir
+
+
+def output_files(output):
+    return sorted(
+        os.path.relpath(os.path.join(root, f), output)
+        for root, dirs, files in os.walk(output)
+        for f in files
+    )
+
+
+class TestSince:
+    def test_find_changed_modules(self, repo, git):
+        repo.join('package', 'api.py').write("def get_thing():\n    '''changed'''\n")
+        repo.join('package', 'new.py').write("def new():\n    '''new'''\n")
+        git(repo, 'mv', 'package/other.py', 'package/renamed.py')
+        os.remove(str(repo.join('package', 'old.py')))
+
+        changed, deleted = find_changed_modules('HEAD', str(repo.join('package')))
+        assert sorted(changed) == ['package/api.md', 'package/new.md', 'package/renamed.md']
+        assert sorted(deleted) == ['package/old.md', 'package/other.md']
+
+    def test_updates_only_changed_pages(self, repo, tmpdir_factory):
+        output = str(tmpdir_factory.mktemp('output'))
+        path = str(repo.join('package'))
+        extract_to_markdown([path], output, link=True)
+        assert output_files(output) == [
+            'package/__init__.md',
+            'package/api.md',
+            'package/models.md',
+            'package/old.md',
+            'package/other.md',
+        ]
+        for filename in output_files(output):
+            with open(os.path.join(output, filename), 'w') as fh:
+                fh.write('stale')
+
+        repo.join('package', 'models.py').write("class Thing2:\n    '''a thing'''\n    name: str\n")
+        os.remove(str(repo.join('package', 'old.py')))
+        extract_to_markdown([path], output, link=True, since='HEAD')
+
+        assert output_files(output) == [
+            'package/__init__.md',
+            'package/api.md',
+            'package/models.md',
+            'package/other.md',
+        ]
+
+        def read(name):
+            with open(os.path.join(output, 'package', name), 'r') as fh:
+                return fh.read()
+
+        assert 'class Thing2' in read('models.md')
+        # api references the removed class so its link must be updated
+        assert '`Thing`' in read('api.md')
+        assert read('other.md') == 'stale'
+        assert read('__init__.md') == 'stale'
+
+    def test_without_links(self, repo, tmpdir_factory):
+        output = str(tmpdir_factory.mktemp('output'))
+        path = str(repo.join('package'))
+        repo.join('package', 'models.py').write("class Thing2:\n    '''a thing'''\n    name: str\n")
+        extract_to_markdown([path], output, since='HEAD')
+        assert output_files(output) == ['package/models.md']
+
+    def test_finds_changes_once(self, repo, tmpdir_factory):
+        output = str(tmpdir_factory.mktemp('output'))
+        os.remove(str(repo.join('package', 'old.py')))
+        with patch(
+            'markdown_refdocs.main.find_changed_modules', wraps=find_changed_modules
+        ) as find_changes:
+            extract_to_markdown([str(repo.join('package'))], output, link=True, since='HEAD')
+        assert find_changes.call_count == 1
+
+    def test_archive_not_allowed(self, repo, tmpdir_factory):
+        output = str(tmpdir_factory.mktemp('output').join('docs.zip'))
+        with pytest.raises(ValueError):
+            extract_to_markdown([str(repo.join('package'))], output, since='HEAD')
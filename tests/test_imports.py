@@ -0,0 +1,129 @@
+import ast
+
+from markdown_refdocs.imports import (
+    ImportGraph,
+    ModuleLinks,
+    get_dotted_name,
+    get_imports,
+    get_package_name,
+)
+from markdown_refdocs.links import create_types_mapping
+from markdown_refdocs.main import iter_markdown
+from markdown_refdocs.types import ParsedClass, ParsedModule
+
+
+def test_module_names():
+    assert get_dotted_name('package/sub/module') == 'package.sub.module'
+    assert get_dotted_name('package/sub/__init__') == 'package.sub'
+    assert get_package_name('package/sub/module') == 'package.sub'
+    assert get_package_name('package/sub/__init__') == 'package.sub'
+
+
+def test_get_imports():
+    source = '''
+import os
+import os.path
+import xml.etree as etree
+from typing import TYPE_CHECKING
+from . import models
+from .models import Config as ModelConfig
+from ..api import *
+from ...other import Result
+
+if TYPE_CHECKING:
+    from .client import Client
+try:
+    from .fast import Parser
+except ImportError:
+    from .slow import Parser
+
+def load():
+    from .hidden import Hidden
+'''
+    assert get_imports(ast.parse(source), 'package.sub') == {
+        'os': 'os',
+        'etree': 'xml.etree',
+        'TYPE_CHECKING': 'typing.TYPE_CHECKING',
+        'models': 'package.sub.models',
+        'ModelConfig': 'package.sub.models.Config',
+        'Result': 'other.Result',
+        'Client': 'package.sub.client.Client',
+        'Parser': 'package.sub.slow.Parser',
+    }
+
+
+def module(name, classes=(), imports=None):
+    parsed = ParsedModule({'name': name, 'classes': [ParsedClass({'name': c}) for c in classes]})
+    if imports:
+        parsed['imports'] = imports
+    return parsed
+
+
+MODULES = {
+    'package/__init__.md': module('package/__init__', imports={'Config': 'package.models.Config'}),
+    'package/models.md': module('package/models', ['Config', 'Result']),
+    'package/server.md': module('package/server', ['Config', 'Result']),
+    'package/api.md': module(
+        'package/api',
+        imports={
+            'Config': 'package.Config',
+            'models': 'package.models',
+            'Result': 'package.server.Result',
+            'Path': 'pathlib.Path',
+        },
+    ),
+    'package/cycle.md': module('package/cycle', imports={'Loop': 'package.cycle.Loop'}),
+}
+
+
+def test_resolves_through_imports():
+    graph = ImportGraph(MODULES)
+    # re-exported by the package __init__
+    assert graph.resolve('package.api', 'Config') == './package/models.md/#class-config'
+    assert graph.resolve('package.api', 'models.Result') == './package/models.md/#class-result'
+    assert graph.resolve('package.api', 'Result') == './package/server.md/#class-result'
+    assert graph.resolve('package.server', 'Config') == './package/server.md/#class-config'
+    assert graph.resolve('package.api', 'Path') is None
+    assert graph.resolve('package.cycle', 'Loop') is None
+    assert graph.resolve('package.api', 'Missing') is None
+
+
+def test_overrides():
+    types_mapping = dict(create_types_mapping(MODULES), Path='./package/models.md/#path')
+    assert 'Config' not in types_mapping  # a clash
+    graph = ImportGraph(MODULES)
+    parsed = module('package/api')
+    parsed['imports'] = MODULES['package/api.md']['imports']
+    parsed['variables'] = [
+        {'name': 'DEFAULT', 'attributes': [{'name': t, 'type': t} for t in ['Config', 'Path']]}
+    ]
+    overrides = graph.get_overrides(parsed, types_mapping)
+    assert overrides == {'Config': './package/models.md/#class-config', 'Path': None}
+
+    links = ModuleLinks(types_mapping, overrides)
+    assert links['Config'] == './package/models.md/#class-config'
+    assert 'Path' not in links
+    assert set(links) == (set(types_mapping) - {'Path'}) | {'Config'}
+
+
+def test_links_clashing_names(tmpdir):
+    pkg = tmpdir.mkdir('package')
+    pkg.join('__init__.py').write('"""the package"""\n')
+    for name in ['models', 'server']:
+        pkg.join(f'{name}.py').write(f'class Config:\n    """the {name} config"""\n')
+    pkg.join('api.py').write('''
+from .models import Config
+
+
+def connect(config: Config) -> None:
+    """connect
+
+    Args:
+        config: the config
+    """
+''')
+    for workers in [1, 2]:
+        pages = {
+            page: md for page, _, md in iter_markdown([str(pkg)], link=True, render_workers=workers)
+        }
+        assert '- config ([Config](../models/#class-config))' in pages['package/api.md']
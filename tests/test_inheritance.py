@@ -0,0 +1,148 @@
+import sys
+
+from markdown_refdocs.inheritance import ClassIndex, add_inherited_members, c3_merge
+from markdown_refdocs.main import iter_markdown_from_sources, parse_module_file
+
+MODELS = '''
+class Base:
+    """the base
+
+    Attributes:
+        id (int): the record id
+    """
+
+    def save(self) -> None:
+        """save the record"""
+
+    def delete(self) -> None:
+        """delete the record"""
+
+    def __init__(self):
+        """create the record"""
+
+    def _private(self):
+        """hidden"""
+
+
+class Named(Base):
+    """has a name"""
+
+    name: str
+
+    def delete(self) -> None:
+        """soft delete"""
+'''
+
+API = '''
+from .models import Named
+
+class User(models.Named):
+    """a user"""
+
+    email: str
+'''
+
+
+def parse_sources(sources):
+    modules = {}
+    for name, source in sources.items():
+        path = name.replace('.', '/')
+        modules[f'{path}.md'] = parse_module_file(f'{path}.py', content=source)
+    return modules
+
+
+class TestClassIndex:
+    def test_resolves_bases(self):
+        modules = parse_sources({'package.models': MODELS, 'package.api': API})
+        index = ClassIndex(modules)
+        assert index.resolve('Named', 'package/api.md') == ('package/models.md', 'Named')
+        assert index.resolve('models.Named', 'package/api.md') == ('package/models.md', 'Named')
+        assert index.resolve('package.models.Base[T]', 'x.md') == ('package/models.md', 'Base')
+        assert index.resolve('Exception', 'package/api.md') is None
+
+    def test_members_and_owners(self):
+        modules = parse_sources({'package.models': MODELS, 'package.api': API})
+        index = ClassIndex(modules)
+        members = index.members(('package/api.md', 'User'))
+        owners = {name: owner[1] for name, (owner, _) in members.items()}
+        assert owners == {
+            'id': 'Base',
+            'save': 'Base',
+            'delete': 'Named',
+            'name': 'Named',
+            'email': 'User',
+        }
+        assert index.dependencies('package/api.md') == {'package/models.md'}
+
+    def test_diamond_mro(self):
+        source = '''
+class A:
+    """a"""
+    def run(self):
+        """a.run"""
+
+class B(A):
+    """b"""
+
+class C(A):
+    """c"""
+    def run(self):
+        """c.run"""
+
+class D(B, C):
+    """d"""
+'''
+        index = ClassIndex(parse_sources({'package.mod': source}))
+        key = ('package/mod.md', 'D')
+        assert [k[1] for k in index.mro(key)] == ['D', 'B', 'C', 'A']
+        assert index.members(key)['run'][0] == ('package/mod.md', 'C')
+
+    def test_cycle(self):
+        source = 'class A(B):\n    """a"""\n\nclass B(A):\n    """b"""\n'
+        index = ClassIndex(parse_sources({'package.mod': source}))
+        assert [k[1] for k in index.mro(('package/mod.md', 'A'))] == ['A', 'B']
+
+    def test_deep_hierarchy_is_iterative(self):
+        depth = sys.getrecursionlimit() + 100
+        source = 'class C0:\n    """c"""\n    def run(self):\n        """run"""\n' + ''.join(
+            f'\nclass C{i}(C{i - 1}):\n    """c"""\n' for i in range(1, depth)
+        )
+        index = ClassIndex(parse_sources({'package.mod': source}))
+        key = ('package/mod.md', f'C{depth - 1}')
+        assert len(index.mro(key)) == depth
+        assert index.members(key)['run'][0] == ('package/mod.md', 'C0')
+        # the copies of inherited methods are named after the subclass and share the original's parts
+        first = index.inherited_members(key)[0]
+        other = index.inherited_members(('package/mod.md', 'C1'))[0]
+        assert (first['name'], other['name']) == (f'C{depth - 1}.run', 'C1.run')
+        assert first['description'] is other['description']
+
+
+def test_c3_merge_inconsistent():
+    assert c3_merge([[('m', 'A'), ('m', 'B')], [('m', 'B'), ('m', 'A')]]) is None
+
+
+def test_add_inherited_members_does_not_modify():
+    modules = parse_sources({'package.models': MODELS, 'package.api': API})
+    user = modules['package/api.md']['classes'][0]
+    result = add_inherited_members(modules)
+    assert len(user['functions']) == 0
+    inherited = result['package/api.md']['classes'][0]
+    assert [f['name'] for f in inherited['functions']] == ['User.save', 'User.delete']
+    assert [a['name'] for a in inherited['attributes']] == ['email', 'id', 'name']
+    assert result['package/models.md']['classes'][0] is modules['package/models.md']['classes'][0]
+
+
+def test_renders_inherited_members():
+    pages = {
+        page: md
+        for page, _, md in iter_markdown_from_sources(
+            {'package.models': MODELS, 'package.api': API}, link=True, inherited_members=True
+        )
+    }
+    md = pages['package/api.md']
+    assert '### User.delete()\n\n*inherited from* [Named](../models/#class-named)' in md
+    assert 'Base.save' not in md
+    assert '- id (`int`): the record id (inherited from [Base](../models/#class-base))' in md
+    assert 'create the record' not in md
+    assert '_private' not in md
@@ -0,0 +1,83 @@
+import json
+import os
+
+from markdown_refdocs.inventory import load_inventories, load_inventory, write_inventory
+from markdown_refdocs.main import extract_to_markdown, iter_markdown_from_sources
+
+
+class TestInventory:
+    def test_round_trip(self, tmpdir):
+        filename = str(tmpdir.join('inventory.json'))
+        write_inventory(
+            filename,
+            {
+                'Thing': './package/models.md/#class-thing',
+                'models.Thing': './package/models.md/#class-thing',
+                'Alias': './package/types.md/#alias',
+            },
+        )
+        with open(filename, 'r') as fh:
+            assert json.load(fh)['pages'] == ['package/types/', 'package/models/']
+
+        assert load_inventory(filename, 'https://example.org/docs/') == {
+            'Thing': 'https://example.org/docs/package/models/#class-thing',
+            'models.Thing': 'https://example.org/docs/package/models/#class-thing',
+            'Alias': 'https://example.org/docs/package/types/#alias',
+        }
+        assert load_inventory(filename)['Alias'] == 'package/types/#alias'
+
+    def test_earlier_inventories_take_precedence(self, tmpdir):
+        first = str(tmpdir.join('first.json'))
+        second = str(tmpdir.join('second.json'))
+        write_inventory(first, {'Thing': './a/mod.md/#class-thing'})
+        write_inventory(second, {'Thing': './b/mod.md/#class-thing'})
+        links = load_inventories([f'{first}=https://a', f'{second}=https://b'])
+        assert links == {'Thing': 'https://a/a/mod/#class-thing'}
+
+
+def test_link_to_other_project(tmpdir, make_package):
+    library = make_package(
+        {'models.py': "class Thing:\n    '''a thing'''\n    name: str\n"}, name='library'
+    )
+    inventory = str(tmpdir.join('library.json'))
+    extract_to_markdown([str(library)], str(tmpdir.join('output')), inventory=inventory)
+
+    links = load_inventories([f'{inventory}=https://example.org/library'])
+    assert list(links) == ['library.models.Thing']
+    url = 'https://example.org/library/library/models/#class-thing'
+    sources = {
+        'app.api': "from library.models import Thing\n\n\n"
+        "def get_thing() -> Thing:\n    '''get a thing'''\n",
+        'app.dotted': "from library import models\n\n\n"
+        "def get_thing() -> models.Thing:\n    '''get a thing'''\n",
+        'app.local': "def get_thing() -> Thing:\n    '''get a thing'''\n",
+        'app.other': "class Thing:\n    '''local thing'''\n    name: str\n",
+    }
+    pages = dict((p[0], p[2]) for p in iter_markdown_from_sources(sources, external_links=links))
+    assert f'- [Thing]({url})' in pages['app/api.md']
+    assert f'- [models.Thing]({url})' in pages['app/dotted.md']
+    # short names are only linked where they are imported from the other project
+    assert url not in pages['app/local.md']
+
+    pages = dict(
+        (p[0], p[2]) for p in iter_markdown_from_sources(sources, link=True, external_links=links)
+    )
+    assert f'- [Thing]({url})' in pages['app/api.md']
+    assert '- [Thing](../other/#class-thing)' in pages['app/local.md']
+    assert os.path.exists(str(tmpdir.join('output', 'library', 'models.md')))
+
+
+def test_inventory_includes_reexports(tmpdir, make_package):
+    library = make_package(
+        {
+            '__init__.py': '"""the library"""\nfrom .models import Thing\n',
+            'models.py': "class Thing:\n    '''a thing'''\n",
+        },
+        name='library',
+    )
+    inventory = str(tmpdir.join('library.json'))
+    extract_to_markdown([str(library)], str(tmpdir.join('output')), inventory=inventory)
+    assert load_inventory(inventory) == {
+        'library.Thing': 'library/models/#class-thing',
+        'library.models.Thing': 'library/models/#class-thing',
+    }
@@ -0,0 +1,136 @@
+import pickle
+
+import pytest
+from markdown_refdocs.cache import ModuleCache
+from markdown_refdocs.linkindex import LinkIndex, RelativeLinks, write_link_index
+from markdown_refdocs.links import create_relative_types_mapping
+from markdown_refdocs.main import iter_markdown, render_modules
+from markdown_refdocs.types import ParsedModule
+
+MAPPING = {
+    'Thing': './package/models.md/#class-thing',
+    'models.Thing': './package/models.md/#class-thing',
+    'Größe': './package/units.md/#class-größe',
+    'Api': './package/api.md/#class-api',
+}
+
+
+@pytest.fixture
+def index(tmpdir):
+    filename = str(tmpdir.join('types.links'))
+    write_link_index(MAPPING, filename)
+    index = LinkIndex(filename)
+    yield index
+    index.close()
+
+
+def test_index_lookup(index):
+    assert dict(index) == MAPPING
+    assert len(index) == len(MAPPING)
+    assert index['Größe'] == './package/units.md/#class-größe'
+    assert 'Missing' not in index
+    assert index.get('Missing') is None
+    with pytest.raises(KeyError):
+        index['thing']
+
+
+def test_index_collisions(tmpdir):
+    # more names than slots in the smallest table, so probing wraps around
+    mapping = {f'Type{i}': f'./package/mod{i}.md/#class-type{i}' for i in range(1000)}
+    filename = str(tmpdir.join('types.links'))
+    write_link_index(mapping, filename)
+    index = LinkIndex(filename)
+    assert all(index[name] == link for name, link in mapping.items())
+    assert 'Type1000' not in index
+    index.close()
+
+
+def test_empty_index(tmpdir):
+    filename = str(tmpdir.join('empty.links'))
+    write_link_index({}, filename)
+    assert dict(LinkIndex(filename)) == {}
+
+
+def test_pickles_filename(index):
+    data = pickle.dumps(index)
+    assert len(data) < 200
+    assert dict(pickle.loads(data)) == MAPPING
+
+
+def test_not_an_index(tmpdir):
+    filename = tmpdir.join('other.links')
+    filename.write('not a link index at all')
+    with pytest.raises(ValueError):
+        LinkIndex(str(filename))
+
+
+def test_relative_links(index):
+    for page in ['package/models.md', 'package/sub/api.md', 'other.md']:
+        links = RelativeLinks(page, index, {'Path': 'https://docs.python.org/#pathlib.Path'})
+        expected = create_relative_types_mapping(page, MAPPING)
+        assert {name: links[name] for name in MAPPING} == expected
+        assert links['Path'] == 'https://docs.python.org/#pathlib.Path'
+        assert len(links) == len(MAPPING) + 1
+
+
+@pytest.fixture
+def package(make_package):
+    return make_package({f'mod{i}.py': f'''
+from pathlib import Path
+
+
+class Thing{i}:
+    """thing {i}
+
+    Attributes:
+        previous (Thing{i - 1}): the previous thing
+        path (Path): where it is
+    """
+''' for i in range(6)})
+
+
+def test_render_workers(package):
+    url = 'https://docs.python.org/3/library/pathlib.html#pathlib.Path'
+    external_links = {'pathlib.Path': url}
+    serial = list(iter_markdown([str(package)], link=True, external_links=external_links))
+    parallel = list(
+        iter_markdown([str(package)], link=True, external_links=external_links, render_workers=2)
+    )
+    assert [(page, md) for page, _, md in parallel] == [(page, md) for page, _, md in serial]
+    page = dict((p, md) for p, _, md in parallel)['package/mod1.md']
+    assert '[Thing0](../mod0/#class-thing0)' in page
+    assert f'[Path]({url})' in page
+
+
+def test_render_workers_reuse_cache(package):
+    cache = ModuleCache()
+    first = list(iter_markdown([str(package)], link=True, cache=cache, render_workers=2))
+    cache.reset()
+    second = list(iter_markdown([str(package)], link=True, cache=cache, render_workers=2))
+    assert [md for _, _, md in second] == [md for _, _, md in first]
+    assert cache.unchanged == {page for page, _, _ in first}
+
+
+def test_render_workers_failures():
+    modules = [
+        (
+            'package/good.md',
+            ParsedModule(
+                {
+                    'name': 'package/good',
+                    'description': 'good',
+                    'variables': [],
+                    'classes': [],
+                    'functions': [],
+                }
+            ),
+        ),
+        ('package/bad.md', ParsedModule({'name': 'package/bad', 'classes': [{}]})),
+    ]
+    failures = []
+    pages = list(render_modules(modules, failures=failures, render_workers=2))
+    assert [page for page, _, _ in pages] == ['package/good.md']
+    assert [(f['page'], f['stage']) for f in failures] == [('package/bad.md', 'render')]
+
+    with pytest.raises(KeyError):
+        list(render_modules(modules, render_workers=2))
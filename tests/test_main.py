@@ -1,9 +1,17 @@
 import os
 import sys
+import zipfile
 from unittest.mock import mock_open, patch
 
 import pytest
-from markdown_refdocs.main import command_interface, parse_module_file
+from markdown_refdocs.main import (
+    command_interface,
+    extract_to_markdown,
+    find_module_files,
+    iter_markdown,
+    iter_markdown_from_sources,
+    parse_module_file,
+)
 from markdown_refdocs.markdown import module_to_markdown
 from markdown_refdocs.types import ParsedVariable
 
@@ -543,6 +551,7 @@ class SomeType(TypedDict):
             'variables': [],
             'functions': [],
             'description': '',
+            'imports': {'TypedDict': 'typings.TypedDict'},
             'classes': [
                 {
                     'name': 'SomeType',
@@ -601,6 +610,7 @@ class SomeType(TypedDict):
             'variables': [],
             'functions': [],
             'description': '',
+            'imports': {'TypedDict': 'typings.TypedDict'},
             'classes': [
                 {
                     'name': 'SomeType',
@@ -698,6 +708,107 @@ def prefix_split(text):
             md = module_to_markdown(parsed)
             assert md.strip() == expected.strip()
 
+    def test_interns_annotations(self):
+        data = """
+def first(arg1: Optional[Dict[str, Any]], arg2: typing.Any) -> Optional[Dict[str, Any]]:
+    pass
+
+def second(arg1: Optional[Dict[str, Any]], arg2: typing.Any):
+    pass
+"""
+        with patch('builtins.open', mock_open(read_data=data)):
+            parsed = parse_module_file('simple_module.py', '', hide_undoc=False)
+        first, second = parsed['functions']
+        assert first['parameters'][0]['type'] is second['parameters'][0]['type']
+        assert first['parameters'][0]['type'] is first['returns']['type']
+        assert first['parameters'][1]['type'] is second['parameters'][1]['type']
+
+    def test_truncates_long_constant(self):
+        data = """
+CONSTANT_THING = [
+    'a',
+    'b',
+    'c',
+    'd',
+]
+"""
+        expected = """## CONSTANT_THING
+
+```python
+CONSTANT_THING = [
+    'a',
+# ... truncated (4 more lines)
+```
+"""
+        parsed = parse_module_file(
+            'simple_module.py', '', hide_undoc=False, content=data, max_constant_lines=2
+        )
+        assert expected.strip() in module_to_markdown(parsed)
+
+    def test_truncates_constant_by_size(self):
+        data = "LOOKUP = {\n" + ''.join(f"    {i}: 'value {i}',\n" for i in range(1000)) + "}\n"
+        parsed = parse_module_file(
+            'simple_module.py', '', hide_undoc=False, content=data, max_constant_bytes=100
+        )
+        source_code = parsed['variables'][0]['source_code']
+        assert source_code.splitlines()[0] == 'LOOKUP = {'
+        assert source_code.endswith('# ... truncated (997 more lines)')
+        assert len(source_code) < 200
+
+    def test_constant_source_ends_at_closing_bracket(self):
+        data = (
+            "NAMES = [\n    'a',\n    # 'b',\n]\nPAIR = (\n    1,\n    2,\n\n)\n"
+            "FLAT = 1, 2\n\n\n@decorator\ndef func():\n    pass\n"
+        )
+        parsed = parse_module_file('simple_module.py', '', hide_undoc=False, content=data)
+        assert [var['source_code'] for var in parsed['variables']] == [
+            "NAMES = [\n    'a',\n    # 'b',\n]",
+            'PAIR = (\n    1,\n    2,\n\n)',
+            'FLAT = 1, 2',
+        ]
+
+    def test_truncates_long_first_line(self):
+        data = 'BLOB = "' + 'x' * 500 + '"\n'
+        parsed = parse_module_file(
+            'simple_module.py', '', hide_undoc=False, content=data, max_constant_bytes=20
+        )
+        assert parsed['variables'][0]['source_code'] == (
+            'BLOB = "xxxxxxxxxxxx\n# ... truncated (1 more lines)'
+        )
+
+    def test_chained_assignment_shares_source(self):
+        data = "FIRST = SECOND = 'some constant thing'\n"
+        parsed = parse_module_file('simple_module.py', '', hide_undoc=False, content=data)
+        first, second = parsed['variables']
+        assert (first['name'], second['name']) == ('FIRST', 'SECOND')
+        assert first['source_code'] is second['source_code']
+
+    @pytest.mark.skipif(
+        sys.version_info < (3, 8), reason='the last line is found from the end positions'
+    )
+    def test_function_source_covers_decorators_and_last_line(self):
+        data = '''
+@decorator(
+    option=1,
+)
+def create(
+    kind: Dict[
+        str,
+        int,
+    ],
+):
+    """create a thing"""
+    return build(
+        kind,
+    )
+'''
+        parsed = parse_module_file('simple_module.py', '', content=data)
+        func = parsed['functions'][0]
+        assert func['source_code'] == data.strip()
+        assert func['source_definition'] == (
+            'def create(\n    kind: Dict[\n        str,\n        int,\n    ],\n):'
+        )
+
 
 class TestCommandInterface:
     def test_package_path(self, tmpdir):
@@ -717,6 +828,49 @@ class TestCommandInterface:
         for module in modules:
             assert os.path.exists(module)
 
+    def test_archive_output(self, tmpdir):
+        path = os.path.join(os.path.dirname(__file__), '../markdown_refdocs')
+        archive = os.path.join(str(tmpdir), 'docs.zip')
+        with patch.object(sys, 'argv', ['', path, '-o', archive, '--show_undoc']):
+            command_interface()
+
+        assert os.listdir(str(tmpdir)) == ['docs.zip']
+        with zipfile.ZipFile(archive) as zf:
+            names = zf.namelist()
+        assert names == sorted(names)
+        assert 'markdown_refdocs/main.md' in names
+
+
+class TestIterMarkdown:
+    def test_from_sources_with_links(self):
+        sources = {
+            'package.models': "class Thing:\n    '''a thing'''\n    name: str\n",
+            'package.api': "def get_thing() -> Thing:\n    '''get a thing'''\n",
+        }
+        pages = list(iter_markdown_from_sources(sources, link=True))
+        assert [p[0] for p in pages] == ['package/models.md', 'package/api.md']
+        filename, parsed, md = pages[1]
+        assert parsed['functions'][0]['returns']['type'] == 'Thing'
+        assert '- [Thing](../models/#class-thing)' in md
+
+    def test_skips_hidden_modules(self):
+        pages = list(iter_markdown_from_sources({'package.empty': 'x = 1\n'}))
+        assert pages == []
+
+    def test_lazy_without_links(self):
+        path = os.path.join(os.path.dirname(__file__), '../markdown_refdocs')
+        with patch('markdown_refdocs.main.parse_module_file', wraps=parse_module_file) as parse:
+            pages = iter_markdown([path])
+            assert parse.call_count == 0
+            next(pages)
+            assert 0 < parse.call_count < len(find_module_files(path)[1])
+
+    def test_matches_written_output(self, tmpdir):
+        path = os.path.join(os.path.dirname(__file__), '../markdown_refdocs')
+        extract_to_markdown([path], str(tmpdir), link=True)
+        for filename, _, md in iter_markdown([path], link=True):
+            assert tmpdir.join(filename).read() == md
+
 
 @pytest.mark.parametrize('name', ['multiple_decorators', 'type_alias'])
 def test_snippets(name):
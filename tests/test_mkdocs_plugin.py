@@ -0,0 +1,33 @@
+import pytest
+
+pytest.importorskip('mkdocs')
+
+from mkdocs.structure.files import Files  # noqa: E402
+
+from markdown_refdocs.mkdocs_plugin import RefdocsPlugin  # noqa: E402
+
+
+@pytest.fixture
+def plugin(make_package):
+    pkg = make_package({'models.py': "class Thing:\n    '''a thing'''\n    name: str\n"})
+    plugin = RefdocsPlugin()
+    errors, warnings = plugin.load_config({'inputs': [str(pkg)], 'link': True})
+    assert not errors
+    return plugin
+
+
+def test_adds_virtual_files(plugin, tmpdir):
+    config = {
+        'docs_dir': str(tmpdir.mkdir('docs')),
+        'site_dir': str(tmpdir.join('site')),
+        'use_directory_urls': True,
+    }
+    files = plugin.on_files(Files([]), config)
+    assert sorted(f.src_path.replace('\\', '/') for f in files) == [
+        'reference/package/__init__.md',
+        'reference/package/models.md',
+    ]
+    assert not tmpdir.join('docs').listdir()
+
+    page = type('Page', (), {'file': files.get_file_from_path('reference/package/models.md')})
+    assert '## class Thing' in plugin.on_page_read_source(page, config)
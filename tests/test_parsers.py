@@ -31,6 +31,14 @@ Returns:
             == 'the response data (list, dict or None): The ids and type of resource object(s) in this relationship. meta (dict): meta information about the response total (int): total records available in the relationship count (int): total records returned in the response limit (int): the page size offset (int): starting point of the page links (dict): paging links to prev and next page, plus link to current request'
         )
 
+    def test_warns_only_for_extra_returns(self, capsys):
+        result = parse_google_docstring('Returns:\n    the response\n', function_name='fetch')
+        assert result['returns']['description'] == 'the response'
+        assert 'multiple return lines' not in capsys.readouterr().out
+
+        parse_google_docstring('Returns:\n    the response\n    and more\n', function_name='fetch')
+        assert 'warning: fetch multiple return lines' in capsys.readouterr().out
+
     def test_long_docstring_with_newlines(self):
         result = parse_google_docstring(
             """
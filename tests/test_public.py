@@ -0,0 +1,126 @@
+import ast
+import os
+
+import pytest
+from markdown_refdocs.main import iter_markdown, parse_module_file
+from markdown_refdocs.public import find_public_modules, get_all_names, get_reexports
+
+
+@pytest.fixture
+def package(make_package):
+    return make_package(
+        {
+            '__init__.py': '"""the package"""\n'
+            'from ._impl import Thing, _helper\n'
+            'from .models import Model\n'
+            'from .sub.deep import Deep\n'
+            "__all__ = ['Thing', 'Model', 'Deep', 'api']\n",
+            '_impl.py': "class Thing:\n    '''a thing'''\n\nclass Other:\n    '''not exported'''\n",
+            'models.py': "class Model:\n    '''a model'''\n\n"
+            "class Internal:\n    '''not exported'''\n",
+            'api.py': "__all__ = ['get_thing']\n\n"
+            "def get_thing():\n    '''get a thing'''\n\n"
+            "def helper():\n    '''not in __all__'''\n",
+            'unlisted.py': "def unlisted():\n    '''never parsed'''\n",
+            'sub/__init__.py': '',
+            'sub/deep.py': "class Deep:\n    '''deep'''\n\nclass Hidden:\n    '''hidden'''\n",
+            'sub/other.py': "def other():\n    '''never parsed'''\n",
+            '_private/__init__.py': 'raise SyntaxError(',
+        }
+    )
+
+
+def relative(prefix, public):
+    return {filename[len(prefix) :]: names for filename, names in public.items()}
+
+
+class TestGetAllNames:
+    def test_list(self):
+        assert get_all_names(ast.parse("__all__ = ['a', 'b']")) == ['a', 'b']
+
+    def test_extended(self):
+        assert get_all_names(ast.parse("__all__ = ('a',)\n__all__ += ['b']")) == ['a', 'b']
+
+    def test_missing(self):
+        assert get_all_names(ast.parse('a = 1')) is None
+
+    def test_dynamic(self):
+        assert get_all_names(ast.parse('__all__ = [name for name in dir()]')) is None
+
+
+def test_reexports():
+    tree = ast.parse(
+        'from .a import x\nfrom ..b.c import y as z\nfrom package import w\nfrom os import path\n'
+    )
+    assert get_reexports(tree, 'package.sub') == [
+        ('package.sub.a', 'x'),
+        ('package.b.c', 'z'),
+        ('package', 'w'),
+    ]
+
+
+class TestFindPublicModules:
+    def test_prunes_by_all(self, package):
+        prefix = str(package.dirpath()) + os.sep
+        files = sorted(os.path.join(root, f) for root, _, fs in os.walk(str(package)) for f in fs)
+        public = relative(prefix, find_public_modules(prefix, files))
+        assert public == {
+            'package/__init__.py': None,
+            'package/_impl.py': frozenset({'Thing'}),
+            'package/api.py': None,
+            'package/models.py': frozenset({'Model'}),
+            'package/sub/__init__.py': frozenset(),
+            'package/sub/deep.py': frozenset({'Deep'}),
+        }
+
+    def test_naming_convention_without_all(self, tmpdir, make_package):
+        pkg = make_package(
+            {
+                '__init__.py': 'from ._impl import Thing, _Hidden\n',
+                '_impl.py': '',
+                '_other.py': '',
+                'public.py': '',
+                'scripts/run.py': '',
+            }
+        )
+        prefix = str(tmpdir) + os.sep
+        files = [
+            str(pkg.join(name))
+            for name in ['__init__.py', '_impl.py', '_other.py', 'public.py', 'scripts/run.py']
+        ]
+        assert relative(prefix, find_public_modules(prefix, files)) == {
+            'package/__init__.py': None,
+            'package/_impl.py': frozenset({'Thing'}),
+            'package/public.py': None,
+            'package/scripts/run.py': None,
+        }
+
+
+class TestParsePublicNames:
+    def test_own_all(self):
+        content = "__all__ = ['shown']\n\ndef shown():\n    '''a'''\n\ndef hidden():\n    '''b'''\n"
+        parsed = parse_module_file('module.py', content=content, public_api=True)
+        assert [f['name'] for f in parsed['functions']] == ['shown']
+
+    def test_public_names_take_precedence(self):
+        content = "__all__ = ['a']\nA = B = 1\n\ndef a():\n    '''a'''\n"
+        parsed = parse_module_file(
+            'module.py', content=content, public_api=True, public_names=['B']
+        )
+        assert parsed['functions'] == []
+        assert [v['name'] for v in parsed['variables']] == ['B']
+
+
+def test_iter_markdown_public_api(package):
+    pages = {filename: md for filename, _, md in iter_markdown([str(package)], public_api=True)}
+    assert sorted(pages) == [
+        'package/__init__.md',
+        'package/_impl.md',
+        'package/api.md',
+        'package/models.md',
+        'package/sub/deep.md',
+    ]
+    assert 'Other' not in pages['package/_impl.md']
+    assert 'helper' not in pages['package/api.md']
+    assert 'Internal' not in pages['package/models.md']
+    assert 'Hidden' not in pages['package/sub/deep.md']
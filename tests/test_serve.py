@@ -0,0 +1,145 @@
+import os
+import threading
+import urllib.request
+from unittest.mock import patch
+
+import pytest
+from markdown_refdocs.main import find_module_files, parse_module_file
+from markdown_refdocs.serve import PageCache, PreviewSite, create_server, scan_symbols
+
+
+@pytest.fixture
+def package(make_package):
+    pkg = make_package(
+        {
+            'models.py': "class Thing:\n    '''a thing'''\n    name: str\n",
+            'api.py': "def get_thing() -> Thing:\n    '''get a thing'''\n",
+        }
+    )
+    return str(pkg)
+
+
+class TestPageCache:
+    def test_evicts_least_recently_used(self):
+        cache = PageCache(2)
+        cache.put('a', 1, 'a')
+        cache.put('b', 1, 'b')
+        assert cache.get('a', 1) == 'a'
+        cache.put('c', 1, 'c')
+        assert cache.get('b', 1) is None
+        assert cache.get('a', 1) == 'a'
+        assert len(cache) == 2
+
+    def test_invalidated_by_mtime(self):
+        cache = PageCache()
+        cache.put('a', 1, 'a')
+        assert cache.get('a', 2) is None
+
+
+class TestPreviewSite:
+    def test_does_not_parse_up_front(self, package):
+        with patch('markdown_refdocs.serve.parse_module_file', wraps=parse_module_file) as parse:
+            site = PreviewSite([package], link=True)
+            assert parse.call_count == 0
+            assert sorted(site.pages) == [
+                'package/__init__.md',
+                'package/api.md',
+                'package/models.md',
+            ]
+
+            md = site.render('package/api.md')
+            assert '- [Thing](../models/#class-thing)' in md
+            assert parse.call_count == 1
+
+            site.render('package/api.md')
+            assert parse.call_count == 1
+
+    def test_rerenders_changed_source(self, package):
+        site = PreviewSite([package])
+        assert 'get a thing' in site.render('package/api.md')
+
+        filename = os.path.join(package, 'api.py')
+        with open(filename, 'w') as fh:
+            fh.write("def get_thing() -> Thing:\n    '''get something else'''\n")
+        stat = os.stat(filename)
+        os.utime(filename, (stat.st_atime, stat.st_mtime + 10))
+        assert 'get something else' in site.render('package/api.md')
+
+    def test_rerenders_changed_links(self, package):
+        site = PreviewSite([package], link=True, rescan_interval=0)
+        assert '- [Thing](../models/#class-thing)' in site.render('package/api.md')
+
+        filename = os.path.join(package, 'models.py')
+        with open(filename, 'w') as fh:
+            fh.write("class Other:\n    '''another thing'''\n    name: str\n")
+        stat = os.stat(filename)
+        os.utime(filename, (stat.st_atime, stat.st_mtime + 10))
+        assert '- [Thing](../models/#class-thing)' not in site.render('package/api.md')
+
+        # a module created while serving
+        with open(os.path.join(package, 'things.py'), 'w') as fh:
+            fh.write("class Thing:\n    '''a thing'''\n    name: str\n")
+        assert site.resolve('/package/things/') == 'package/things.md'
+        assert '- [Thing](../things/#class-thing)' in site.render('package/api.md')
+
+    def test_links_through_imports(self, package):
+        # Thing is defined twice, so it is only linked where it is imported
+        with open(os.path.join(package, 'other.py'), 'w') as fh:
+            fh.write("class Thing:\n    '''another thing'''\n")
+        with open(os.path.join(package, 'api.py'), 'w') as fh:
+            fh.write(
+                "from package import Thing\n\n\n"
+                "def get_thing() -> Thing:\n    '''get a thing'''\n"
+            )
+        with open(os.path.join(package, '__init__.py'), 'w') as fh:
+            fh.write('"""the package"""\nfrom .models import Thing\n')
+        site = PreviewSite([package], link=True, rescan_interval=0)
+        assert '- [Thing](../models/#class-thing)' in site.render('package/api.md')
+
+        # re-exporting another class changes the links of the pages which import it
+        with open(os.path.join(package, '__init__.py'), 'w') as fh:
+            fh.write('"""the package"""\nfrom .other import Thing\n')
+        assert '- [Thing](../other/#class-thing)' in site.render('package/api.md')
+
+    def test_rescan_interval(self, package):
+        with patch(
+            'markdown_refdocs.serve.find_module_files', wraps=find_module_files
+        ) as find, patch('markdown_refdocs.serve.scan_symbols', wraps=scan_symbols) as scan:
+            site = PreviewSite([package], link=True, rescan_interval=60)
+            site.render('package/api.md')
+            assert (find.call_count, scan.call_count) == (1, 3)
+
+            with open(os.path.join(package, 'things.py'), 'w') as fh:
+                fh.write("class Thing:\n    '''a thing'''\n    name: str\n")
+            assert site.resolve('/package/things/') is None
+            site.render('package/models.md')
+            assert (find.call_count, scan.call_count) == (1, 3)
+
+            site.rescan_interval = 0
+            assert site.resolve('/package/things/') == 'package/things.md'
+            site.render('package/models.md')
+            assert (find.call_count, scan.call_count) == (2, 4)
+
+    def test_resolve(self, package):
+        site = PreviewSite([package])
+        assert site.resolve('/package/api/') == 'package/api.md'
+        assert site.resolve('/package/api.md') == 'package/api.md'
+        assert site.resolve('/package/models/#class-thing') == 'package/models.md'
+        assert site.resolve('/package/missing/') is None
+
+
+def test_server(package):
+    server = create_server(PreviewSite([package], link=True), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        base = f'http://127.0.0.1:{server.server_port}'
+        with urllib.request.urlopen(f'{base}/package/models/') as response:
+            assert response.status == 200
+            assert response.read().decode('utf8').startswith('# package/models')
+        with pytest.raises(urllib.error.HTTPError) as err:
+            urllib.request.urlopen(f'{base}/package/missing/')
+        assert err.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
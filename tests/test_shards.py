@@ -0,0 +1,118 @@
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+from markdown_refdocs.main import command_interface, extract_to_markdown
+from markdown_refdocs.shards import parse_shard, partition_modules
+
+
+def read_tree(output):
+    result = {}
+    for root, dirs, files in os.walk(output):
+        for filename in files:
+            with open(os.path.join(root, filename), 'r') as fh:
+                result[os.path.relpath(os.path.join(root, filename), output)] = fh.read()
+    return result
+
+
+class TestPartitionModules:
+    def test_deterministic_and_complete(self):
+        pages = {f'package/module{i}.md': (i * 37) % 11 for i in range(30)}
+        shards = partition_modules(pages, 4)
+        assert shards == partition_modules(dict(reversed(list(pages.items()))), 4)
+        assert sorted(p for shard in shards for p in shard) == sorted(pages)
+
+    def test_balanced_by_size(self):
+        pages = {'big.md': 100, 'a.md': 50, 'b.md': 50}
+        assert sorted(map(sorted, partition_modules(pages, 2))) == [['a.md', 'b.md'], ['big.md']]
+
+
+class TestParseShard:
+    def test_valid(self):
+        assert parse_shard('2/3') == (2, 3)
+
+    @pytest.mark.parametrize('value', ['0/3', '4/3', '1', 'a/b'])
+    def test_invalid(self, value):
+        with pytest.raises(ValueError):
+            parse_shard(value)
+
+
+@pytest.mark.parametrize('count', [1, 3])
+def test_merge_matches_single_run(tmpdir, count):
+    path = os.path.join(os.path.dirname(__file__), '../markdown_refdocs')
+    single = str(tmpdir.join('single'))
+    sharded = str(tmpdir.join('sharded'))
+    extract_to_markdown([path], single, link=True)
+
+    manifests = []
+    for index in range(1, count + 1):
+        manifest = str(tmpdir.join(f'manifest{index}.json'))
+        manifests.append(manifest)
+        argv = ['', path, '-o', sharded, '--shard', f'{index}/{count}', '--manifest', manifest]
+        with patch.object(sys, 'argv', argv):
+            command_interface()
+
+    with patch.object(sys, 'argv', ['', 'merge', *manifests, '-o', sharded]):
+        command_interface()
+
+    assert read_tree(sharded) == read_tree(single)
+
+
+def test_merge_requires_all_shards(tmpdir):
+    path = os.path.join(os.path.dirname(__file__), '../markdown_refdocs')
+    manifest = str(tmpdir.join('manifest.json'))
+    with patch.object(
+        sys, 'argv', ['', path, '-o', str(tmpdir), '--shard', '1/2', '--manifest', manifest]
+    ):
+        command_interface()
+    with patch.object(sys, 'argv', ['', 'merge', manifest, '-o', str(tmpdir)]):
+        with pytest.raises(ValueError):
+            command_interface()
+
+
+@pytest.mark.parametrize(
+    'options',
+    [
+        ['--archive'],
+        ['-o', 'docs.zip'],
+        ['--since', 'HEAD'],
+        ['--inventory', 'objects.json'],
+        ['--write_inventory', 'objects.json'],
+        ['--cache_dir', 'cache'],
+        ['--keep_going'],
+        ['--failure_report', 'failures.json'],
+        ['--retry_failed', 'failures.json'],
+        ['--link', '--validate_links'],
+        ['--coverage_report', 'coverage.json'],
+        ['--fail_under', '0'],
+    ],
+)
+def test_shard_rejects_single_run_options(tmpdir, options):
+    argv = ['', str(tmpdir), '-o', str(tmpdir.join('docs')), '--shard', '1/2', *options]
+    with patch.object(sys, 'argv', argv):
+        with pytest.raises(SystemExit):
+            command_interface()
+    assert not tmpdir.join('refdocs-shard-1-of-2.json').exists()
+
+
+def test_manifest_omits_parsed_pages(tmpdir):
+    package = tmpdir.mkdir('package')
+    package.join('__init__.py').write('"""the package"""\n')
+    package.join('module.py').write('class Thing:\n    """a thing"""\n')
+    package.join('other.py').write(
+        'from .module import Thing\n\n\ndef make() -> Thing:\n    """the long docstring"""\n'
+    )
+    manifest = tmpdir.join('manifest.json')
+    argv = ['', str(package), '-o', str(tmpdir.join('docs')), '--shard', '1/1']
+    with patch.object(sys, 'argv', [*argv, '--manifest', str(manifest)]):
+        command_interface()
+
+    content = manifest.read()
+    assert 'Thing' in content
+    assert 'the long docstring' not in content
+
+    package.join('other.py').write('def make():\n    pass\n')
+    with patch.object(sys, 'argv', ['', 'merge', str(manifest), '-o', str(tmpdir.join('docs'))]):
+        with pytest.raises(ValueError):
+            command_interface()
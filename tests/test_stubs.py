@@ -0,0 +1,91 @@
+import pytest
+from markdown_refdocs import main
+from markdown_refdocs.cache import ModuleCache
+from markdown_refdocs.main import iter_markdown, parse_module_file
+from markdown_refdocs.stubs import extract_docstrings
+
+IMPLEMENTATION = '''
+"""generated protocol code"""
+
+def encode(message, buffer=None, *, compact=False):
+    """encode a message"""
+    return _encode(message)
+
+def _encode(message):
+    pass
+
+class Message:
+    """a protocol message"""
+
+    def size(self):
+        """the encoded size"""
+        def helper():
+            """not documented"""
+
+    class Field:
+        """a field of the message"""
+'''
+
+STUB = '''
+from typing import Optional
+
+def encode(message: Message, buffer: Optional[bytearray] = ..., *, compact: bool = ...) -> bytes: ...
+
+class Message:
+    def size(self) -> int:
+        """the size of the message once encoded"""
+'''
+
+
+@pytest.fixture
+def package(tmpdir):
+    pkg = tmpdir.mkdir('package')
+    pkg.join('__init__.py').write('"""the package"""\n')
+    pkg.join('protocol.py').write(IMPLEMENTATION)
+    pkg.join('protocol.pyi').write(STUB)
+    return pkg
+
+
+def test_extract_docstrings():
+    assert extract_docstrings(IMPLEMENTATION) == {
+        '': 'generated protocol code',
+        'encode': 'encode a message',
+        'Message': 'a protocol message',
+        'Message.size': 'the encoded size',
+        'Message.Field': 'a field of the message',
+    }
+
+
+def test_prefers_stub(package):
+    pages = {page: md for page, _, md in iter_markdown([str(package)], prefer_stubs=True)}
+    md = pages['package/protocol.md']
+    assert md.startswith('# package/protocol\n\ngenerated protocol code')
+    assert 'encode a message' in md
+    assert '- buffer (`Optional[bytearray]`)' in md
+    assert '- `bytes`' in md
+    # the docstring of the stub takes precedence
+    assert 'the size of the message once encoded' in md
+    assert 'the encoded size' not in md
+
+    pages = {page: md for page, _, md in iter_markdown([str(package)])}
+    assert 'Optional[bytearray]' not in pages['package/protocol.md']
+
+
+def test_implementation_only_read_when_needed(package, monkeypatch):
+    def extract(source):
+        raise AssertionError('should not read the implementation')
+
+    monkeypatch.setattr(main, 'extract_docstrings', extract)
+    stub = '"""the stub"""\n\ndef encode(message: bytes) -> bytes:\n    """encode"""\n'
+    parsed = parse_module_file('package/protocol.py', stub=stub, content='not python (')
+    assert parsed['description'] == 'the stub'
+
+
+def test_cache_notices_stub_changes(package):
+    cache = ModuleCache()
+    list(iter_markdown([str(package)], prefer_stubs=True, cache=cache))
+    package.join('protocol.pyi').write(STUB.replace('-> bytes', '-> memoryview'))
+    pages = {
+        page: md for page, _, md in iter_markdown([str(package)], prefer_stubs=True, cache=cache)
+    }
+    assert '- `memoryview`' in pages['package/protocol.md']
@@ -0,0 +1,90 @@
+import pickle
+import sys
+
+import pytest
+from markdown_refdocs.inheritance import add_inherited_members
+from markdown_refdocs.main import parse_module_file
+from markdown_refdocs.types import (
+    ParsedClass,
+    ParsedFunction,
+    ParsedParameter,
+    ParsedRecord,
+    ParsedReturn,
+)
+
+
+def iter_records(value):
+    if isinstance(value, ParsedRecord):
+        yield value
+        value = list(value.values())
+    if isinstance(value, list):
+        for item in value:
+            yield from iter_records(item)
+
+
+class TestParsedRecord:
+    def test_unset_field_is_missing(self):
+        param = ParsedParameter({'name': 'arg1'})
+        assert 'type' not in param
+        assert param.get('type') is None
+        with pytest.raises(KeyError):
+            param['type']
+        assert dict(param) == {'name': 'arg1'}
+
+    def test_extra_keys(self):
+        func = ParsedFunction({'name': 'func', 'warning': ['careful']})
+        assert func['warning'] == ['careful']
+        assert list(func.keys()) == ['name', 'warning']
+        del func['warning']
+        assert 'warning' not in func
+
+    def test_compares_equal_to_dict(self):
+        cls = ParsedClass({'name': 'SomeClass', 'attributes': [ParsedParameter({'name': 'a'})]})
+        assert cls == {'name': 'SomeClass', 'attributes': [{'name': 'a'}]}
+        assert cls != {'name': 'SomeClass'}
+
+    def test_update_and_unpack(self):
+        returns = ParsedReturn({})
+        returns.update({'type': 'str'}, description='some desc')
+
+        def unpack(type=None, description=None):
+            return type, description
+
+        assert unpack(**returns) == ('str', 'some desc')
+
+    def test_pickle(self):
+        func = ParsedFunction({'name': 'func', 'parameters': [ParsedParameter({'name': 'a'})]})
+        copy = pickle.loads(pickle.dumps(func))
+        assert isinstance(copy['parameters'][0], ParsedParameter)
+        assert copy == func
+
+    def test_smaller_than_dict(self):
+        content = {'name': 'arg1', 'type': 'str', 'description': '', 'hidden': False}
+        assert sys.getsizeof(ParsedParameter(content)) < sys.getsizeof(dict(content))
+
+    def test_parsed_keys_are_fields(self):
+        content = """
+from typing import List
+
+
+class Base:
+    '''
+    Attributes:
+        name: the name
+    '''
+    items: List[str]
+
+    def save(self, force: bool = False) -> None:
+        '''save it'''
+
+
+class Thing(Base):
+    '''a thing'''
+"""
+        parsed = parse_module_file('package/models.py', content=content)
+        assert parsed['imports'] == {'List': 'typing.List'}
+        modules = add_inherited_members({'package/models.md': parsed})
+        records = list(iter_records(modules['package/models.md']))
+        assert any('inherited_from' in record for record in records)
+        # only keys which are not declared fields (ex. admonitions) use the overflow dict
+        assert [record._extra for record in records if record._extra] == []
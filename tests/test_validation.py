@@ -0,0 +1,141 @@
+import os
+import sys
+
+import pytest
+from markdown_refdocs.main import (
+    command_interface,
+    extract_to_markdown,
+    iter_markdown,
+    parse_module_file,
+)
+from markdown_refdocs.markdown import module_to_markdown
+from markdown_refdocs.validation import (
+    BrokenLinksError,
+    LinkValidator,
+    collect_anchors,
+    collect_markdown_anchors,
+    iter_page_links,
+    resolve_link,
+    slugify,
+)
+
+
+@pytest.fixture
+def package(make_package):
+    return make_package(
+        {
+            'models.py': "class Thing:\n    '''a thing'''\n    name: str\n\n"
+            "class Hidden:\n    pass\n\n"
+            "DefaultThing = Thing()\n",
+            'api.py': "def get_thing(default: DefaultThing) -> Thing:\n    '''get a thing'''\n\n"
+            "def get_hidden() -> Hidden:\n    '''get a hidden thing'''\n",
+        }
+    )
+
+
+def test_slugify():
+    assert slugify('class Thing') == 'class-thing'
+    assert slugify('Base.__init__()') == 'base__init__'
+    assert slugify('package/module') == 'packagemodule'
+
+
+def test_collect_anchors_repeated_headings():
+    source = '''
+class A:
+    """a"""
+    def run(self):
+        """run"""
+
+def run():
+    """run"""
+'''
+    parsed = parse_module_file('package/mod.py', content=source)
+    parsed['classes'][0]['functions'][0]['name'] = 'run'
+    assert collect_anchors(parsed) == {'packagemod', 'class-a', 'run', 'run_1'}
+
+
+def test_markdown_anchors_and_links():
+    markdown = (
+        '# package/api\n\n## get\\_thing()\n\n```python\n# not a heading\n```\n\n'
+        '### [Thing](../models/#class-thing)\n\n## get\\_thing()\n\n'
+        '- [Thing](../models/#class-thing) [docs](https://example.org/#x) [Self](#get_thing)\n'
+    )
+    assert collect_markdown_anchors(markdown) == {'packageapi', 'get_thing', 'thing', 'get_thing_1'}
+    assert list(iter_page_links(markdown)) == [
+        ('Thing', '../models/#class-thing'),
+        ('Thing', '../models/#class-thing'),
+        ('Self', '#get_thing'),
+    ]
+
+
+def test_resolve_link():
+    assert (
+        resolve_link('package/api.md', '../models/#class-thing') == 'package/models.md#class-thing'
+    )
+    assert resolve_link('package/api.md', '#class-thing') == 'package/api.md#class-thing'
+    assert resolve_link('package/sub/a.md', '../../b/#x') == 'package/b.md#x'
+
+
+def test_validator(package):
+    validator = LinkValidator()
+    list(iter_markdown([str(package)], link=True, validator=validator))
+    assert validator.validate() == [
+        {
+            'page': 'package/api.md',
+            'type': 'Hidden',
+            'link': '../models/#class-hidden',
+            'target': 'package/models.md#class-hidden',
+            'reason': 'missing anchor',
+        }
+    ]
+
+
+def test_validator_missing_page():
+    validator = LinkValidator()
+    parsed = parse_module_file('package/api.py', content="def get() -> Other:\n    '''get'''\n")
+    markdown = module_to_markdown(parsed, {'Other': '../other/#class-other'})
+    validator.add_page('package/api.md', parsed, markdown)
+    assert [(b['link'], b['reason']) for b in validator.validate()] == [
+        ('../other/#class-other', 'missing page')
+    ]
+
+
+def test_validator_skips_hidden_symbols(package):
+    # links are only checked where they are written, not from the types of hidden functions
+    package.join('api.py').write(
+        "def get_thing() -> Thing:\n    '''get a thing'''\n\n"
+        "def _get_hidden() -> Hidden:\n    '''get a hidden thing'''\n"
+    )
+    validator = LinkValidator()
+    list(iter_markdown([str(package)], link=True, validator=validator))
+    assert validator.validate() == []
+
+
+def test_command_exit_status(package, tmpdir, monkeypatch):
+    argv = ['markdown_refdocs', str(package), '-o', str(tmpdir.join('output')), '--link']
+    monkeypatch.setattr(sys, 'argv', argv + ['--validate_links'])
+    with pytest.raises(SystemExit) as exc_info:
+        command_interface()
+    assert exc_info.value.code == '1 broken link(s)'
+
+
+def test_extract_validate_links(package, tmpdir):
+    output = str(tmpdir.join('output'))
+    with pytest.raises(BrokenLinksError) as exc_info:
+        extract_to_markdown([str(package)], output, link=True, validate_links=True)
+    assert str(exc_info.value) == '1 broken link(s)'
+    assert os.path.exists(os.path.join(output, 'package', 'api.md'))
+
+    package.join('models.py').write("class Hidden:\n    '''documented'''\n    name: str\n")
+    package.join('api.py').write("def get_hidden() -> Hidden:\n    '''get a hidden thing'''\n")
+    extract_to_markdown([str(package)], output, link=True, validate_links=True)
+
+
+def test_validate_unchanged_pages(package):
+    # pages which are not rendered again still provide their anchors
+    package.join('models.py').write("class Hidden:\n    '''documented'''\n    name: str\n")
+    package.join('api.py').write("def get_hidden() -> Hidden:\n    '''get a hidden thing'''\n")
+    validator = LinkValidator()
+    pages = iter_markdown([str(package)], link=True, retry=['package/api.md'], validator=validator)
+    assert [page for page, _, _ in pages] == ['package/api.md']
+    assert validator.validate() == []
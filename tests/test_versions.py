@@ -0,0 +1,82 @@
+import os
+import sys
+
+import pytest
+from markdown_refdocs import versions
+from markdown_refdocs.main import command_interface
+from markdown_refdocs.versions import extract_versions, parse_version_spec
+
+
+@pytest.fixture
+def repo(tmpdir, make_package, git):
+    pkg = make_package(
+        {
+            'models.py': "class Thing:\n    '''a thing'''\n    name: str\n",
+            'api.py': "def get_thing() -> Thing:\n    '''get a thing'''\n",
+            'other.py': "def other() -> int:\n    '''other'''\n",
+        }
+    )
+    git(tmpdir, 'init', '-q')
+    git(tmpdir, 'add', '.')
+    git(tmpdir, 'commit', '-q', '-m', 'initial')
+    git(tmpdir, 'tag', 'v1')
+    pkg.join('other.py').write("def other() -> str:\n    '''other, now a string'''\n")
+    git(tmpdir, 'commit', '-q', '-am', 'change other')
+    git(tmpdir, 'tag', 'v2')
+    # uncommitted changes are not part of any version
+    pkg.join('api.py').write("def get_thing() -> Thing:\n    '''not committed'''\n")
+    return tmpdir
+
+
+def read(filename):
+    with open(filename, 'r') as fh:
+        return fh.read()
+
+
+class TestParseVersionSpec:
+    def test_default_name(self):
+        assert parse_version_spec('v1.0') == ('v1.0', 'v1.0')
+        assert parse_version_spec('origin/release') == ('origin/release', 'origin-release')
+
+    def test_name(self):
+        assert parse_version_spec('HEAD=latest') == ('HEAD', 'latest')
+
+    @pytest.mark.parametrize('spec', ['HEAD=..', 'HEAD=a/b', '=latest', 'HEAD='])
+    def test_invalid(self, spec):
+        with pytest.raises(ValueError):
+            parse_version_spec(spec)
+
+
+def test_extract_versions(repo, monkeypatch):
+    parse_module_file = versions.parse_module_file
+    parsed = []
+
+    def parse(filename, *args, **kwargs):
+        parsed.append(os.path.basename(filename))
+        return parse_module_file(filename, *args, **kwargs)
+
+    monkeypatch.setattr(versions, 'parse_module_file', parse)
+    output = repo.join('docs')
+    extract_versions([str(repo.join('package'))], str(output), ['v1', 'v2=latest'], link=True)
+
+    # modules are only parsed again when their source changed
+    assert sorted(parsed) == ['__init__.py', 'api.py', 'models.py', 'other.py', 'other.py']
+
+    v1 = output.join('v1', 'package')
+    latest = output.join('latest', 'package')
+    assert 'get a thing' in read(str(latest.join('api.md')))
+    assert '[Thing](../models/#class-thing)' in read(str(latest.join('api.md')))
+    assert 'now a string' in read(str(latest.join('other.md')))
+    assert 'now a string' not in read(str(v1.join('other.md')))
+
+    for page in ['__init__.md', 'api.md', 'models.md']:
+        assert os.stat(str(v1.join(page))).st_ino == os.stat(str(latest.join(page))).st_ino
+    assert os.stat(str(v1.join('other.md'))).st_ino != os.stat(str(latest.join('other.md'))).st_ino
+
+
+def test_command_rejects_since(repo, monkeypatch, capsys):
+    argv = ['markdown_refdocs', str(repo.join('package')), '-o', str(repo.join('docs'))]
+    monkeypatch.setattr(sys, 'argv', argv + ['--versions', 'v1', 'v2', '--since', 'v1'])
+    with pytest.raises(SystemExit):
+        command_interface()
+    assert '--versions can not be used with --since' in capsys.readouterr().err
@@ -0,0 +1,96 @@
+import os
+import tarfile
+import time
+import zipfile
+
+import pytest
+from markdown_refdocs.writers import ArchiveWriter, DirectoryWriter, PageWriter, create_writer
+
+
+def test_page_writer_is_abstract():
+    with pytest.raises(TypeError):
+        PageWriter()
+
+
+class TestDirectoryWriter:
+    @pytest.mark.parametrize('workers', [1, 4])
+    def test_writes_pages(self, tmpdir, workers):
+        with DirectoryWriter(str(tmpdir), workers=workers) as writer:
+            for index in range(20):
+                writer.write(f'package/sub{index % 3}/module{index}.md', f'# module{index}\n')
+
+        for index in range(20):
+            filename = os.path.join(str(tmpdir), 'package', f'sub{index % 3}', f'module{index}.md')
+            with open(filename, 'r') as fh:
+                assert fh.read() == f'# module{index}\n'
+        # no temporary files left behind
+        for root, dirs, files in os.walk(str(tmpdir)):
+            assert all(f.endswith('.md') and not f.startswith('.') for f in files)
+
+    def test_overwrites_existing(self, tmpdir):
+        tmpdir.join('page.md').write('old')
+        with DirectoryWriter(str(tmpdir)) as writer:
+            writer.write('page.md', 'new')
+        assert tmpdir.join('page.md').read() == 'new'
+
+    @pytest.mark.parametrize('workers', [1, 4])
+    def test_reports_first_error_in_order(self, tmpdir, workers, capsys):
+        # a file where a directory is expected makes the writes under it fail
+        tmpdir.join('blocked').write('')
+        tmpdir.join('other').write('')
+        writer = DirectoryWriter(str(tmpdir), workers=workers)
+        writer.write('ok.md', 'content')
+        writer.write('blocked/first.md', 'content')
+        writer.write('other/second.md', 'content')
+
+        with pytest.raises(OSError) as err:
+            writer.close()
+        assert 'blocked' in str(err.value)
+        output = capsys.readouterr().out
+        assert output.index('error writing: ' + str(tmpdir.join('blocked'))) < output.index(
+            'error writing: ' + str(tmpdir.join('other'))
+        )
+        assert tmpdir.join('ok.md').read() == 'content'
+
+
+class TestArchiveWriter:
+    @pytest.mark.parametrize('ext', ['zip', 'tar', 'tar.gz', 'tar.xz'])
+    def test_reproducible(self, tmpdir, ext, monkeypatch):
+        contents = []
+        for attempt in ['first', 'second']:
+            # the current time must not leak into the archive
+            monkeypatch.setattr(time, 'time', lambda: 1600000000.0 + len(contents) * 3600)
+            filename = str(tmpdir.join(f'{attempt}.{ext}'))
+            with create_writer(filename) as writer:
+                assert isinstance(writer, ArchiveWriter)
+                writer.write('package/module.md', '# module\n')
+                writer.write('package/sub/other.md', '# other\n')
+            with open(filename, 'rb') as fh:
+                contents.append(fh.read())
+        assert contents[0] == contents[1]
+
+    def test_zip_members(self, tmpdir):
+        filename = str(tmpdir.join('docs.zip'))
+        with create_writer(filename) as writer:
+            writer.write('package/module.md', '# module\n')
+            writer.write('package/sub/other.md', '# other\n')
+        with zipfile.ZipFile(filename) as zf:
+            assert zf.namelist() == ['package/module.md', 'package/sub/other.md']
+            assert zf.read('package/sub/other.md') == b'# other\n'
+        assert os.listdir(str(tmpdir)) == ['docs.zip']
+
+    def test_explicit_tar_format(self, tmpdir):
+        filename = str(tmpdir.join('docs.out'))
+        with create_writer(filename, archive='tar.gz') as writer:
+            writer.write('module.md', '# module\n')
+        with tarfile.open(filename, 'r:gz') as tf:
+            member = tf.getmember('module.md')
+            assert member.mtime == 0
+            assert tf.extractfile(member).read() == b'# module\n'
+
+    def test_remove(self, tmpdir):
+        with create_writer(str(tmpdir.join('docs.zip'))) as writer:
+            writer.remove('package/module.md')  # not in the new archive
+            writer.write('package/module.md', '# module\n')
+            with pytest.raises(ValueError):
+                writer.remove('package/module.md')